@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基准测试脚本共用的统计函数"""
+
+def percentile(values, pct):
+    """
+    计算百分位数（线性插值）
+
+    Args:
+        values: 数值列表
+        pct: 百分位，0-100
+
+    Returns:
+        对应的百分位数值
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
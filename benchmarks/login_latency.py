@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""登录流程端到端延迟基准测试
+
+在本地模拟登录站点上重复执行 perform_login_test，分别统计每条回退路径
+（standard / alternative / oauth / bare / challenge）完整运行的 p50/p95 耗时。
+可以保存结果并与基线比较，用于发现登录流程的速度回退，整个过程不需要网络。
+
+用法:
+    python benchmarks/login_latency.py --runs 5
+    python benchmarks/login_latency.py --output bench.json
+    python benchmarks/login_latency.py --baseline bench.json --tolerance 0.2
+    python benchmarks/login_latency.py --time-scale 1   # 包含完整的人类行为等待
+    python benchmarks/login_latency.py --session        # 复用会话和HTTP磁盘缓存（第一次运行完整登录）
+    python benchmarks/login_latency.py --warm-cache     # 保留登录路径缓存，测量命中缓存后的耗时
+
+默认每次运行前清空登录路径缓存，每次都从默认的回退顺序开始（冷启动）；
+每种布局使用单独的缓存文件，互不影响。
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from config_loader import ConfigLoader
+from logger import Logger
+from standin_site import StandinLoginSite, VARIANTS
+
+from _stats import percentile
+
+def outcome_label(result):
+    """把测试结果归类为便于统计的标签"""
+    if not result:
+        return "无结果"
+    if result.get('details', {}).get('登录路径') == 'session':
+        return "复用会话"
+    if result.get('rba_triggered'):
+        return "触发RBA"
+    return "成功" if result.get('success') else "失败"
+
+def run_variant(playwright, browser_pool, site, variant, runs, user_type, work_dir, time_scale=0.0, session=False,
+                warm_cache=False):
+    """
+    在指定页面布局上重复执行登录测试
+
+    Args:
+        session: 是否启用持久化会话，每种布局使用单独的会话目录
+        warm_cache: 是否在多次运行之间保留登录路径缓存；默认每次运行前清空，测量冷启动耗时
+
+    Returns:
+        该布局的统计结果字典
+    """
+    from main import perform_login_test
+
+    # 每种布局使用单独的登录路径缓存文件
+    cache_path = os.path.join(work_dir, f"login_path_cache_{variant}.json")
+    extra = f"[login_cache]\nenabled = true\npath = {cache_path}\n"
+    if session:
+        profile_dir = os.path.join(work_dir, 'profiles', variant)
+        extra += f"[session]\nenabled = true\nuser_types = {user_type}\ndirectory = {profile_dir}\n"
+    config_path = site.write_config(os.path.join(work_dir, f"config_{variant}.ini"), variant, extra=extra,
+                                    time_scale=time_scale)
+    config = ConfigLoader(config_path)
+    asset_requests = site.asset_requests
+
+    durations = []
+    outcomes = Counter()
+    for _ in range(runs):
+        if not warm_cache and os.path.exists(cache_path):
+            os.remove(cache_path)
+        start = time.perf_counter()
+        result = perform_login_test(playwright.chromium, config, user_type, browser_pool)
+        durations.append(time.perf_counter() - start)
+        outcomes[outcome_label(result)] += 1
+
+    return {
+        "runs": runs,
+        "p50": percentile(durations, 50),
+        "p95": percentile(durations, 95),
+        "mean": sum(durations) / len(durations),
+        "max": max(durations),
+        "outcomes": dict(outcomes),
+        "login_cache": "warm" if warm_cache else "cold",
+        # 登录页面静态脚本的实际下载次数，启用HTTP磁盘缓存时只在第一次运行下载
+        "asset_requests": site.asset_requests - asset_requests
+    }
+
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    与基线比较，找出p50或p95变慢超过容忍度的布局
+
+    Returns:
+        回退描述列表
+    """
+    regressions = []
+    for variant, stats in report.items():
+        base = baseline.get(variant)
+        # 登录路径缓存的冷热状态不同时耗时不可比
+        if not base or base.get('login_cache', 'cold') != stats.get('login_cache', 'cold'):
+            continue
+        for key in ("p50", "p95"):
+            if base[key] > 0 and stats[key] > base[key] * (1 + tolerance):
+                regressions.append(
+                    f"{variant} {key}: {stats[key]:.2f}s > 基线 {base[key]:.2f}s (+{tolerance:.0%})"
+                )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="登录流程端到端延迟基准测试")
+    parser.add_argument('--runs', type=int, default=5, help="每种页面布局的运行次数")
+    parser.add_argument('--variants', nargs='+', default=VARIANTS, choices=VARIANTS, help="要测试的页面布局")
+    parser.add_argument('--user-type', default='normal', choices=['normal', 'high_risk', 'new_device'])
+    parser.add_argument('--output', help="将结果保存为JSON文件")
+    parser.add_argument('--baseline', help="用于比较的基线JSON文件")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="允许的相对变慢比例")
+    parser.add_argument('--time-scale', type=float, default=0.0,
+                        help="行为等待的缩放系数，默认0只测量流程本身的耗时")
+    parser.add_argument('--session', action='store_true', help="启用持久化会话和HTTP磁盘缓存")
+    parser.add_argument('--warm-cache', action='store_true', help="多次运行之间保留登录路径缓存")
+    args = parser.parse_args()
+
+    from playwright.sync_api import sync_playwright
+    from browser_pool import BrowserPool
+
+    Logger({'level': 'WARNING', 'file_enabled': False})
+
+    report = {}
+    with tempfile.TemporaryDirectory() as work_dir, StandinLoginSite() as site:
+        # 截图和代理记录等运行产物写入临时目录
+        original_dir = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            with sync_playwright() as p, BrowserPool(p.chromium, {"headless": True}) as browser_pool:
+                for variant in args.variants:
+                    report[variant] = run_variant(p, browser_pool, site, variant, args.runs, args.user_type, work_dir,
+                                                  args.time_scale, args.session, args.warm_cache)
+                    stats = report[variant]
+                    print(f"{variant:<12} runs={stats['runs']:<3} p50={stats['p50']:7.2f}s "
+                          f"p95={stats['p95']:7.2f}s mean={stats['mean']:7.2f}s outcomes={stats['outcomes']} "
+                          f"asset_requests={stats['asset_requests']} login_cache={stats['login_cache']}")
+        finally:
+            os.chdir(original_dir)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基准测试结果已保存至：{args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("检测到速度回退：")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("未检测到速度回退")
+
+if __name__ == "__main__":
+    main()
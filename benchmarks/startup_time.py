@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""命令行启动耗时基准测试
+
+在新的解释器中以 -X importtime 导入各入口模块，统计导入总耗时和自身耗时最高的模块，
+并检查不需要浏览器的入口没有加载 Playwright、Faker、pandas 等重量级依赖。
+可以保存结果并与基线比较，用于发现启动速度回退。
+
+用法:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --runs 10 --output startup.json
+    python benchmarks/startup_time.py --baseline startup.json --tolerance 0.3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from _stats import percentile
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# 入口模块及其不应加载的重量级依赖
+TARGETS = {
+    "main": ("playwright", "faker", "pandas", "numpy", "asyncio"),
+    "config_loader": ("playwright", "faker", "pandas", "numpy"),
+    "results_store": ("playwright", "faker", "pandas", "numpy"),
+    "analysis": ("playwright", "faker"),
+    "experiment_planner": ("playwright", "faker", "pandas"),
+}
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的输出
+
+    Returns:
+        {模块名: (自身耗时秒, 累计耗时秒)}，同名模块只保留第一次导入
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.setdefault(name.strip(), (int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return modules
+
+def measure_import(module, runs):
+    """
+    在新的解释器中重复导入模块
+
+    Returns:
+        统计结果字典
+    """
+    code = f"import sys; sys.path.insert(0, {SRC_DIR!r}); import {module}"
+    wall_times, import_times = [], []
+    modules = {}
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True
+        )
+        wall_times.append(time.perf_counter() - start)
+        modules = parse_importtime(completed.stderr)
+        import_times.append(modules[module][1])
+
+    # 最后一次运行中自身耗时最高的模块
+    slowest = sorted(modules.items(), key=lambda item: -item[1][0])[:10]
+    loaded = sorted(
+        heavy for heavy in TARGETS.get(module, ())
+        if any(name == heavy or name.startswith(f"{heavy}.") for name in modules)
+    )
+    return {
+        "runs": runs,
+        "import_p50": percentile(import_times, 50),
+        "import_p95": percentile(import_times, 95),
+        "wall_p50": percentile(wall_times, 50),
+        "modules": len(modules),
+        "slowest": [{"module": name, "self": self_time} for name, (self_time, _) in slowest],
+        "forbidden_loaded": loaded
+    }
+
+def compare_with_baseline(report, baseline, tolerance):
+    """
+    与基线比较，找出导入耗时变慢超过容忍度的入口
+
+    Returns:
+        回退描述列表
+    """
+    regressions = []
+    for module, stats in report.items():
+        base = baseline.get(module)
+        if not base:
+            continue
+        for key in ("import_p50", "wall_p50"):
+            if base[key] > 0 and stats[key] > base[key] * (1 + tolerance):
+                regressions.append(
+                    f"{module} {key}: {stats[key] * 1000:.1f}ms > 基线 {base[key] * 1000:.1f}ms (+{tolerance:.0%})"
+                )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行启动耗时基准测试")
+    parser.add_argument('--runs', type=int, default=5, help="每个入口的导入次数")
+    parser.add_argument('--modules', nargs='+', default=list(TARGETS), help="要测量的入口模块")
+    parser.add_argument('--top', type=int, default=5, help="显示自身耗时最高的若干模块")
+    parser.add_argument('--output', help="将结果保存为JSON文件")
+    parser.add_argument('--baseline', help="用于比较的基线JSON文件")
+    parser.add_argument('--tolerance', type=float, default=0.3, help="允许的相对变慢比例")
+    args = parser.parse_args()
+
+    report = {}
+    failures = []
+    for module in args.modules:
+        stats = report[module] = measure_import(module, max(1, args.runs))
+        print(f"{module:<20} import p50={stats['import_p50'] * 1000:7.1f}ms p95={stats['import_p95'] * 1000:7.1f}ms "
+              f"wall p50={stats['wall_p50'] * 1000:7.1f}ms modules={stats['modules']}")
+        for entry in stats['slowest'][:args.top]:
+            print(f"    {entry['self'] * 1000:7.1f}ms  {entry['module']}")
+        if stats['forbidden_loaded']:
+            failures.append(f"{module} 加载了重量级依赖: {', '.join(stats['forbidden_loaded'])}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"基准测试结果已保存至：{args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        failures.extend(compare_with_baseline(report, baseline, args.tolerance))
+
+    if failures:
+        print("检测到启动速度回退：")
+        for line in failures:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("未检测到启动速度回退")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""RBA因子分析
+
+把所有测试结果加载为按列存储的 DataFrame，设备指纹特征展开为单独的列，
+按单个因子和因子组合分组统计RBA触发率及其 Wilson 置信区间。
+分组统计全部使用 pandas groupby 完成，几十万条结果也只需要很短的时间。
+
+使用方法:
+    python src/analysis.py --db data/results/results.db --min-runs 5
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from proxy_manager import PROXY_UNAVAILABLE
+
+# 结果中"设备指纹"字段记录的因子
+FACTORS = ("viewport", "timezone_id", "locale", "platform", "proxy")
+
+def _factor_frame(frame):
+    """统一各列的类型：时间解析为 datetime，因子和用户类型转换为 category 以减少内存和加快分组"""
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], errors="coerce", format="ISO8601")
+    frame["success"] = frame["success"].astype(bool)
+    frame["rba_triggered"] = frame["rba_triggered"].astype(bool)
+    for column in ("user_type",) + FACTORS:
+        frame[column] = frame[column].astype("category")
+    return frame
+
+def load_results_db(db_path="data/results/results.db"):
+    """
+    从结果数据库加载测试结果，设备指纹特征由 SQLite 的 json_extract 直接展开为列
+
+    Args:
+        db_path: 结果数据库路径
+
+    Returns:
+        DataFrame，列为 id, timestamp, user_type, success, rba_triggered 以及 FACTORS 中的各因子
+    """
+    columns = ", ".join(
+        f"json_extract(details, '$.\"设备指纹\".{factor}') AS {factor}" for factor in FACTORS
+    )
+    sql = f"SELECT id, timestamp, user_type, success, rba_triggered, {columns} FROM results"
+    with sqlite3.connect(f"file:{db_path}?mode=ro", uri=True) as conn:
+        frame = pd.read_sql_query(sql, conn)
+    return _factor_frame(frame)
+
+def load_results_json(directory="data/results"):
+    """
+    从单个JSON结果文件加载测试结果
+
+    Args:
+        directory: JSON结果文件所在目录
+
+    Returns:
+        与 load_results_db 列相同的 DataFrame
+    """
+    columns = {name: [] for name in ("timestamp", "user_type", "success", "rba_triggered") + FACTORS}
+    for path in sorted(glob.glob(os.path.join(directory, "test_*.json"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        factors = data.get("details", {}).get("设备指纹") or {}
+        columns["timestamp"].append(data.get("timestamp"))
+        columns["user_type"].append(data.get("user_type"))
+        columns["success"].append(bool(data.get("success")))
+        columns["rba_triggered"].append(bool(data.get("rba_triggered")))
+        for factor in FACTORS:
+            columns[factor].append(factors.get(factor))
+    return _factor_frame(pd.DataFrame(columns))
+
+def load_results(db_path="data/results/results.db", json_dir=None):
+    """
+    加载所有测试结果
+
+    Args:
+        db_path: 结果数据库路径，为空或文件不存在时跳过
+        json_dir: JSON结果文件所在目录，为空时跳过
+
+    Returns:
+        合并后的 DataFrame，不含因没有可用代理而未执行的测试
+    """
+    frames = []
+    if db_path and os.path.exists(db_path):
+        frames.append(load_results_db(db_path))
+    if json_dir:
+        frames.append(load_results_json(json_dir).assign(id=pd.NA))
+    if not frames:
+        return _factor_frame(pd.DataFrame(columns=["id", "timestamp", "user_type", "success", "rba_triggered", *FACTORS]))
+    frame = frames[0] if len(frames) == 1 else _factor_frame(pd.concat(frames, ignore_index=True))
+    # 没有可用代理时测试并未执行，不计入统计
+    return frame[frame["proxy"] != PROXY_UNAVAILABLE].reset_index(drop=True)
+
+def wilson_interval(successes, totals, z=1.96):
+    """
+    计算比例的 Wilson 置信区间，参数可以是数组
+
+    Args:
+        successes: 事件发生次数
+        totals: 总次数
+        z: 正态分布分位数，1.96 对应 95% 置信水平
+
+    Returns:
+        (下限, 上限)，总次数为0时为 NaN
+    """
+    successes = np.asarray(successes, dtype=float)
+    totals = np.asarray(totals, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / totals
+        denominator = 1 + z * z / totals
+        center = (p + z * z / (2 * totals)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / totals + z * z / (4 * totals * totals)) / denominator
+    # 触发次数为0或等于总次数时，消除浮点误差使区间端点恰好为0或1
+    return np.clip(center - margin, 0.0, 1.0), np.clip(center + margin, 0.0, 1.0)
+
+def _rates(grouped, z):
+    """对分组后的 rba_triggered 列统计触发次数、触发率和置信区间"""
+    stats = grouped["rba_triggered"].agg(runs="size", triggered="sum")
+    stats["triggered"] = stats["triggered"].astype(int)
+    stats["rate"] = stats["triggered"] / stats["runs"]
+    stats["ci_low"], stats["ci_high"] = wilson_interval(stats["triggered"], stats["runs"], z)
+    return stats
+
+def factor_trigger_rates(frame, factors=FACTORS, min_runs=1, z=1.96):
+    """
+    按单个因子统计RBA触发率
+
+    Args:
+        frame: load_results 返回的 DataFrame
+        factors: 参与统计的因子
+        min_runs: 结果中只保留运行次数不少于该值的分组
+        z: 置信区间使用的正态分布分位数
+
+    Returns:
+        DataFrame，列为 factor, level, runs, triggered, rate, ci_low, ci_high，按触发率从高到低排列
+    """
+    tables = []
+    for factor in factors:
+        stats = _rates(frame.groupby(factor, observed=True), z)
+        stats.index = stats.index.astype(str).rename("level")
+        tables.append(stats.reset_index().assign(factor=factor))
+    return _finish(tables, ["factor", "level"], min_runs)
+
+def pair_trigger_rates(frame, factors=FACTORS, min_runs=1, z=1.96):
+    """
+    按两个因子的组合统计RBA触发率
+
+    Args:
+        参数同 factor_trigger_rates
+
+    Returns:
+        DataFrame，列为 factor_a, level_a, factor_b, level_b, runs, triggered, rate, ci_low, ci_high
+    """
+    tables = []
+    for factor_a, factor_b in itertools.combinations(factors, 2):
+        stats = _rates(frame.groupby([factor_a, factor_b], observed=True), z)
+        stats.index = stats.index.set_names(["level_a", "level_b"])
+        tables.append(stats.reset_index().assign(factor_a=factor_a, factor_b=factor_b))
+    return _finish(tables, ["factor_a", "level_a", "factor_b", "level_b"], min_runs)
+
+def _finish(tables, key_columns, min_runs):
+    """合并各因子的统计表，过滤运行次数过少的分组并排序"""
+    columns = key_columns + ["runs", "triggered", "rate", "ci_low", "ci_high"]
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    table = pd.concat(tables, ignore_index=True)[columns]
+    table = table[table["runs"] >= min_runs]
+    return table.sort_values(["rate", "runs"], ascending=[False, False], ignore_index=True)
+
+def main(argv=None):
+    """命令行入口：打印各因子及因子组合的RBA触发率"""
+    parser = argparse.ArgumentParser(description="RBA因子分析")
+    parser.add_argument("--db", default="data/results/results.db", help="结果数据库路径")
+    parser.add_argument("--json-dir", help="同时加载该目录中的JSON结果文件")
+    parser.add_argument("--min-runs", type=int, default=1, help="只显示运行次数不少于该值的分组")
+    parser.add_argument("--top", type=int, default=20, help="因子组合只显示触发率最高的若干行")
+    parser.add_argument("--output", help="把统计结果保存为CSV文件的路径前缀")
+    args = parser.parse_args(argv)
+
+    frame = load_results(args.db, args.json_dir)
+    print(f"共加载 {len(frame)} 条测试结果，其中 {int(frame['rba_triggered'].sum())} 条触发RBA")
+    if frame.empty:
+        return
+
+    factors = factor_trigger_rates(frame, min_runs=args.min_runs)
+    pairs = pair_trigger_rates(frame, min_runs=args.min_runs)
+
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print("\n单个因子的RBA触发率：")
+        print(factors.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+        print(f"\n因子组合的RBA触发率（前 {args.top} 行）：")
+        print(pairs.head(args.top).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        factors.to_csv(f"{args.output}_factors.csv", index=False)
+        pairs.to_csv(f"{args.output}_pairs.csv", index=False)
+        print(f"\n统计结果已保存到 {args.output}_factors.csv 和 {args.output}_pairs.csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基于 playwright.async_api 的并发执行引擎
+
+与 main.perform_login_test 执行同一份登录步骤（login_flow.login_steps），结果格式相同，
+但多个场景（及其重复执行）在同一个事件循环中并发运行，
+总耗时取决于最慢的场景，而不是所有场景耗时之和。
+"""
+
+import asyncio
+import logging
+
+from browser_pool import AsyncBrowserPool
+from human_behavior import AsyncHumanBehavior
+from proxy_manager import ProxyManager, ProxyUnavailableError
+from phase_timer import PhaseTimer, attach_timings
+from login_flow import (
+    SCENARIOS, AsyncFlowIO, login_steps, prepare_fingerprint, fingerprint_factors, attach_fingerprint,
+    proxy_unavailable_result
+)
+from screenshot_manager import ScreenshotManager
+from session_profile import SessionProfile
+
+async def async_perform_login_test(browser_pool, config, user_type="normal", run_label=None, proxy_manager=None,
+                                   screenshots=None, fingerprint=None, proxy_server=None):
+    """执行登录测试（异步版本）
+
+    Args:
+        browser_pool: 共享的 AsyncBrowserPool
+        config: 配置对象
+        user_type: 用户类型，可选值为 "normal", "high_risk", "new_device", "catalog"
+        run_label: 截图文件名中使用的运行标识，默认为用户类型
+        proxy_manager: 本次运行共享的代理管理器，未提供时为本次测试单独创建
+        screenshots: 本次运行共享的截图管理器，未提供时为本次测试单独创建
+        fingerprint: 指定的设备指纹，含义同 perform_login_test
+        proxy_server: 指定的代理服务器地址，含义同 perform_login_test
+
+    Returns:
+        与 perform_login_test 格式相同的测试结果字典
+    """
+    timer = PhaseTimer(user_type)
+    owns_screenshots = screenshots is None
+    if owns_screenshots:
+        screenshots = ScreenshotManager(config.get_screenshot_config())
+    try:
+        result = await _run_login_flow_async(
+            browser_pool, config, user_type, run_label or user_type, proxy_manager, screenshots, fingerprint,
+            proxy_server, timer
+        )
+    finally:
+        if owns_screenshots:
+            # 等待后台写入截图，放到线程中执行以免阻塞事件循环
+            await asyncio.to_thread(screenshots.close)
+
+    logging_config = config.get_logging_config()
+    timing_path = logging_config.get('timing_path') if logging_config.get('timing_enabled') else None
+    return attach_timings(result, timer, timing_path)
+
+async def _run_login_flow_async(browser_pool, config, user_type, run_label, proxy_manager, screenshots,
+                                fingerprint, proxy_server, timer):
+    """执行登录流程，各阶段耗时记录在 timer 中"""
+    logger = logging.getLogger('login_test')
+    logger.info(f"开始执行 {user_type} 类型用户的登录测试")
+
+    credentials = config.get_credentials()
+    if not credentials.get('email') or not credentials.get('password'):
+        logger.error("没有配置测试账号，无法进行测试")
+        return
+
+    timer.phase('prepare')
+    fingerprint, context_options = prepare_fingerprint(config, user_type, fingerprint)
+
+    if proxy_server:
+        proxy = {"server": proxy_server}
+    else:
+        owns_proxy_manager = proxy_manager is None
+        if owns_proxy_manager:
+            proxy_manager = ProxyManager(config.get_proxy_config(), config.get_proxy_health_config())
+        # 代理健康检查使用阻塞的socket调用，放到线程中执行以免阻塞事件循环
+        try:
+            proxy = await asyncio.to_thread(proxy_manager.get_playwright_proxy_config, user_type)
+        except ProxyUnavailableError as e:
+            return proxy_unavailable_result(user_type, fingerprint, e)
+        finally:
+            if owns_proxy_manager:
+                proxy_manager.close()
+    if proxy:
+        context_options['proxy'] = proxy
+        logger.info(f"使用代理: {proxy['server']}")
+    # 记录在测试结果中，供因子分析使用
+    factors = fingerprint_factors(fingerprint, proxy)
+
+    timer.phase('new_context')
+    session = SessionProfile(config.get_session_config(), user_type, fingerprint.content_hash)
+    use_session = session.acquire()
+    if use_session:
+        context = await session.async_new_context(browser_pool, context_options)
+        logger.info(f"使用持久化会话: {session.directory}（{'已恢复' if session.restored else '无有效会话'}）")
+    else:
+        context = await browser_pool.new_context(**context_options)
+    behavior = AsyncHumanBehavior(config.get_behavior_config())
+    behavior.timer = timer
+    flow_io = AsyncFlowIO(screenshots, session)
+
+    try:
+        page = await context.new_page()
+        result = await flow_io.run(login_steps(
+            flow_io, page, context, config, credentials, behavior, user_type, timer,
+            run_label=run_label, use_session=use_session
+        ))
+        return attach_fingerprint(result, factors)
+    finally:
+        timer.phase('teardown')
+        if use_session:
+            await session.async_close_context(context, browser_pool)
+        else:
+            await browser_pool.release_context(context)
+
+async def run_scenarios(config, test_scenarios=None, repetitions=1, concurrency=3):
+    """
+    并发执行所有启用的测试场景
+
+    Args:
+        config: 配置对象
+        test_scenarios: 场景开关字典，默认读取配置中的 test_scenarios
+        repetitions: 每个场景重复执行的次数
+        concurrency: 同时运行的最大场景数
+
+    Returns:
+        [(场景显示名称, 测试结果字典), ...]，顺序与场景提交顺序一致
+    """
+    from playwright.async_api import async_playwright
+
+    logger = logging.getLogger('async_engine')
+    if test_scenarios is None:
+        test_scenarios = config.get_test_scenarios()
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    # 所有场景共享同一个代理管理器，使用记录在运行结束时批量写入
+    proxy_manager = ProxyManager(config.get_proxy_config(), config.get_proxy_health_config())
+    # 所有场景共享同一个截图管理器和后台写入线程池
+    screenshots = ScreenshotManager(config.get_screenshot_config())
+
+    async with async_playwright() as p:
+        async with AsyncBrowserPool(p.chromium, config.get_browser_config()) as browser_pool:
+
+            async def run_one(user_type, display_name, index):
+                async with semaphore:
+                    logger.info(f"开始测试{display_name}场景（第 {index + 1} 次）")
+                    result = await async_perform_login_test(
+                        browser_pool, config, user_type, run_label=f"{user_type}_{index + 1}",
+                        proxy_manager=proxy_manager, screenshots=screenshots
+                    )
+                    return display_name, result or {}
+
+            tasks = [
+                run_one(user_type, display_name, index)
+                for scenario_key, user_type, display_name in SCENARIOS
+                if test_scenarios.get(scenario_key, True)
+                for index in range(max(1, repetitions))
+            ]
+            logger.info(f"共 {len(tasks)} 个测试任务，最大并发数 {concurrency}")
+            try:
+                return await asyncio.gather(*tasks)
+            finally:
+                proxy_manager.close()
+                await asyncio.to_thread(screenshots.close)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import logging
+
+class BrowserPool:
+    """浏览器进程池，复用同一个浏览器进程为每个测试场景创建隔离的上下文"""
+
+    def __init__(self, browser_type, browser_config=None):
+        """
+        初始化浏览器进程池
+
+        Args:
+            browser_type: Playwright浏览器类型（如 p.chromium）
+            browser_config: 浏览器配置，包含headless, max_contexts_per_browser
+        """
+        browser_config = browser_config or {}
+        self.browser_type = browser_type
+        self.headless = browser_config.get('headless', False)
+        self.max_contexts_per_browser = max(1, int(browser_config.get('max_contexts_per_browser', 20)))
+
+        self.logger = logging.getLogger('browser_pool')
+
+        self.browser = None
+        # 当前浏览器进程已创建的上下文数量
+        self.contexts_created = 0
+        # 当前仍处于打开状态的上下文
+        self.active_contexts = set()
+        # 持久化会话使用的上下文，各自占用一个独立的浏览器进程，不计入共享进程的上下文数量
+        self.persistent_contexts = set()
+        # 累计启动的浏览器进程数量
+        self.launch_count = 0
+
+    def _launch(self):
+        """启动新的浏览器进程"""
+        self.browser = self.browser_type.launch(headless=self.headless)
+        self.contexts_created = 0
+        self.launch_count += 1
+        self.logger.info(f"已启动浏览器进程（第 {self.launch_count} 个）")
+
+    def _recycle_if_needed(self):
+        """达到上下文数量上限或进程已断开时回收浏览器进程"""
+        if self.browser is not None and not self.browser.is_connected():
+            self.logger.warning("浏览器进程已断开，将重新启动")
+            self.browser = None
+            self.active_contexts.clear()
+
+        if self.browser is not None and self.contexts_created >= self.max_contexts_per_browser:
+            if self.active_contexts:
+                # 仍有上下文在使用，推迟回收
+                return
+            self.logger.info(f"浏览器进程已创建 {self.contexts_created} 个上下文，回收并重新启动")
+            self._close_browser()
+
+        if self.browser is None:
+            self._launch()
+
+    def new_context(self, **context_options):
+        """
+        创建一个新的隔离浏览器上下文
+
+        Args:
+            context_options: 传递给 browser.new_context 的选项
+
+        Returns:
+            Playwright的BrowserContext对象
+        """
+        self._recycle_if_needed()
+
+        context = self.browser.new_context(**context_options)
+        self.contexts_created += 1
+        self.active_contexts.add(context)
+        return context
+
+    def new_persistent_context(self, user_data_dir, **context_options):
+        """
+        使用持久化的用户数据目录创建浏览器上下文
+
+        Chromium 的用户数据目录只能在启动浏览器时指定，因此持久化上下文总是使用单独启动的浏览器进程，
+        与共享进程的回收无关；同样通过 release_context 关闭，进程池关闭时一并关闭。
+
+        Args:
+            user_data_dir: 用户数据目录
+            context_options: 传递给 launch_persistent_context 的选项
+
+        Returns:
+            Playwright的BrowserContext对象
+        """
+        context = self.browser_type.launch_persistent_context(
+            user_data_dir, headless=self.headless, **context_options
+        )
+        self.launch_count += 1
+        self.persistent_contexts.add(context)
+        return context
+
+    def release_context(self, context):
+        """
+        关闭并归还浏览器上下文
+
+        Args:
+            context: 由 new_context 或 new_persistent_context 创建的上下文
+        """
+        self.active_contexts.discard(context)
+        self.persistent_contexts.discard(context)
+        try:
+            context.close()
+        except Exception as e:
+            self.logger.warning(f"关闭浏览器上下文时出错: {str(e)}")
+
+    def _close_browser(self):
+        """关闭当前浏览器进程"""
+        if self.browser is None:
+            return
+
+        for context in list(self.active_contexts):
+            self.release_context(context)
+
+        try:
+            self.browser.close()
+        except Exception as e:
+            self.logger.warning(f"关闭浏览器进程时出错: {str(e)}")
+        finally:
+            self.browser = None
+            self.contexts_created = 0
+
+    def close(self):
+        """关闭进程池中的浏览器进程"""
+        for context in list(self.persistent_contexts):
+            self.release_context(context)
+        self._close_browser()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class AsyncBrowserPool:
+    """异步版本的浏览器进程池，供 playwright.async_api 使用"""
+
+    def __init__(self, browser_type, browser_config=None):
+        """
+        初始化异步浏览器进程池
+
+        Args:
+            browser_type: playwright.async_api 中的浏览器类型（如 p.chromium）
+            browser_config: 浏览器配置，包含headless, max_contexts_per_browser
+        """
+        browser_config = browser_config or {}
+        self.browser_type = browser_type
+        self.headless = browser_config.get('headless', False)
+        self.max_contexts_per_browser = max(1, int(browser_config.get('max_contexts_per_browser', 20)))
+
+        self.logger = logging.getLogger('browser_pool')
+
+        self.browser = None
+        self.contexts_created = 0
+        self.active_contexts = set()
+        self.persistent_contexts = set()
+        self.launch_count = 0
+        # 已分配但尚未创建完成的上下文数量
+        self._pending_contexts = 0
+        # 防止并发的场景同时启动或回收浏览器进程
+        self._lock = None
+
+    async def _recycle_if_needed(self):
+        """达到上下文数量上限或进程已断开时回收浏览器进程"""
+        if self.browser is not None and not self.browser.is_connected():
+            self.logger.warning("浏览器进程已断开，将重新启动")
+            self.browser = None
+            self.active_contexts.clear()
+
+        if self.browser is not None and self.contexts_created >= self.max_contexts_per_browser:
+            if self.active_contexts or self._pending_contexts:
+                # 仍有并发场景在使用，推迟到进程空闲时回收
+                return
+            self.logger.info(f"浏览器进程已创建 {self.contexts_created} 个上下文，回收并重新启动")
+            await self._close_browser()
+
+        if self.browser is None:
+            self.browser = await self.browser_type.launch(headless=self.headless)
+            self.contexts_created = 0
+            self.launch_count += 1
+            self.logger.info(f"已启动浏览器进程（第 {self.launch_count} 个）")
+
+    async def new_context(self, **context_options):
+        """
+        创建一个新的隔离浏览器上下文
+
+        Args:
+            context_options: 传递给 browser.new_context 的选项
+
+        Returns:
+            Playwright的BrowserContext对象
+        """
+        if self._lock is None:
+            import asyncio
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            await self._recycle_if_needed()
+            browser = self.browser
+            self.contexts_created += 1
+            self._pending_contexts += 1
+
+        try:
+            context = await browser.new_context(**context_options)
+        finally:
+            self._pending_contexts -= 1
+        self.active_contexts.add(context)
+        return context
+
+    async def new_persistent_context(self, user_data_dir, **context_options):
+        """使用持久化的用户数据目录创建浏览器上下文（异步版本），参数同 BrowserPool.new_persistent_context"""
+        context = await self.browser_type.launch_persistent_context(
+            user_data_dir, headless=self.headless, **context_options
+        )
+        self.launch_count += 1
+        self.persistent_contexts.add(context)
+        return context
+
+    async def release_context(self, context):
+        """
+        关闭并归还浏览器上下文
+
+        Args:
+            context: 由 new_context 或 new_persistent_context 创建的上下文
+        """
+        self.active_contexts.discard(context)
+        self.persistent_contexts.discard(context)
+        try:
+            await context.close()
+        except Exception as e:
+            self.logger.warning(f"关闭浏览器上下文时出错: {str(e)}")
+
+    async def _close_browser(self):
+        """关闭当前浏览器进程"""
+        if self.browser is None:
+            return
+
+        for context in list(self.active_contexts):
+            await self.release_context(context)
+
+        try:
+            await self.browser.close()
+        except Exception as e:
+            self.logger.warning(f"关闭浏览器进程时出错: {str(e)}")
+        finally:
+            self.browser = None
+            self.contexts_created = 0
+
+    async def close(self):
+        """关闭进程池中的浏览器进程"""
+        for context in list(self.persistent_contexts):
+            await self.release_context(context)
+        await self._close_browser()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
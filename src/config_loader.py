@@ -4,20 +4,68 @@
 import configparser
 import os
 import logging
+import threading
+import time
+from dataclasses import dataclass, fields
+from types import MappingProxyType
+from typing import Any, Mapping, Tuple
+
+def _freeze(value):
+    """把解析结果转换为只读结构：字典转为 MappingProxyType，列表转为元组"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """配置文件解析一次得到的只读快照，各字段与 ConfigLoader 的 get_* 方法一一对应"""
+    path: str
+    mtime_ns: int
+    credentials: Mapping[str, str]
+    proxy: Mapping[str, Any]
+    proxy_health: Mapping[str, Any]
+    user_agents: Mapping[str, str]
+    test_scenarios: Mapping[str, bool]
+    execution: Mapping[str, Any]
+    login_url: str
+    behavior: Mapping[str, Any]
+    logging: Mapping[str, Any]
+    browser: Mapping[str, Any]
+    screenshots: Mapping[str, Any]
+    experiment: Mapping[str, Any]
+    login_cache: Mapping[str, Any]
+    device_catalog: Mapping[str, Any]
+    session: Mapping[str, Any]
+    dynamic_selectors: Tuple[str, ...]
 
 class ConfigLoader:
-    """配置文件加载器，用于读取和处理配置文件"""
+    """配置文件加载器，用于读取和处理配置文件
+
+    配置文件在加载时解析为一个只读的 ConfigSnapshot，get_* 方法直接返回快照中的值；
+    文件的修改时间变化后，下一次调用 get_* 时重新解析并整体替换快照，
+    正在使用旧快照的测试不受影响，修改选择器、代理等配置不需要重启。
+    """
     
-    def __init__(self, config_path='config/config.ini'):
+    def __init__(self, config_path='config/config.ini', reload_interval=1.0):
         """
         初始化配置加载器
         
         Args:
             config_path: 配置文件路径
+            reload_interval: 检查配置文件是否修改的最短间隔（秒），None 表示不自动重新加载
         """
         self.logger = logging.getLogger('config_loader')
         self.config_path = config_path
         self.config = configparser.ConfigParser()
+        self.reload_interval = reload_interval
+        
+        self._snapshot = None
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        # 解析失败的文件版本，文件再次修改前不重复解析
+        self._failed_mtime_ns = None
         
         # 尝试加载配置
         self.load_config()
@@ -35,11 +83,60 @@ class ConfigLoader:
             self.config_path = example_config_path
         
         # 加载配置
-        self.config.read(self.config_path, encoding='utf-8')
+        self._snapshot = self._build_snapshot()
+        self._next_check = time.monotonic() + (self.reload_interval or 0)
         self.logger.info(f"已成功加载配置文件: {self.config_path}")
     
-    def get_credentials(self):
-        """获取登录凭证配置"""
+    def _build_snapshot(self):
+        """读取并解析配置文件，返回新的快照"""
+        mtime_ns = os.stat(self.config_path).st_mtime_ns
+        parser = configparser.ConfigParser()
+        parser.read(self.config_path, encoding='utf-8')
+        
+        previous, self.config = self.config, parser
+        try:
+            values = {field.name: _freeze(getattr(self, f"_parse_{field.name}")())
+                      for field in fields(ConfigSnapshot) if field.name not in ('path', 'mtime_ns')}
+        except Exception:
+            self.config = previous
+            raise
+        return ConfigSnapshot(path=self.config_path, mtime_ns=mtime_ns, **values)
+    
+    @property
+    def snapshot(self):
+        """当前的配置快照，配置文件修改后自动重新加载"""
+        if self.reload_interval is not None:
+            self._reload_if_changed()
+        return self._snapshot
+    
+    def _reload_if_changed(self):
+        """按修改时间检查配置文件，文件变化时解析新快照并替换"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        
+        with self._reload_lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.reload_interval
+            try:
+                mtime_ns = os.stat(self.config_path).st_mtime_ns
+            except OSError:
+                return
+            if mtime_ns in (self._snapshot.mtime_ns, self._failed_mtime_ns):
+                return
+            
+            try:
+                snapshot = self._build_snapshot()
+            except (configparser.Error, ValueError) as e:
+                self._failed_mtime_ns = mtime_ns
+                self.logger.error(f"重新加载配置文件 {self.config_path} 失败，继续使用之前的配置: {str(e)}")
+                return
+            self._snapshot = snapshot
+            self.logger.info(f"配置文件 {self.config_path} 已修改，已重新加载")
+    
+    def _parse_credentials(self):
+        """解析登录凭证配置"""
         if not self.config.has_section('credentials'):
             self.logger.error("配置文件中缺少 'credentials' 部分")
             return {"email": "", "password": ""}
@@ -55,14 +152,17 @@ class ConfigLoader:
             "password": password
         }
     
-    def get_proxy_config(self):
-        """获取代理配置"""
+    def _parse_proxy(self):
+        """解析代理配置"""
         if not self.config.has_section('proxy'):
-            return {"enabled": False, "servers": [], "random": True}
+            return {"enabled": False, "servers": [], "random": True,
+                    "history_path": "data/proxy_history.jsonl", "history_flush_interval": 30.0}
         
         enabled = self.config.getboolean('proxy', 'enabled', fallback=False)
         servers_str = self.config.get('proxy', 'servers', fallback='')
         random_proxy = self.config.getboolean('proxy', 'random', fallback=True)
+        history_path = self.config.get('proxy', 'history_path', fallback='data/proxy_history.jsonl')
+        history_flush_interval = self.config.getfloat('proxy', 'history_flush_interval', fallback=30.0)
         
         # 解析代理服务器列表
         servers = [s.strip() for s in servers_str.split(',') if s.strip()]
@@ -70,11 +170,22 @@ class ConfigLoader:
         return {
             "enabled": enabled,
             "servers": servers,
-            "random": random_proxy
+            "random": random_proxy,
+            "history_path": history_path,
+            "history_flush_interval": history_flush_interval
         }
     
-    def get_user_agents(self):
-        """获取User-Agent配置"""
+    def _parse_proxy_health(self):
+        """解析代理健康检查配置"""
+        return {
+            "enabled": self.config.getboolean('proxy', 'health_check', fallback=True),
+            "ttl": self.config.getfloat('proxy', 'health_ttl', fallback=300),
+            "timeout": self.config.getfloat('proxy', 'health_timeout', fallback=5.0),
+            "check_target": self.config.get('proxy', 'health_check_target', fallback='mail.qq.com:443')
+        }
+    
+    def _parse_user_agents(self):
+        """解析User-Agent配置"""
         result = {}
         
         if self.config.has_section('user_agents'):
@@ -83,51 +194,200 @@ class ConfigLoader:
         
         return result
     
-    def get_test_scenarios(self):
-        """获取测试场景配置"""
+    def _parse_test_scenarios(self):
+        """解析测试场景配置"""
         if not self.config.has_section('test_scenarios'):
-            return {"normal_user": True, "high_risk_user": True, "new_device_user": True}
+            return {"normal_user": True, "high_risk_user": True, "new_device_user": True, "catalog_user": False}
         
         return {
             "normal_user": self.config.getboolean('test_scenarios', 'normal_user', fallback=True),
             "high_risk_user": self.config.getboolean('test_scenarios', 'high_risk_user', fallback=True),
-            "new_device_user": self.config.getboolean('test_scenarios', 'new_device_user', fallback=True)
+            "new_device_user": self.config.getboolean('test_scenarios', 'new_device_user', fallback=True),
+            "catalog_user": self.config.getboolean('test_scenarios', 'catalog_user', fallback=False)
         }
     
-    def get_behavior_config(self):
-        """获取人类行为模拟配置"""
+    def _parse_execution(self):
+        """解析测试执行引擎配置"""
+        if not self.config.has_section('execution'):
+            return {"engine": "sync", "concurrency": 3, "repetitions": 1, "fingerprint_seed": None}
+
+        # 留空时每次运行随机生成设备指纹，设置后可复现同一组指纹
+        seed = self.config.get('execution', 'fingerprint_seed', fallback='').strip()
+        return {
+            "engine": self.config.get('execution', 'engine', fallback='sync').strip().lower(),
+            "concurrency": max(1, self.config.getint('execution', 'concurrency', fallback=3)),
+            "repetitions": max(1, self.config.getint('execution', 'repetitions', fallback=1)),
+            "fingerprint_seed": int(seed) if seed else None
+        }
+
+    def _parse_login_url(self):
+        """解析登录页面地址"""
+        return self.config.get('target', 'login_url', fallback='https://mail.qq.com/')
+
+    def _parse_behavior(self):
+        """解析人类行为模拟配置"""
         if not self.config.has_section('behavior'):
             return {
                 "min_delay": 0.5,
                 "max_delay": 3.0,
                 "random_mouse": True,
-                "random_scroll": True
+                "random_scroll": True,
+                "time_scale": 1.0
             }
         
         return {
             "min_delay": self.config.getfloat('behavior', 'min_delay', fallback=0.5),
             "max_delay": self.config.getfloat('behavior', 'max_delay', fallback=3.0),
             "random_mouse": self.config.getboolean('behavior', 'random_mouse', fallback=True),
-            "random_scroll": self.config.getboolean('behavior', 'random_scroll', fallback=True)
+            "random_scroll": self.config.getboolean('behavior', 'random_scroll', fallback=True),
+            "time_scale": self.config.getfloat('behavior', 'time_scale', fallback=1.0)
         }
     
-    def get_logging_config(self):
-        """获取日志配置"""
+    def _parse_logging(self):
+        """解析日志配置"""
         if not self.config.has_section('logging'):
             return {
                 "level": "INFO",
                 "file_enabled": True,
-                "file_path": "data/logs/rba_test.log"
+                "file_path": "data/logs/rba_test.log",
+                "timing_enabled": True,
+                "timing_path": "data/timings/phase_timings.csv",
+                "results_backend": "sqlite",
+                "results_db_path": "data/results/results.db",
+                "queue_enabled": False,
+                "queue_size": 10000,
+                "rotate_max_mb": 0.0,
+                "rotate_when": "",
+                "rotate_compress": True,
+                "retention_budget_mb": 0.0
             }
         
         return {
             "level": self.config.get('logging', 'level', fallback='INFO'),
             "file_enabled": self.config.getboolean('logging', 'file_enabled', fallback=True),
-            "file_path": self.config.get('logging', 'file_path', fallback='data/logs/rba_test.log')
+            "file_path": self.config.get('logging', 'file_path', fallback='data/logs/rba_test.log'),
+            "timing_enabled": self.config.getboolean('logging', 'timing_enabled', fallback=True),
+            "timing_path": self.config.get('logging', 'timing_path', fallback='data/timings/phase_timings.csv'),
+            "results_backend": self.config.get('logging', 'results_backend', fallback='sqlite'),
+            "results_db_path": self.config.get('logging', 'results_db_path', fallback='data/results/results.db'),
+            "queue_enabled": self.config.getboolean('logging', 'queue_enabled', fallback=False),
+            "queue_size": self.config.getint('logging', 'queue_size', fallback=10000),
+            "rotate_max_mb": self.config.getfloat('logging', 'rotate_max_mb', fallback=0.0),
+            "rotate_when": self.config.get('logging', 'rotate_when', fallback=''),
+            "rotate_compress": self.config.getboolean('logging', 'rotate_compress', fallback=True),
+            "retention_budget_mb": self.config.getfloat('logging', 'retention_budget_mb', fallback=0.0)
         }
     
-    def get_dynamic_selectors(self):
-        """获取动态元素选择器配置"""
+    def _parse_browser(self):
+        """解析浏览器进程池配置"""
+        if not self.config.has_section('browser'):
+            return {
+                "headless": False,
+                "max_contexts_per_browser": 20
+            }
+
+        return {
+            "headless": self.config.getboolean('browser', 'headless', fallback=False),
+            "max_contexts_per_browser": self.config.getint('browser', 'max_contexts_per_browser', fallback=20)
+        }
+
+    def _parse_screenshots(self):
+        """解析截图配置"""
+        if not self.config.has_section('screenshots'):
+            return {
+                "policy": "always",
+                "format": "png",
+                "quality": 80,
+                "directory": "data/screenshots",
+                "budget_mb": 200.0,
+                "workers": 2
+            }
+
+        return {
+            "policy": self.config.get('screenshots', 'policy', fallback='always').strip().lower(),
+            "format": self.config.get('screenshots', 'format', fallback='png').strip().lower(),
+            "quality": self.config.getint('screenshots', 'quality', fallback=80),
+            "directory": self.config.get('screenshots', 'directory', fallback='data/screenshots'),
+            "budget_mb": self.config.getfloat('screenshots', 'budget_mb', fallback=200.0),
+            "workers": max(1, self.config.getint('screenshots', 'workers', fallback=2))
+        }
+
+    def _parse_experiment(self):
+        """解析因子实验配置"""
+        if not self.config.has_section('experiment'):
+            return {
+                "design": "fractional",
+                "foldover": False,
+                "replicates": 2,
+                "max_runs": 40,
+                "runs_per_hour": 20,
+                "min_interval": 60.0
+            }
+
+        return {
+            "design": self.config.get('experiment', 'design', fallback='fractional').strip().lower(),
+            "foldover": self.config.getboolean('experiment', 'foldover', fallback=False),
+            "replicates": max(1, self.config.getint('experiment', 'replicates', fallback=2)),
+            "max_runs": self.config.getint('experiment', 'max_runs', fallback=40),
+            "runs_per_hour": max(1, self.config.getint('experiment', 'runs_per_hour', fallback=20)),
+            "min_interval": self.config.getfloat('experiment', 'min_interval', fallback=60.0)
+        }
+
+    def _parse_login_cache(self):
+        """解析登录路径缓存配置"""
+        if not self.config.has_section('login_cache'):
+            return {
+                "enabled": True,
+                "path": "data/login_path_cache.json",
+                "probe_timeout": 3000,
+                "window": 20
+            }
+
+        return {
+            "enabled": self.config.getboolean('login_cache', 'enabled', fallback=True),
+            "path": self.config.get('login_cache', 'path', fallback='data/login_path_cache.json'),
+            "probe_timeout": self.config.getint('login_cache', 'probe_timeout', fallback=3000),
+            "window": self.config.getint('login_cache', 'window', fallback=20)
+        }
+
+    def _parse_device_catalog(self):
+        """解析设备画像目录的抽样条件，只保留非空的条件"""
+        if not self.config.has_section('device_catalog'):
+            return {}
+
+        criteria = {}
+        for key in ('platform', 'browser', 'device', 'locale', 'timezone_id'):
+            value = self.config.get('device_catalog', key, fallback='').strip()
+            if value:
+                criteria[key] = value
+        if self.config.get('device_catalog', 'is_mobile', fallback='').strip():
+            criteria['is_mobile'] = self.config.getboolean('device_catalog', 'is_mobile')
+        return criteria
+
+    def _parse_session(self):
+        """解析持久化会话配置"""
+        if not self.config.has_section('session'):
+            return {
+                "enabled": False,
+                "user_types": ["normal"],
+                "directory": "data/profiles",
+                "ttl_hours": 12.0,
+                "http_cache": True,
+                "logged_in_selector": "#mainFrame"
+            }
+
+        user_types = self.config.get('session', 'user_types', fallback='normal')
+        return {
+            "enabled": self.config.getboolean('session', 'enabled', fallback=False),
+            "user_types": [user_type.strip() for user_type in user_types.split(',') if user_type.strip()],
+            "directory": self.config.get('session', 'directory', fallback='data/profiles'),
+            "ttl_hours": self.config.getfloat('session', 'ttl_hours', fallback=12.0),
+            "http_cache": self.config.getboolean('session', 'http_cache', fallback=True),
+            "logged_in_selector": self.config.get('session', 'logged_in_selector', fallback='#mainFrame')
+        }
+
+    def _parse_dynamic_selectors(self):
+        """解析动态元素选择器配置"""
         if not self.config.has_section('dynamic_selectors'):
             return []
 
@@ -136,3 +396,127 @@ class ConfigLoader:
             selectors.append(value)
 
         return selectors
+
+    def get_credentials(self):
+        """获取登录凭证"""
+        return self.snapshot.credentials
+
+    def get_proxy_config(self):
+        """获取代理配置"""
+        return self.snapshot.proxy
+
+    def get_proxy_health_config(self):
+        """获取代理健康检查配置"""
+        return self.snapshot.proxy_health
+
+    def get_user_agents(self):
+        """获取User-Agent配置"""
+        return self.snapshot.user_agents
+
+    def get_test_scenarios(self):
+        """获取测试场景配置"""
+        return self.snapshot.test_scenarios
+
+    def get_execution_config(self):
+        """获取测试执行引擎配置"""
+        return self.snapshot.execution
+
+    def get_login_url(self):
+        """获取登录页面地址"""
+        return self.snapshot.login_url
+
+    def get_behavior_config(self):
+        """获取人类行为模拟配置"""
+        return self.snapshot.behavior
+
+    def get_logging_config(self):
+        """获取日志配置"""
+        return self.snapshot.logging
+
+    def get_browser_config(self):
+        """获取浏览器进程池配置"""
+        return self.snapshot.browser
+
+    def get_screenshot_config(self):
+        """获取截图配置"""
+        return self.snapshot.screenshots
+
+    def get_experiment_config(self):
+        """获取因子实验配置"""
+        return self.snapshot.experiment
+
+    def get_login_cache_config(self):
+        """获取登录路径缓存配置"""
+        return self.snapshot.login_cache
+
+    def get_device_catalog_config(self):
+        """获取设备画像目录的抽样条件"""
+        return self.snapshot.device_catalog
+
+    def get_session_config(self):
+        """获取持久化会话配置"""
+        return self.snapshot.session
+
+    def get_dynamic_selectors(self):
+        """获取动态元素选择器配置"""
+        return self.snapshot.dynamic_selectors
+
+    def validate(self):
+        """
+        检查配置项的取值，不启动浏览器也不访问网络
+
+        Returns:
+            问题描述列表，配置无误时为空列表
+        """
+        problems = []
+        # 逐项重新解析，而不是读取快照，以便报告所有有问题的配置项
+        sections = {}
+        for field in fields(ConfigSnapshot):
+            if field.name in ('path', 'mtime_ns'):
+                continue
+            try:
+                sections[field.name] = getattr(self, f"_parse_{field.name}")()
+            except ValueError as e:
+                problems.append(f"{field.name}: {str(e)}")
+
+        credentials = sections.get('credentials')
+        if credentials is not None and (not (credentials['email'] and credentials['password'])
+                                        or credentials['email'] == 'your_test_email@qq.com'):
+            problems.append("credentials: 没有配置测试账号")
+
+        choices = [
+            ('execution', 'engine', ('sync', 'async')),
+            ('logging', 'results_backend', ('sqlite', 'json', 'both')),
+            ('logging', 'rotate_when', ('', 'H', 'D', 'midnight')),
+            ('screenshots', 'policy', ('always', 'on_failure', 'off')),
+            ('screenshots', 'format', ('png', 'jpeg')),
+            ('experiment', 'design', ('fractional', 'ofat')),
+        ]
+        for name, key, allowed in choices:
+            section = sections.get(name)
+            if section is not None and section[key] not in allowed:
+                problems.append(f"{name}: {key} = {section[key]!r} 不在可选值 {', '.join(map(repr, allowed))} 中")
+
+        behavior = sections.get('behavior')
+        if behavior is not None and behavior['min_delay'] > behavior['max_delay']:
+            problems.append("behavior: min_delay 大于 max_delay")
+
+        screenshots = sections.get('screenshots')
+        if screenshots is not None and not 0 <= screenshots['quality'] <= 100:
+            problems.append("screenshots: quality 应在 0-100 之间")
+
+        session = sections.get('session')
+        if session is not None and session['ttl_hours'] <= 0:
+            problems.append("session: ttl_hours 应大于0")
+
+        scenarios = sections.get('test_scenarios')
+        device_catalog = sections.get('device_catalog')
+        if scenarios is not None and scenarios['catalog_user'] and device_catalog is not None:
+            from device_catalog import load_catalog
+            try:
+                if not load_catalog().select(**device_catalog):
+                    problems.append(f"device_catalog: 没有满足条件的设备画像: {dict(device_catalog)}")
+            except (OSError, ValueError) as e:
+                problems.append(f"device_catalog: {str(e)}")
+
+        return problems
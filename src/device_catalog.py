@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""设备画像目录
+
+从数据文件加载数千个特征一致的设备画像（User-Agent、平台、分辨率、触摸屏、语言和时区），
+按各属性建立倒排索引，"所有 zh-CN 的 Android 设备"这样的查询只需取索引的交集；
+按画像的权重用 Vose 别名表抽样，每次抽样的耗时与目录大小无关。
+
+数据文件 config/device_catalog.json 由本模块根据设备、浏览器和地区的占比生成：
+    python src/device_catalog.py build
+    python src/device_catalog.py stats
+    python src/device_catalog.py sample --platform Android --locale zh-CN -n 5
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+from collections import Counter
+
+from device_fingerprint import Fingerprint
+
+DEFAULT_CATALOG_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'device_catalog.json')
+)
+
+# 数据文件中每个画像的列，user_agent 为 user_agents 列表中的下标
+CATALOG_COLUMNS = (
+    "device", "platform", "browser", "user_agent", "viewport",
+    "has_touch", "is_mobile", "locale", "timezone_id", "weight"
+)
+
+# 可用于查询的属性
+INDEXED_ATTRIBUTES = (
+    "device", "platform", "browser", "viewport", "has_touch", "is_mobile", "locale", "timezone_id"
+)
+
+# ---- 生成数据文件使用的设备、浏览器和地区占比 ----
+
+# (设备, 平台, 占比, 是否触摸屏, 是否移动设备, [(分辨率, 占比)])
+DEVICES = (
+    ("Windows PC", "Windows", 30, False, False, [
+        ((1920, 1080), 40), ((1366, 768), 15), ((1536, 864), 14), ((2560, 1440), 10),
+        ((1440, 900), 6), ((1600, 900), 6), ((1280, 720), 5), ((3840, 2160), 4)
+    ]),
+    ("Windows Touch Laptop", "Windows", 4, True, False, [((1280, 800), 50), ((1536, 864), 50)]),
+    ("Mac", "MacOS", 10, False, False, [
+        ((1440, 900), 30), ((1512, 982), 25), ((1728, 1117), 15), ((1680, 1050), 15), ((2560, 1440), 15)
+    ]),
+    ("Linux PC", "Linux", 2, False, False, [((1920, 1080), 70), ((1366, 768), 30)]),
+    ("iPhone SE", "iOS", 2, True, True, [((375, 667), 100)]),
+    ("iPhone 11", "iOS", 3, True, True, [((414, 896), 100)]),
+    ("iPhone 13", "iOS", 6, True, True, [((390, 844), 100)]),
+    ("iPhone 14 Pro Max", "iOS", 4, True, True, [((430, 932), 100)]),
+    ("iPhone 15 Pro", "iOS", 5, True, True, [((393, 852), 100)]),
+    ("iPad", "iOS", 3, True, True, [((820, 1180), 60), ((768, 1024), 25), ((1024, 1366), 15)]),
+    ("Samsung Galaxy S23", "Android", 4, True, True, [((360, 780), 100)]),
+    ("Samsung Galaxy A54", "Android", 3, True, True, [((384, 854), 100)]),
+    ("Google Pixel 7", "Android", 2, True, True, [((412, 915), 100)]),
+    ("Xiaomi 13", "Android", 5, True, True, [((393, 873), 100)]),
+    ("HUAWEI Mate 40", "Android", 5, True, True, [((360, 780), 100)]),
+    ("OPPO Reno9", "Android", 3, True, True, [((412, 915), 100)]),
+    ("vivo X90", "Android", 3, True, True, [((393, 851), 100)]),
+    ("Android Tablet", "Android", 1, True, True, [((800, 1280), 100)]),
+)
+
+# Android 设备的系统版本和型号（三星浏览器仍在 User-Agent 中携带型号）
+ANDROID_MODELS = {
+    "Samsung Galaxy S23": ("14", "SM-S911B"),
+    "Samsung Galaxy A54": ("14", "SM-A546B"),
+    "Google Pixel 7": ("14", "Pixel 7"),
+    "Xiaomi 13": ("13", "2211133C"),
+    "HUAWEI Mate 40": ("12", "NOH-AN00"),
+    "OPPO Reno9": ("13", "PHM110"),
+    "vivo X90": ("13", "V2241A"),
+    "Android Tablet": ("13", "SM-X200"),
+}
+
+CHROME_VERSIONS = ("120", "122", "124", "126")
+FIREFOX_VERSIONS = ("123", "125", "127")
+SAFARI_VERSIONS = (("16_6", "16.6"), ("17_4", "17.4"), ("17_5", "17.5"))
+
+def _browsers(device, platform):
+    """
+    设备上的浏览器及其 User-Agent
+
+    Returns:
+        [(浏览器, User-Agent, 占比)]
+    """
+    if platform == "Windows":
+        return (
+            [("Chrome", f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                        f"Chrome/{v}.0.0.0 Safari/537.36", 65 / len(CHROME_VERSIONS)) for v in CHROME_VERSIONS]
+            + [("Edge", f"Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                        f"Chrome/{v}.0.0.0 Safari/537.36 Edg/{v}.0.0.0", 25 / len(CHROME_VERSIONS)) for v in CHROME_VERSIONS]
+            + [("Firefox", f"Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:{v}.0) Gecko/20100101 Firefox/{v}.0",
+                10 / len(FIREFOX_VERSIONS)) for v in FIREFOX_VERSIONS]
+        )
+    if platform == "MacOS":
+        return (
+            [("Safari", f"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+                        f"Version/{v} Safari/605.1.15", 45 / len(SAFARI_VERSIONS)) for _, v in SAFARI_VERSIONS]
+            + [("Chrome", f"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+                          f"Chrome/{v}.0.0.0 Safari/537.36", 45 / len(CHROME_VERSIONS)) for v in CHROME_VERSIONS]
+            + [("Firefox", f"Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:{v}.0) Gecko/20100101 Firefox/{v}.0",
+                10 / len(FIREFOX_VERSIONS)) for v in FIREFOX_VERSIONS]
+        )
+    if platform == "Linux":
+        return (
+            [("Chrome", f"Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                        f"Chrome/{v}.0.0.0 Safari/537.36", 60 / len(CHROME_VERSIONS)) for v in CHROME_VERSIONS]
+            + [("Firefox", f"Mozilla/5.0 (X11; Linux x86_64; rv:{v}.0) Gecko/20100101 Firefox/{v}.0",
+                40 / len(FIREFOX_VERSIONS)) for v in FIREFOX_VERSIONS]
+        )
+    if platform == "iOS":
+        # iPad 上的 Safari 默认请求桌面版网站，这里使用移动版的 User-Agent
+        prefix = "iPad; CPU OS" if device == "iPad" else "iPhone; CPU iPhone OS"
+        return (
+            [("Safari", f"Mozilla/5.0 ({prefix} {os_version} like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+                        f"Version/{version} Mobile/15E148 Safari/604.1", 85 / len(SAFARI_VERSIONS))
+             for os_version, version in SAFARI_VERSIONS]
+            + [("Chrome", f"Mozilla/5.0 ({prefix} 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) "
+                          f"CriOS/{v}.0.0.0 Mobile/15E148 Safari/604.1", 15 / len(CHROME_VERSIONS)) for v in CHROME_VERSIONS]
+        )
+    # Android：Chrome 的 User-Agent 已精简为固定的系统版本和型号
+    android_version, model = ANDROID_MODELS[device]
+    mobile = "" if device == "Android Tablet" else "Mobile "
+    browsers = [
+        ("Chrome", f"Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) "
+                   f"Chrome/{v}.0.0.0 {mobile}Safari/537.36", 80 / len(CHROME_VERSIONS)) for v in CHROME_VERSIONS
+    ]
+    if model.startswith("SM-"):
+        browsers.append(("Samsung Internet", f"Mozilla/5.0 (Linux; Android {android_version}; {model}) "
+                                             f"AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/24.0 "
+                                             f"Chrome/117.0.0.0 {mobile}Safari/537.36", 20))
+    else:
+        # 国内厂商的自带浏览器占比较高，此处以携带型号的 WebView User-Agent 表示
+        browsers.append(("WebView", f"Mozilla/5.0 (Linux; Android {android_version}; {model}; wv) "
+                                    f"AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/116.0.0.0 "
+                                    f"{mobile}Safari/537.36", 20))
+    return browsers
+
+# (语言, 时区, 占比)
+LOCALES = (
+    ("zh-CN", "Asia/Shanghai", 55),
+    ("zh-CN", "Asia/Chongqing", 3),
+    ("zh-CN", "Asia/Singapore", 2),
+    ("zh-CN", "America/Los_Angeles", 1),
+    ("zh-HK", "Asia/Hong_Kong", 3),
+    ("zh-TW", "Asia/Taipei", 3),
+    ("en-US", "America/New_York", 5),
+    ("en-US", "America/Chicago", 2),
+    ("en-US", "America/Los_Angeles", 4),
+    ("en-GB", "Europe/London", 3),
+    ("en-SG", "Asia/Singapore", 2),
+    ("en-AU", "Australia/Sydney", 1),
+    ("en-CA", "America/Toronto", 1),
+    ("ja-JP", "Asia/Tokyo", 3),
+    ("ko-KR", "Asia/Seoul", 2),
+    ("de-DE", "Europe/Berlin", 2),
+    ("fr-FR", "Europe/Paris", 2),
+    ("es-ES", "Europe/Madrid", 1),
+    ("ru-RU", "Europe/Moscow", 1),
+    ("pt-BR", "America/Sao_Paulo", 1),
+    ("th-TH", "Asia/Bangkok", 1),
+    ("vi-VN", "Asia/Ho_Chi_Minh", 1),
+)
+
+def generate_catalog():
+    """
+    按设备、浏览器和地区的占比生成设备画像目录，相同的输入总是得到相同的结果
+
+    Returns:
+        数据文件的内容字典
+    """
+    user_agents = []
+    ua_index = {}
+    profiles = []
+    device_total = sum(device[2] for device in DEVICES)
+    locale_total = sum(weight for _, _, weight in LOCALES)
+    for device, platform, device_weight, has_touch, is_mobile, viewports in DEVICES:
+        viewport_total = sum(weight for _, weight in viewports)
+        browsers = _browsers(device, platform)
+        browser_total = sum(weight for _, _, weight in browsers)
+        for viewport, viewport_weight in viewports:
+            for browser, user_agent, browser_weight in browsers:
+                if user_agent not in ua_index:
+                    ua_index[user_agent] = len(user_agents)
+                    user_agents.append(user_agent)
+                for locale, timezone_id, locale_weight in LOCALES:
+                    weight = (device_weight / device_total * viewport_weight / viewport_total
+                              * browser_weight / browser_total * locale_weight / locale_total)
+                    profiles.append([
+                        device, platform, browser, ua_index[user_agent], list(viewport),
+                        has_touch, is_mobile, locale, timezone_id, round(weight * 1e6, 3)
+                    ])
+    return {
+        "version": 1,
+        "generated_by": "python src/device_catalog.py build",
+        "columns": list(CATALOG_COLUMNS),
+        "user_agents": user_agents,
+        "profiles": profiles
+    }
+
+def write_catalog(catalog, path=DEFAULT_CATALOG_PATH):
+    """保存数据文件，每个画像占一行，便于比较不同版本的差异"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("{\n")
+        for key in ("version", "generated_by", "columns"):
+            f.write(f"  {json.dumps(key)}: {json.dumps(catalog[key], ensure_ascii=False)},\n")
+        f.write('  "user_agents": [\n')
+        f.write(",\n".join(f"    {json.dumps(ua)}" for ua in catalog["user_agents"]))
+        f.write('\n  ],\n  "profiles": [\n')
+        f.write(",\n".join(f"    {json.dumps(row, ensure_ascii=False)}" for row in catalog["profiles"]))
+        f.write("\n  ]\n}\n")
+
+class AliasSampler:
+    """Vose 别名表加权抽样：建表 O(n)，每次抽样 O(1)"""
+
+    def __init__(self, weights):
+        """
+        Args:
+            weights: 非负权重序列，至少有一个正权重
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("抽样权重不能为空且总和必须大于0")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("抽样权重不能为负数")
+
+        self.size = n
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 剩余的列只因浮点误差偏离1
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def sample(self, rng=random):
+        """抽取一个下标"""
+        column = int(rng.random() * self.size)
+        return column if rng.random() < self.prob[column] else self.alias[column]
+
+class DeviceCatalog:
+    """设备画像目录，画像为 Fingerprint，按属性建立索引并支持加权抽样"""
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: 画像字典列表，键为 CATALOG_COLUMNS（user_agent 为字符串，viewport 为 (宽, 高)）
+        """
+        self.rows = []
+        self.profiles = []
+        self.weights = []
+        # {属性: {取值: 画像下标元组}}
+        self.index = {attribute: {} for attribute in INDEXED_ATTRIBUTES}
+        for position, row in enumerate(rows):
+            row = dict(row, viewport=tuple(row["viewport"]))
+            self.rows.append(row)
+            self.profiles.append(Fingerprint(
+                viewport=row["viewport"],
+                user_agent=row["user_agent"],
+                timezone_id=row["timezone_id"],
+                locale=row["locale"],
+                has_touch=row["has_touch"],
+                is_mobile=row["is_mobile"],
+                platform=row["platform"],
+                user_type="catalog"
+            ))
+            self.weights.append(row["weight"])
+            for attribute in INDEXED_ATTRIBUTES:
+                self.index[attribute].setdefault(row[attribute], []).append(position)
+        for values in self.index.values():
+            for value, positions in values.items():
+                values[value] = tuple(positions)
+        self._selections = {}
+        self._samplers = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_CATALOG_PATH):
+        """从数据文件加载目录"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        columns = data["columns"]
+        user_agents = data["user_agents"]
+        rows = []
+        for values in data["profiles"]:
+            row = dict(zip(columns, values))
+            row["user_agent"] = user_agents[row["user_agent"]]
+            rows.append(row)
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def values(self, attribute):
+        """某个属性的所有取值"""
+        return sorted(self.index[attribute], key=str)
+
+    @staticmethod
+    def _key(criteria):
+        """查询条件的缓存键，视口统一为元组"""
+        if "viewport" in criteria:
+            criteria = dict(criteria, viewport=tuple(criteria["viewport"]))
+        return tuple(sorted(criteria.items()))
+
+    def select(self, **criteria):
+        """
+        查询满足所有条件的画像下标
+
+        Args:
+            criteria: 属性=取值，属性见 INDEXED_ATTRIBUTES
+
+        Returns:
+            按目录顺序排列的画像下标元组
+        """
+        key = self._key(criteria)
+        if key in self._selections:
+            return self._selections[key]
+        for attribute, value in key:
+            if attribute not in self.index:
+                raise ValueError(f"不支持按 {attribute} 查询设备画像，可用的属性: {', '.join(INDEXED_ATTRIBUTES)}")
+        if not key:
+            positions = tuple(range(len(self.profiles)))
+        else:
+            # 从最小的索引开始取交集
+            candidates = sorted((self.index[attribute].get(value, ()) for attribute, value in key), key=len)
+            selected = set(candidates[0])
+            for positions in candidates[1:]:
+                selected.intersection_update(positions)
+            positions = tuple(sorted(selected))
+        self._selections[key] = positions
+        return positions
+
+    def find(self, **criteria):
+        """查询满足所有条件的画像，参数同 select"""
+        return [self.profiles[position] for position in self.select(**criteria)]
+
+    def sampler(self, **criteria):
+        """满足条件的画像的别名表，按条件缓存"""
+        key = self._key(criteria)
+        if key not in self._samplers:
+            positions = self.select(**criteria)
+            if not positions:
+                raise ValueError(f"没有满足条件的设备画像: {criteria}")
+            self._samplers[key] = (positions, AliasSampler([self.weights[position] for position in positions]))
+        return self._samplers[key]
+
+    def sample(self, rng=random, **criteria):
+        """
+        按权重抽取一个满足条件的画像
+
+        Args:
+            rng: 随机数生成器（random 模块或 random.Random 实例）
+            criteria: 查询条件，参数同 select
+
+        Returns:
+            Fingerprint
+        """
+        positions, sampler = self.sampler(**criteria)
+        return self.profiles[positions[sampler.sample(rng)]]
+
+@functools.lru_cache(maxsize=8)
+def load_catalog(path=DEFAULT_CATALOG_PATH):
+    """加载并缓存设备画像目录，同一路径只解析一次"""
+    return DeviceCatalog.load(path)
+
+def _criteria(args):
+    """命令行参数中的查询条件"""
+    criteria = {}
+    for attribute in ("platform", "browser", "device", "locale", "timezone_id"):
+        value = getattr(args, attribute)
+        if value:
+            criteria[attribute] = value
+    if args.mobile is not None:
+        criteria["is_mobile"] = args.mobile == "yes"
+    return criteria
+
+def main(argv=None):
+    """命令行入口：生成数据文件、统计或抽样"""
+    parser = argparse.ArgumentParser(description="设备画像目录")
+    parser.add_argument('command', choices=('build', 'stats', 'sample'), help="生成数据文件、统计各属性或按条件抽样")
+    parser.add_argument('--path', default=DEFAULT_CATALOG_PATH, help="数据文件路径")
+    parser.add_argument('--platform', help="平台，如 Windows、MacOS、Linux、Android、iOS")
+    parser.add_argument('--browser', help="浏览器，如 Chrome、Safari、Edge")
+    parser.add_argument('--device', help="设备，如 iPhone 13")
+    parser.add_argument('--locale', help="语言，如 zh-CN")
+    parser.add_argument('--timezone-id', dest='timezone_id', help="时区，如 Asia/Shanghai")
+    parser.add_argument('--mobile', choices=('yes', 'no'), help="只查询移动设备或桌面设备")
+    parser.add_argument('-n', type=int, default=5, help="抽样的画像数量")
+    parser.add_argument('--seed', type=int, help="抽样使用的随机种子")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        catalog = generate_catalog()
+        write_catalog(catalog, args.path)
+        print(f"已生成 {len(catalog['profiles'])} 个设备画像: {args.path}")
+        return
+
+    catalog = load_catalog(args.path)
+    criteria = _criteria(args)
+    positions = catalog.select(**criteria)
+    print(f"共 {len(catalog)} 个设备画像，满足条件的 {len(positions)} 个")
+    if args.command == 'stats':
+        for attribute in ("platform", "browser", "device", "locale"):
+            counts = Counter(catalog.rows[position][attribute] for position in positions)
+            print(f"{attribute}: " + ", ".join(f"{value}={count}" for value, count in counts.most_common()))
+        return
+
+    rng = random.Random(args.seed)
+    for _ in range(args.n):
+        profile = catalog.sample(rng, **criteria)
+        print(f"{profile.platform:<8} {profile.viewport[0]}x{profile.viewport[1]:<5} {profile.locale:<6} "
+              f"{profile.timezone_id:<20} {profile.user_agent}")
+
+if __name__ == "__main__":
+    main()
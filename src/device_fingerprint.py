@@ -1,180 +1,275 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import functools
+import hashlib
 import random
 import json
-from faker import Faker
+from dataclasses import dataclass, field, replace
+from typing import Optional, Tuple
+
+# 预定义一些常用的分辨率 (宽, 高)
+COMMON_RESOLUTIONS = (
+    (1366, 768),   # 常见笔记本
+    (1920, 1080),  # 全高清显示器
+    (2560, 1440),  # QHD显示器
+    (3840, 2160),  # 4K显示器
+    (375, 812),    # iPhone X/XS/11 Pro
+    (414, 896),    # iPhone XR/11
+    (360, 740),    # 常见安卓手机
+    (768, 1024),   # iPad
+)
+
+COMMON_TIMEZONES = (
+    "Asia/Shanghai",     # 中国
+    "Asia/Tokyo",        # 日本
+    "Asia/Singapore",    # 新加坡
+    "Europe/London",     # 英国
+    "Europe/Paris",      # 法国
+    "America/New_York",  # 美国东部
+    "America/Los_Angeles"  # 美国西部
+)
+
+@dataclass(frozen=True, slots=True)
+class Fingerprint:
+    """不可变的设备指纹
+
+    content_hash 只由指纹内容决定（不含 user_type 和 seed），
+    可以作为结果存储和缓存中的键；内容相同的指纹相等。
+    """
+    viewport: Tuple[int, int]
+    user_agent: str
+    timezone_id: str
+    locale: str
+    color_scheme: str = "no-preference"
+    reduced_motion: str = "no-preference"
+    has_touch: bool = False
+    is_mobile: bool = False
+    platform: str = "Windows"
+    cookies_enabled: bool = True
+    # 生成该指纹的用户类型和随机种子，不参与比较和哈希
+    user_type: Optional[str] = field(default=None, compare=False)
+    seed: Optional[int] = field(default=None, compare=False)
+    content_hash: str = field(init=False, compare=False)
+
+    CONTENT_FIELDS = (
+        "viewport", "user_agent", "timezone_id", "locale", "color_scheme",
+        "reduced_motion", "has_touch", "is_mobile", "platform", "cookies_enabled"
+    )
+
+    def __post_init__(self):
+        content = json.dumps([getattr(self, name) for name in self.CONTENT_FIELDS], ensure_ascii=False)
+        object.__setattr__(self, "content_hash", hashlib.sha1(content.encode("utf-8")).hexdigest()[:16])
+
+    @property
+    def viewport_size(self):
+        """Playwright格式的视口大小"""
+        return {"width": self.viewport[0], "height": self.viewport[1]}
+
+    def to_dict(self):
+        """转换为旧版的字典格式"""
+        result = {name: getattr(self, name) for name in self.CONTENT_FIELDS}
+        result["viewport"] = self.viewport_size
+        return result
+
+def _normal_user(rng):
+    """正常用户的设备指纹（固定的设备特征）"""
+    return Fingerprint(
+        viewport=COMMON_RESOLUTIONS[1],  # 1920x1080
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        timezone_id="Asia/Shanghai",
+        locale="zh-CN",
+        platform="Windows"
+    )
+
+def _high_risk_user(rng):
+    """高风险用户的设备指纹（不常见特征组合）"""
+    # 随机选择一些不太常见的特性
+    viewport = rng.choice(COMMON_RESOLUTIONS[2:])  # 选择较不常见的分辨率
+    timezone = rng.choice(COMMON_TIMEZONES[1:])  # 非中国时区
+
+    # 随机选择模拟的平台
+    platform = rng.choice(["Linux", "Android", "iOS", "MacOS"])
+
+    if platform == "Android" or platform == "iOS":
+        is_mobile = True
+        has_touch = True
+        # 移动设备UA
+        if platform == "Android":
+            user_agent = "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.101 Mobile Safari/537.36"
+        else:
+            user_agent = "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1"
+    else:
+        is_mobile = False
+        has_touch = rng.choice([True, False])  # 电脑可能有触摸屏
+        # 桌面设备UA
+        if platform == "Linux":
+            user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36"
+        else:  # MacOS
+            user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Safari/605.1.15"
+
+    return Fingerprint(
+        viewport=viewport,
+        user_agent=user_agent,
+        timezone_id=timezone,
+        locale=rng.choice(["en-US", "fr-FR", "de-DE", "ja-JP"]),
+        color_scheme=rng.choice(["no-preference", "dark", "light"]),
+        reduced_motion=rng.choice(["no-preference", "reduce"]),
+        has_touch=has_touch,
+        is_mobile=is_mobile,
+        platform=platform
+    )
+
+def _new_device_user(rng):
+    """新设备用户的设备指纹（有合理但与标准设备不同的特征）"""
+    return Fingerprint(
+        viewport=rng.choice(COMMON_RESOLUTIONS[:4]),  # 桌面分辨率
+        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",  # 较新版本
+        timezone_id="Asia/Shanghai",  # 保持中国时区
+        locale="zh-CN",
+        platform="Windows"
+    )
+
+def _catalog_user(rng, catalog_filter=()):
+    """从设备画像目录中按权重抽取的设备指纹，目录只在第一次使用时加载"""
+    from device_catalog import load_catalog
+    return load_catalog().sample(rng, **dict(catalog_filter))
+
+_GENERATORS = {
+    "normal": _normal_user,
+    "high_risk": _high_risk_user,
+    "new_device": _new_device_user,
+    "catalog": _catalog_user,
+}
+
+@functools.lru_cache(maxsize=1024)
+def generate_fingerprint(user_type="normal", seed=0, catalog_filter=()):
+    """
+    按用户类型和随机种子生成设备指纹，相同参数总是返回同一个指纹对象
+
+    Args:
+        user_type: 用户类型，可选值为 "normal", "high_risk", "new_device", "catalog"，其他值按 normal 处理
+        seed: 随机种子
+        catalog_filter: catalog 类型的查询条件，((属性, 取值), ...) 形式，见 device_catalog.DeviceCatalog.select
+
+    Returns:
+        Fingerprint
+    """
+    # 以字符串作为种子，不同用户类型使用同一个种子时互不相关，且结果不受 PYTHONHASHSEED 影响
+    rng = random.Random(f"{user_type}:{seed}")
+    if user_type == "catalog":
+        fingerprint = _catalog_user(rng, catalog_filter)
+    else:
+        fingerprint = _GENERATORS.get(user_type, _normal_user)(rng)
+    return replace(fingerprint, user_type=user_type, seed=seed)
 
 class DeviceFingerprint:
-    """设备指纹生成和管理工具，用于模拟不同设备特征"""
-    
-    def __init__(self):
-        self.faker = Faker()
-        # 预定义一些常用的分辨率
-        self.common_resolutions = [
-            {"width": 1366, "height": 768},  # 常见笔记本
-            {"width": 1920, "height": 1080},  # 全高清显示器
-            {"width": 2560, "height": 1440},  # QHD显示器
-            {"width": 3840, "height": 2160},  # 4K显示器
-            {"width": 375, "height": 812},    # iPhone X/XS/11 Pro
-            {"width": 414, "height": 896},    # iPhone XR/11
-            {"width": 360, "height": 740},    # 常见安卓手机
-            {"width": 768, "height": 1024},   # iPad
-        ]
-        self.common_timezones = [
-            "Asia/Shanghai",     # 中国
-            "Asia/Tokyo",        # 日本
-            "Asia/Singapore",    # 新加坡
-            "Europe/London",     # 英国
-            "Europe/Paris",      # 法国
-            "America/New_York",  # 美国东部
-            "America/Los_Angeles"  # 美国西部
-        ]
-        
+    """设备指纹生成和管理工具，用于模拟不同设备特征
+
+    同一个实例对同一用户类型总是返回相同的指纹；记录 seed 即可复现一次运行使用的指纹。
+    """
+
+    def __init__(self, seed=None, catalog_filter=None):
+        """
+        初始化设备指纹生成器
+
+        Args:
+            seed: 随机种子，未提供时由 random 模块生成（设置 random.seed 时同样可以复现）
+            catalog_filter: catalog 类型从设备画像目录中抽样时的查询条件，如 {"platform": "Android"}
+        """
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.catalog_filter = tuple(sorted((catalog_filter or {}).items()))
+        self._faker = None
+        self.common_resolutions = [{"width": width, "height": height} for width, height in COMMON_RESOLUTIONS]
+        self.common_timezones = list(COMMON_TIMEZONES)
+
+    @property
+    def faker(self):
+        """Faker实例，加载Faker的数据较慢，第一次使用时才创建"""
+        if self._faker is None:
+            from faker import Faker
+            self._faker = Faker()
+        return self._faker
+
     def generate_normal_user(self):
         """生成正常用户的设备指纹（固定的设备特征）"""
-        fingerprint = {
-            "viewport": self.common_resolutions[1],  # 1920x1080
-            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "timezone_id": "Asia/Shanghai",
-            "locale": "zh-CN",
-            "color_scheme": "no-preference",
-            "reduced_motion": "no-preference",
-            "has_touch": False,
-            "is_mobile": False,
-            "platform": "Windows",
-            "cookies_enabled": True
-        }
-        return fingerprint
-    
+        return generate_fingerprint("normal", self.seed)
+
     def generate_high_risk_user(self):
         """生成高风险用户的设备指纹（不常见特征组合）"""
-        # 随机选择一些不太常见的特性
-        viewport = random.choice(self.common_resolutions[2:])  # 选择较不常见的分辨率
-        timezone = random.choice(self.common_timezones[1:])  # 非中国时区
-        
-        # 随机选择模拟的平台
-        platform = random.choice(["Linux", "Android", "iOS", "MacOS"])
-        
-        if platform == "Android" or platform == "iOS":
-            is_mobile = True
-            has_touch = True
-            # 移动设备UA
-            if platform == "Android":
-                user_agent = "Mozilla/5.0 (Linux; Android 10; SM-G973F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.101 Mobile Safari/537.36"
-            else:
-                user_agent = "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1"
-        else:
-            is_mobile = False
-            has_touch = random.choice([True, False])  # 电脑可能有触摸屏
-            # 桌面设备UA
-            if platform == "Linux":
-                user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.159 Safari/537.36"
-            else:  # MacOS
-                user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Safari/605.1.15"
-        
-        fingerprint = {
-            "viewport": viewport,
-            "user_agent": user_agent,
-            "timezone_id": timezone,
-            "locale": random.choice(["en-US", "fr-FR", "de-DE", "ja-JP"]),
-            "color_scheme": random.choice(["no-preference", "dark", "light"]),
-            "reduced_motion": random.choice(["no-preference", "reduce"]),
-            "has_touch": has_touch,
-            "is_mobile": is_mobile,
-            "platform": platform,
-            "cookies_enabled": True
-        }
-        return fingerprint
-    
+        return generate_fingerprint("high_risk", self.seed)
+
     def generate_new_device_user(self):
         """生成新设备用户的指纹（有合理但与标准设备不同的特征）"""
-        # 随机选择一个合理的分辨率
-        viewport = random.choice(self.common_resolutions[:4])  # 桌面分辨率
-        
-        fingerprint = {
-            "viewport": viewport,
-            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36",  # 较新版本
-            "timezone_id": "Asia/Shanghai",  # 保持中国时区
-            "locale": "zh-CN",
-            "color_scheme": "no-preference",
-            "reduced_motion": "no-preference",
-            "has_touch": False,
-            "is_mobile": False,
-            "platform": "Windows",
-            "cookies_enabled": True
-        }
-        return fingerprint
-    
+        return generate_fingerprint("new_device", self.seed)
+
     def get_device_fingerprint(self, user_type="normal"):
         """
         获取指定用户类型的设备指纹
-        
+
         Args:
-            user_type: 用户类型，可选值为 "normal", "high_risk", "new_device"
-            
+            user_type: 用户类型，可选值为 "normal", "high_risk", "new_device", "catalog"
+
         Returns:
-            字典形式的设备指纹
+            Fingerprint
         """
-        if user_type == "high_risk":
-            return self.generate_high_risk_user()
-        elif user_type == "new_device":
-            return self.generate_new_device_user()
-        else:  # 默认为normal
-            return self.generate_normal_user()
-    
+        if user_type not in _GENERATORS:  # 默认为normal
+            user_type = "normal"
+        if user_type == "catalog":
+            return generate_fingerprint(user_type, self.seed, self.catalog_filter)
+        return generate_fingerprint(user_type, self.seed)
+
     def get_browser_args(self, user_type="normal"):
         """
         获取浏览器启动参数
-        
+
         Args:
             user_type: 用户类型，可选值为 "normal", "high_risk", "new_device"
-            
+
         Returns:
             浏览器启动参数字典
         """
         fingerprint = self.get_device_fingerprint(user_type)
-        
-        # 提取用户代理
-        user_agent = fingerprint.get("user_agent", "")
-        
+
         # 构造浏览器参数
         browser_args = []
-        if user_agent:
-            browser_args.append(f"--user-agent={user_agent}")
-        
+        if fingerprint.user_agent:
+            browser_args.append(f"--user-agent={fingerprint.user_agent}")
+
         return {
-            "viewport": fingerprint.get("viewport"),
-            "user_agent": user_agent,
-            "timezone_id": fingerprint.get("timezone_id"),
-            "locale": fingerprint.get("locale"),
-            "color_scheme": fingerprint.get("color_scheme"),
-            "reduced_motion": fingerprint.get("reduced_motion"),
+            "viewport": fingerprint.viewport_size,
+            "user_agent": fingerprint.user_agent,
+            "timezone_id": fingerprint.timezone_id,
+            "locale": fingerprint.locale,
+            "color_scheme": fingerprint.color_scheme,
+            "reduced_motion": fingerprint.reduced_motion,
             "args": browser_args
         }
-    
-    def create_browser_context_options(self, user_type="normal"):
+
+    def create_browser_context_options(self, user_type="normal", fingerprint=None):
         """
         创建浏览器上下文选项
-        
+
         Args:
             user_type: 用户类型，可选值为 "normal", "high_risk", "new_device"
-            
+            fingerprint: 已生成的 Fingerprint，未提供时按用户类型生成
+
         Returns:
             用于创建浏览器上下文的选项字典
         """
-        fingerprint = self.get_device_fingerprint(user_type)
-        
+        if fingerprint is None:
+            fingerprint = self.get_device_fingerprint(user_type)
+
         # 构建浏览器上下文选项
         context_options = {
-            "viewport": fingerprint.get("viewport"),
-            "user_agent": fingerprint.get("user_agent"),
-            "timezone_id": fingerprint.get("timezone_id"),
-            "locale": fingerprint.get("locale"),
-            "color_scheme": fingerprint.get("color_scheme", "no-preference"),
-            "reduced_motion": fingerprint.get("reduced_motion", "no-preference"),
-            "has_touch": fingerprint.get("has_touch", False),
-            "is_mobile": fingerprint.get("is_mobile", False),
+            "viewport": fingerprint.viewport_size,
+            "user_agent": fingerprint.user_agent,
+            "timezone_id": fingerprint.timezone_id,
+            "locale": fingerprint.locale,
+            "color_scheme": fingerprint.color_scheme,
+            "reduced_motion": fingerprint.reduced_motion,
+            "has_touch": fingerprint.has_touch,
+            "is_mobile": fingerprint.is_mobile,
         }
-        
+
         return context_options
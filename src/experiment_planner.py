@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""RBA因子实验设计
+
+generate_high_risk_user 同时随机化所有指纹特征，触发RBA后无法判断是哪个因子造成的。
+这里把每个因子限定为两个水平（基线 = 正常用户，备选 = 高风险用户的取值），
+用部分因子设计或自适应逐因子设计安排实验，以明确的指纹调用 perform_login_test：
+
+- fractional: 2^(k-p) 部分因子设计，7个因子只需8个实验点即可估计所有主效应，
+  foldover 再加8个镜像实验点使主效应不与两因子交互混杂；
+- ofat: 自适应逐因子设计，从全部取备选水平（会触发RBA）开始，逐个把因子恢复为基线，
+  恢复后不再触发的因子即为触发所必需，只需 k+1 个实验点。
+
+同样数量的随机指纹几乎无法区分各因子的作用。所有登录都经过 RateLimiter 限速，
+避免在短时间内频繁登录自有测试账号。
+
+使用方法:
+    python src/experiment_planner.py --design ofat --replicates 2
+"""
+
+import argparse
+import itertools
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+from device_fingerprint import Fingerprint
+
+# 各因子的两个水平：(基线, 备选)
+EXPERIMENT_FACTORS = {
+    "viewport": ((1920, 1080), (2560, 1440)),
+    "timezone_id": ("Asia/Shanghai", "Europe/London"),
+    "locale": ("zh-CN", "en-US"),
+    "platform": ("Windows", "MacOS"),
+    "color_scheme": ("no-preference", "dark"),
+    "reduced_motion": ("no-preference", "reduce"),
+}
+
+# 平台决定的 User-Agent，两个平台都是桌面设备，使平台与分辨率等因子相互独立
+PLATFORM_USER_AGENTS = {
+    "Windows": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "MacOS": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Safari/605.1.15",
+}
+
+def experiment_factors(proxy_config=None):
+    """
+    获取参与实验的因子及其水平
+
+    Args:
+        proxy_config: 代理配置，启用且有多个代理时加入代理因子（固定代理 / 其他代理）
+
+    Returns:
+        {因子: (基线水平, 备选水平)}
+    """
+    factors = dict(EXPERIMENT_FACTORS)
+    servers = (proxy_config or {}).get('servers') or []
+    if (proxy_config or {}).get('enabled') and len(servers) > 1:
+        factors["proxy"] = (servers[0], servers[-1])
+    return factors
+
+def build_fingerprint(factors, levels):
+    """
+    根据各因子的水平构造设备指纹
+
+    Args:
+        factors: experiment_factors 返回的因子水平
+        levels: {因子: 0（基线）或 1（备选）}，未列出的因子取基线
+
+    Returns:
+        Fingerprint，代理因子不属于设备指纹，见 proxy_server
+    """
+    values = {factor: options[levels.get(factor, 0)] for factor, options in factors.items()}
+    return Fingerprint(
+        viewport=values["viewport"],
+        user_agent=PLATFORM_USER_AGENTS[values["platform"]],
+        timezone_id=values["timezone_id"],
+        locale=values["locale"],
+        color_scheme=values["color_scheme"],
+        reduced_motion=values["reduced_motion"],
+        platform=values["platform"],
+        user_type="experiment"
+    )
+
+def proxy_server(factors, levels):
+    """
+    实验点使用的代理服务器
+
+    Returns:
+        代理服务器地址；没有代理因子时为None，由代理管理器选择
+    """
+    if "proxy" not in factors:
+        return None
+    return factors["proxy"][levels.get("proxy", 0)]
+
+def fractional_factorial(k, foldover=False):
+    """
+    构造两水平部分因子设计
+
+    前 m 个因子取 2^m 次全因子设计的各列，其余因子依次取前 m 列的交互列（分辨率III）；
+    foldover 时追加所有水平取反的镜像实验点（分辨率IV）。
+
+    Args:
+        k: 因子数
+        foldover: 是否追加镜像实验点
+
+    Returns:
+        numpy 数组，形状为 (实验点数, k)，取值为 0（基线）或 1（备选）
+    """
+    m = max(1, int(np.ceil(np.log2(k + 1))))
+    # 全因子设计，±1 编码
+    base = np.array(list(itertools.product((-1, 1), repeat=m)))
+    subsets = [subset for size in range(1, m + 1) for subset in itertools.combinations(range(m), size)]
+    columns = np.column_stack([base[:, list(subset)].prod(axis=1) for subset in subsets[:k]])
+    if foldover:
+        columns = np.vstack([columns, -columns])
+    return (columns > 0).astype(int)
+
+def main_effects(design, outcomes):
+    """
+    估计各因子的主效应（备选水平与基线水平的平均触发率之差）
+
+    Args:
+        design: fractional_factorial 返回的设计矩阵
+        outcomes: 各实验点的触发率
+
+    Returns:
+        numpy 数组，每个因子一个主效应
+    """
+    coded = 2 * np.asarray(design) - 1
+    outcomes = np.asarray(outcomes, dtype=float)
+    return coded.T @ outcomes / (len(outcomes) / 2)
+
+class AdaptiveOFAT:
+    """自适应逐因子设计
+
+    先以全部因子取备选水平运行；触发RBA后逐个把因子恢复为基线，
+    恢复后仍触发则该因子保持基线，不再触发则该因子是触发所必需的。
+    """
+
+    def __init__(self, factors):
+        """
+        初始化自适应逐因子设计
+
+        Args:
+            factors: 因子名称列表，按尝试恢复的顺序排列
+        """
+        self.factors = list(factors)
+        self.current = {factor: 1 for factor in self.factors}
+        self.necessary = []
+        self._queue = list(self.factors)
+        self._started = False
+
+    def next_levels(self):
+        """
+        下一个实验点的因子水平
+
+        Returns:
+            {因子: 0 或 1}，实验结束时返回 None
+        """
+        if not self._started:
+            return dict(self.current)
+        if not self._queue:
+            return None
+        levels = dict(self.current)
+        levels[self._queue[0]] = 0
+        return levels
+
+    def record(self, triggered):
+        """
+        记录当前实验点是否触发RBA
+
+        Args:
+            triggered: 是否触发（有重复运行时按多数结果判断）
+        """
+        if not self._started:
+            self._started = True
+            if not triggered:
+                # 全部取备选水平也不触发，这些因子都无法单独解释触发
+                self._queue = []
+            return
+
+        factor = self._queue.pop(0)
+        if triggered:
+            self.current[factor] = 0
+        else:
+            self.necessary.append(factor)
+
+    @property
+    def finished(self):
+        return self._started and not self._queue
+
+class RateLimiter:
+    """登录限速：任意一小时内最多 runs_per_hour 次，相邻两次至少间隔 min_interval 秒"""
+
+    def __init__(self, runs_per_hour=20, min_interval=60.0, clock=time.monotonic, sleep=time.sleep):
+        self.runs_per_hour = max(1, int(runs_per_hour))
+        self.min_interval = max(0.0, float(min_interval))
+        self.clock = clock
+        self.sleep = sleep
+        self._recent = deque()
+
+    def wait(self):
+        """等待到允许下一次登录，返回等待的秒数"""
+        now = self.clock()
+        while self._recent and now - self._recent[0] >= 3600:
+            self._recent.popleft()
+
+        delay = 0.0
+        if self._recent:
+            delay = max(delay, self._recent[-1] + self.min_interval - now)
+        if len(self._recent) >= self.runs_per_hour:
+            delay = max(delay, self._recent[0] + 3600 - now)
+
+        if delay > 0:
+            logging.getLogger('experiment').info(f"登录限速，等待 {delay:.0f} 秒")
+            self.sleep(delay)
+        self._recent.append(self.clock())
+        return delay
+
+def _level_labels(factors, levels):
+    """实验点中各因子的水平描述，写入测试结果"""
+    labels = {}
+    for factor, options in factors.items():
+        value = options[levels.get(factor, 0)]
+        labels[factor] = f"{value[0]}x{value[1]}" if factor == "viewport" else value
+    return labels
+
+def run_experiment(config, design="fractional", replicates=1, foldover=False, max_runs=40, limiter=None):
+    """
+    按实验设计依次执行登录测试
+
+    Args:
+        config: 配置对象
+        design: "fractional" 或 "ofat"
+        replicates: 每个实验点重复运行的次数，按多数结果判断是否触发
+        foldover: 部分因子设计是否追加镜像实验点
+        max_runs: 本次实验最多执行的登录次数
+        limiter: RateLimiter，未提供时按配置创建
+
+    Returns:
+        fractional: {因子: 主效应}；ofat: 触发所必需的因子列表
+    """
+    # 只有实际执行实验时才需要 Playwright 和登录流程
+    from playwright.sync_api import sync_playwright
+    from browser_pool import BrowserPool
+    from logger import Logger
+    from main import perform_login_test, setup_environment
+    from proxy_manager import ProxyManager
+    from screenshot_manager import ScreenshotManager
+
+    logger = logging.getLogger('experiment')
+    experiment_config = config.get_experiment_config()
+    if limiter is None:
+        limiter = RateLimiter(experiment_config['runs_per_hour'], experiment_config['min_interval'])
+
+    factors = experiment_factors(config.get_proxy_config())
+    names = list(factors)
+
+    if design == "fractional":
+        matrix = fractional_factorial(len(names), foldover)
+        points = [dict(zip(names, row.tolist())) for row in matrix]
+        planned = len(points) * replicates
+        if planned > max_runs:
+            raise ValueError(f"实验需要 {planned} 次登录，超过上限 {max_runs}，请减少重复次数或关闭 foldover")
+        logger.info(f"部分因子设计: {len(names)} 个因子, {len(points)} 个实验点, 共 {planned} 次登录")
+        planner = None
+    elif design == "ofat":
+        planner = AdaptiveOFAT(names)
+        logger.info(f"自适应逐因子设计: {len(names)} 个因子, 最多 {(len(names) + 1) * replicates} 次登录")
+    else:
+        raise ValueError(f"不支持的实验设计: {design}")
+
+    setup_environment()
+    result_logger = Logger(config.get_logging_config())
+    outcomes = []
+    runs = 0
+    try:
+        with sync_playwright() as p, BrowserPool(p.chromium, config.get_browser_config()) as browser_pool, \
+                ProxyManager(config.get_proxy_config(), config.get_proxy_health_config()) as proxy_manager, \
+                ScreenshotManager(config.get_screenshot_config()) as screenshots:
+            index = 0
+            while True:
+                levels = points[index] if planner is None else planner.next_levels()
+                if levels is None:
+                    break
+                if runs + replicates > max_runs:
+                    logger.warning(f"已达到登录次数上限 {max_runs}，实验提前结束")
+                    break
+
+                fingerprint = build_fingerprint(factors, levels)
+                triggered = 0
+                for replicate in range(replicates):
+                    limiter.wait()
+                    result = perform_login_test(
+                        p.chromium, config, "experiment", browser_pool, proxy_manager, screenshots,
+                        fingerprint=fingerprint, proxy_server=proxy_server(factors, levels)
+                    ) or {}
+                    runs += 1
+                    details = result.get('details', {})
+                    details["实验"] = {
+                        "design": design, "point": index, "replicate": replicate,
+                        "levels": _level_labels(factors, levels)
+                    }
+                    result_logger.log_test_result(
+                        user_type="因子实验",
+                        success=result.get('success', False),
+                        rba_triggered=result.get('rba_triggered', False),
+                        details=details
+                    )
+                    triggered += bool(result.get('rba_triggered'))
+
+                rate = triggered / replicates
+                outcomes.append(rate)
+                logger.info(f"实验点 {index}: {_level_labels(factors, levels)} 触发率 {rate:.2f}")
+                if planner is not None:
+                    planner.record(rate >= 0.5)
+                index += 1
+                if planner is None and index >= len(points):
+                    break
+    finally:
+        result_logger.close()
+
+    if planner is None:
+        if len(outcomes) < len(points):
+            logger.warning("实验未完成，无法估计主效应")
+            return {}
+        return dict(zip(names, main_effects(fractional_factorial(len(names), foldover), outcomes).tolist()))
+    return planner.necessary
+
+def main(argv=None):
+    """命令行入口：执行因子实验并打印各因子的作用"""
+    from config_loader import ConfigLoader
+
+    config = ConfigLoader()
+    experiment_config = config.get_experiment_config()
+
+    parser = argparse.ArgumentParser(description="RBA因子实验")
+    parser.add_argument("--design", choices=["fractional", "ofat"], default=experiment_config['design'])
+    parser.add_argument("--replicates", type=int, default=experiment_config['replicates'], help="每个实验点的重复次数")
+    parser.add_argument("--foldover", action="store_true", default=experiment_config['foldover'],
+                        help="部分因子设计追加镜像实验点")
+    parser.add_argument("--max-runs", type=int, default=experiment_config['max_runs'], help="最多执行的登录次数")
+    args = parser.parse_args(argv)
+
+    outcome = run_experiment(config, args.design, max(1, args.replicates), args.foldover, args.max_runs)
+    if args.design == "fractional":
+        for factor, effect in sorted(outcome.items(), key=lambda item: -abs(item[1])):
+            print(f"{factor:15s} 主效应 {effect:+.2f}")
+    elif outcome:
+        print(f"触发RBA所必需的因子: {', '.join(outcome)}")
+    else:
+        print("没有找到能单独解释RBA触发的因子")
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,106 @@
 
 import random
 import time
-from playwright.sync_api import Page
+import functools
+import inspect
+import weakref
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+# 页面内执行一次完整滚动手势的脚本
+# 目标位置、步数和各步间隔由Python端抽取，脚本按间隔逐步调用 scrollTo，
+# 由 requestAnimationFrame 驱动（页面不可见时退回 setTimeout），全部完成后返回
+SCROLL_GESTURE_SCRIPT = """
+async ({fraction, steps, pauses}) => {
+    const pageHeight = Math.max(document.body.scrollHeight, document.documentElement.scrollHeight);
+    const low = 100;
+    const high = Math.max(200, pageHeight - 500);
+    const target = low + Math.floor(fraction * (high - low + 1));
+
+    const start = window.scrollY;
+    const distance = target - start;
+
+    // 第 i 步在前 i 个间隔之和之后执行，最后一步之后还要停留一个间隔
+    const due = [];
+    let total = 0;
+    for (let i = 0; i < steps; i++) {
+        due.push(total);
+        total += pauses[i];
+    }
+
+    const nextFrame = () => new Promise((resolve) =>
+        document.hidden ? setTimeout(resolve, 16) : requestAnimationFrame(resolve));
+
+    const origin = performance.now();
+    let done = 0;
+    while (done < steps) {
+        const elapsed = performance.now() - origin;
+        while (done < steps && due[done] <= elapsed) {
+            done++;
+            window.scrollTo(0, start + distance * done / steps);
+        }
+        if (done < steps) {
+            await nextFrame();
+        }
+    }
+    while (performance.now() - origin < total) {
+        await nextFrame();
+    }
+    return window.scrollY;
+}
+"""
+
+# 每个页面上鼠标的当前位置，在Python端记录，不再读写页面中的 window.mousePosX/Y
+_mouse_positions = weakref.WeakKeyDictionary()
+
+def _plan_trajectory(current_x, current_y, target_x, target_y):
+    """
+    一次性计算鼠标移动轨迹：easing曲线加上与移动距离成比例的随机偏移
+
+    Args:
+        current_x, current_y: 起点坐标
+        target_x, target_y: 目标坐标
+
+    Returns:
+        (各步坐标数组 shape=(steps, 2), 各步之后的停顿时间数组（秒）)
+    """
+    # numpy 只在模拟鼠标移动时需要，不在导入本模块时加载
+    import numpy as np
+
+    # 由 random 模块派生随机数，设置 random.seed 时轨迹同样可以复现
+    rng = np.random.default_rng(random.getrandbits(64))
+    steps = random.randint(3, 10)
+
+    start = np.array([current_x, current_y], dtype=float)
+    distance = np.array([target_x, target_y], dtype=float) - start
+
+    progress = np.arange(1, steps + 1) / steps
+    eased = progress * (2 - progress)  # 简单的easing函数
+    noise = rng.normal(0.0, 1.0, size=(steps, 2)) * np.abs(distance) * 0.05
+
+    points = start + np.outer(eased, distance) + noise
+    pauses = rng.uniform(0.01, 0.1, size=steps)
+    return points, pauses
+
+def _timed(name):
+    """将行为方法的耗时记录到 self.timer（PhaseTimer）中，未设置计时器时不做任何事"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                with self._span(name):
+                    return await func(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self._span(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class HumanBehavior:
     """模拟人类用户行为的工具类"""
@@ -13,13 +112,22 @@ class HumanBehavior:
         初始化人类行为模拟器
         
         Args:
-            config: 行为配置参数，包含min_delay, max_delay, random_mouse, random_scroll
+            config: 行为配置参数，包含min_delay, max_delay, random_mouse, random_scroll, time_scale
         """
         self.min_delay = config.get('min_delay', 0.5)
         self.max_delay = config.get('max_delay', 3.0)
         self.random_mouse = config.get('random_mouse', True)
         self.random_scroll = config.get('random_scroll', True)
+        # 所有等待和按键间隔的缩放系数，1为正常速度，0为不等待
+        self.time_scale = max(0.0, float(config.get('time_scale', 1.0)))
+        # 可选的PhaseTimer，用于记录每个行为调用的耗时
+        self.timer = None
     
+    def _span(self, name):
+        """返回计时区间，未设置计时器时返回空上下文"""
+        return self.timer.span(name) if self.timer else nullcontext()
+    
+    @_timed('behavior.random_delay')
     def random_delay(self, min_factor=1.0, max_factor=1.0):
         """
         模拟随机延迟，模拟人类操作间隔
@@ -28,12 +136,62 @@ class HumanBehavior:
             min_factor: 最小延迟时间的倍率
             max_factor: 最大延迟时间的倍率
         """
-        delay = random.uniform(
+        self._sleep(self._draw_delay(min_factor, max_factor))
+    
+    def _draw_delay(self, min_factor=1.0, max_factor=1.0):
+        """按配置的延迟范围和倍率抽取一次延迟时间（秒）"""
+        return random.uniform(
             self.min_delay * min_factor,
             self.max_delay * max_factor
         )
-        time.sleep(delay)
     
+    def _sleep(self, seconds):
+        """按 time_scale 缩放后等待，缩放后为0时直接返回"""
+        seconds *= self.time_scale
+        if seconds > 0:
+            time.sleep(seconds)
+    
+    def _key_delay(self):
+        """抽取一次按键间隔（毫秒），已按 time_scale 缩放"""
+        return random.uniform(100, 300) * self.time_scale
+    
+    def _scroll_gesture(self):
+        """
+        抽取一次滚动手势的参数，供 SCROLL_GESTURE_SCRIPT 使用
+        
+        Returns:
+            {"fraction": 目标位置在可滚动范围内的比例, "steps": 步数, "pauses": 各步之后的停顿（毫秒）}
+        """
+        steps = random.randint(3, 8)
+        return {
+            "fraction": random.random(),
+            "steps": steps,
+            "pauses": [random.uniform(0.05, 0.2) * 1000 * self.time_scale for _ in range(steps)]
+        }
+    
+    def _typing_schedule(self, text: str):
+        """
+        预先计算整段文本的输入计划
+        
+        每个字符单独抽取按键间隔，并以10%的概率在字符之后插入一次停顿（模拟思考）。
+        各按键间隔保持原来的分布，不能合并为一段取平均值，否则间隔的方差会变小，
+        与真人输入的节奏不同
+        
+        Args:
+            text: 要输入的文本
+        
+        Returns:
+            [(字符, 按键间隔毫秒, 字符后停顿秒数), ...]，停顿秒数未按 time_scale 缩放，没有停顿时为0
+        """
+        schedule = []
+        for char in text:
+            delay = self._key_delay()
+            # 偶尔暂停一下，像人类思考
+            pause = self._draw_delay(0.5, 1.0) if random.random() < 0.1 else 0.0  # 10%的概率
+            schedule.append((char, delay, pause))
+        return schedule
+    
+    @_timed('behavior.human_like_typing')
     def human_like_typing(self, locator, text: str):
         """
         模拟人类输入行为
@@ -50,15 +208,14 @@ class HumanBehavior:
         locator.fill("")
         self.random_delay(0.2, 0.5)
         
-        # 逐个字符输入，模拟人类打字
-        for char in text:
-            locator.press(char, delay=random.uniform(100, 300))
-            
-            # 偶尔暂停一下，像人类思考
-            if random.random() < 0.1:  # 10%的概率
-                self.random_delay(0.5, 1.0)
+        # 按预先计算的计划逐个字符输入，每个按键使用各自的间隔
+        for char, delay, pause in self._typing_schedule(text):
+            locator.press_sequentially(char, delay=delay)
+            if pause:
+                self._sleep(pause)
     
-    def human_like_click(self, page: Page, selector: str):
+    @_timed('behavior.human_like_click')
+    def human_like_click(self, page: 'Page', selector: str):
         """
         模拟人类点击行为，不总是点击元素中心
         
@@ -86,8 +243,10 @@ class HumanBehavior:
         
         # 点击
         page.mouse.click(x, y)
+        _mouse_positions[page] = (x, y)
     
-    def _mouse_move_with_trajectory(self, page: Page, target_x: float, target_y: float):
+    @_timed('behavior.mouse_trajectory')
+    def _mouse_move_with_trajectory(self, page: 'Page', target_x: float, target_y: float):
         """
         模拟鼠标移动轨迹，不是直线移动到目标
         
@@ -96,46 +255,18 @@ class HumanBehavior:
             target_x: 目标X坐标
             target_y: 目标Y坐标
         """
-        # 获取当前鼠标位置
-        current_x, current_y = page.evaluate("""
-            () => {
-                return [window.mousePosX || 0, window.mousePosY || 0];
-            }
-        """)
-        
-        # 计算移动距离
-        distance_x = target_x - current_x
-        distance_y = target_y - current_y
-        
-        # 生成几个控制点，模拟自然鼠标轨迹
-        steps = random.randint(3, 10)
-        for i in range(steps):
-            # 非线性轨迹
-            progress = (i + 1) / steps
-            easedProgress = progress * (2 - progress)  # 简单的easing函数
-            
-            # 添加一些随机性
-            offset_x = random.gauss(0, distance_x * 0.05)
-            offset_y = random.gauss(0, distance_y * 0.05)
-            
-            next_x = current_x + distance_x * easedProgress + offset_x
-            next_y = current_y + distance_y * easedProgress + offset_y
-            
-            # 移动鼠标
+        # 当前鼠标位置由Python端记录，整条轨迹预先计算，只有 mouse.move 需要与浏览器通信
+        current_x, current_y = _mouse_positions.get(page, (0.0, 0.0))
+        points, pauses = _plan_trajectory(current_x, current_y, target_x, target_y)
+        
+        for (next_x, next_y), pause in zip(points.tolist(), pauses.tolist()):
             page.mouse.move(next_x, next_y)
-            
-            # 短暂延迟
-            time.sleep(random.uniform(0.01, 0.1))
-            
-            # 更新JavaScript中的鼠标位置
-            page.evaluate(f"""
-                () => {{
-                    window.mousePosX = {next_x};
-                    window.mousePosY = {next_y};
-                }}
-            """)
+            self._sleep(pause)
+        
+        _mouse_positions[page] = (next_x, next_y)
     
-    def scroll_randomly(self, page: Page):
+    @_timed('behavior.scroll_randomly')
+    def scroll_randomly(self, page: 'Page'):
         """
         模拟随机滚动页面行为
         
@@ -145,32 +276,113 @@ class HumanBehavior:
         if not self.random_scroll:
             return
             
-        # 获取页面高度
-        page_height = page.evaluate("""
-            () => {
-                return Math.max(
-                    document.body.scrollHeight,
-                    document.documentElement.scrollHeight
-                );
-            }
-        """)
-        
-        # 随机滚动1-3次
+        # 随机滚动1-3次，每次滚动在页面内完成，只需一次驱动调用
         for _ in range(random.randint(1, 3)):
-            # 随机滚动位置
-            target_scroll = random.randint(100, max(200, page_height - 500))
-            
-            # 逐渐滚动，而不是一次性滚到目标位置
-            current_pos = page.evaluate("() => window.scrollY")
-            distance = target_scroll - current_pos
-            
-            steps = random.randint(3, 8)
-            for i in range(steps):
-                progress = (i + 1) / steps
-                pos = current_pos + distance * progress
-                
-                page.evaluate(f"window.scrollTo(0, {pos})")
-                time.sleep(random.uniform(0.05, 0.2))
+            page.evaluate(SCROLL_GESTURE_SCRIPT, self._scroll_gesture())
             
             # 滚动后短暂停留，模拟阅读
             self.random_delay(0.5, 2.0)
+
+
+class AsyncHumanBehavior(HumanBehavior):
+    """HumanBehavior 的异步版本，用于 playwright.async_api，等待期间不阻塞事件循环"""
+    
+    @_timed('behavior.random_delay')
+    async def random_delay(self, min_factor=1.0, max_factor=1.0):
+        """
+        模拟随机延迟，模拟人类操作间隔
+        
+        Args:
+            min_factor: 最小延迟时间的倍率
+            max_factor: 最大延迟时间的倍率
+        """
+        await self._sleep(self._draw_delay(min_factor, max_factor))
+    
+    async def _sleep(self, seconds):
+        """按 time_scale 缩放后等待，缩放后为0时直接返回"""
+        seconds *= self.time_scale
+        if seconds > 0:
+            import asyncio
+            await asyncio.sleep(seconds)
+    
+    @_timed('behavior.human_like_typing')
+    async def human_like_typing(self, locator, text: str):
+        """
+        模拟人类输入行为
+        
+        Args:
+            locator: 异步Playwright的Locator对象
+            text: 要输入的文本
+        """
+        await locator.click()
+        await self.random_delay(0.2, 0.5)
+        
+        await locator.fill("")
+        await self.random_delay(0.2, 0.5)
+        
+        for char, delay, pause in self._typing_schedule(text):
+            await locator.press_sequentially(char, delay=delay)
+            if pause:
+                await self._sleep(pause)
+    
+    @_timed('behavior.human_like_click')
+    async def human_like_click(self, page, selector: str):
+        """
+        模拟人类点击行为，不总是点击元素中心
+        
+        Args:
+            page: 异步Playwright页面对象
+            selector: 元素选择器
+        """
+        if not self.random_mouse:
+            await page.click(selector)
+            return
+        
+        element = await page.query_selector(selector)
+        if not element:
+            raise ValueError(f"找不到元素: {selector}")
+            
+        bbox = await element.bounding_box()
+        
+        x = bbox['x'] + bbox['width'] * (0.3 + random.random() * 0.4)
+        y = bbox['y'] + bbox['height'] * (0.3 + random.random() * 0.4)
+        
+        await self._mouse_move_with_trajectory(page, x, y)
+        
+        await page.mouse.click(x, y)
+        _mouse_positions[page] = (x, y)
+    
+    @_timed('behavior.mouse_trajectory')
+    async def _mouse_move_with_trajectory(self, page, target_x: float, target_y: float):
+        """
+        模拟鼠标移动轨迹，不是直线移动到目标
+        
+        Args:
+            page: 异步Playwright页面对象
+            target_x: 目标X坐标
+            target_y: 目标Y坐标
+        """
+        current_x, current_y = _mouse_positions.get(page, (0.0, 0.0))
+        points, pauses = _plan_trajectory(current_x, current_y, target_x, target_y)
+        
+        for (next_x, next_y), pause in zip(points.tolist(), pauses.tolist()):
+            await page.mouse.move(next_x, next_y)
+            await self._sleep(pause)
+        
+        _mouse_positions[page] = (next_x, next_y)
+    
+    @_timed('behavior.scroll_randomly')
+    async def scroll_randomly(self, page):
+        """
+        模拟随机滚动页面行为
+        
+        Args:
+            page: 异步Playwright页面对象
+        """
+        if not self.random_scroll:
+            return
+            
+        for _ in range(random.randint(1, 3)):
+            await page.evaluate(SCROLL_GESTURE_SCRIPT, self._scroll_gesture())
+            
+            await self.random_delay(0.5, 2.0)
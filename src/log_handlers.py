@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import gzip
+import logging
+import logging.handlers
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+# 支持的按时间轮转方式及对应的间隔秒数（midnight 单独处理）
+ROTATE_INTERVALS = {
+    'H': 3600,
+    'D': 86400,
+    'midnight': None,
+}
+
+class RetentionFileHandler(logging.handlers.BaseRotatingHandler):
+    """
+    按大小和/或时间轮转的日志文件处理器
+
+    轮转时把当前文件改名为带时间戳的分段（rba_test.log.20250409_103000_123456），
+    可选用gzip压缩；所有分段与当前文件的总大小超过预算时，从最旧的分段开始删除。
+    """
+
+    def __init__(self, filename, max_bytes=0, when=None, compress=True, total_budget=0, encoding='utf-8'):
+        """
+        初始化日志文件处理器
+
+        Args:
+            filename: 日志文件路径
+            max_bytes: 单个文件的最大字节数，0表示不按大小轮转
+            when: 按时间轮转的方式，'H'（每小时）、'D'（每天）、'midnight'（每天零点），None表示不按时间轮转
+            compress: 是否用gzip压缩轮转出的分段
+            total_budget: 当前文件和所有分段的总字节数上限，0表示不限制
+            encoding: 文件编码
+        """
+        if when is not None and when not in ROTATE_INTERVALS:
+            raise ValueError(f"不支持的日志轮转方式: {when}")
+
+        super().__init__(filename, 'a', encoding=encoding)
+        self.max_bytes = max_bytes
+        self.when = when
+        self.compress = compress
+        self.total_budget = total_budget
+
+        # 按时间轮转时，从已有文件的修改时间开始计算，重启后也能按时轮转
+        start = os.path.getmtime(self.baseFilename) if os.path.exists(self.baseFilename) else time.time()
+        self.rollover_at = self._next_rollover(start)
+
+    def _next_rollover(self, current):
+        """计算下一次按时间轮转的时间戳"""
+        if self.when is None:
+            return None
+        if self.when == 'midnight':
+            moment = datetime.fromtimestamp(current)
+            return (moment.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)).timestamp()
+        return current + ROTATE_INTERVALS[self.when]
+
+    def shouldRollover(self, record):
+        """判断写入这条日志前是否需要轮转"""
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        if self.max_bytes > 0:
+            if self.stream is None:
+                self.stream = self._open()
+            # 文件达到上限后再轮转，不需要为判断而格式化日志，单个文件最多超出一条日志的长度
+            return self.stream.tell() >= self.max_bytes
+        return False
+
+    def doRollover(self):
+        """把当前文件轮转为一个分段，压缩并清理超出预算的旧分段"""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            segment = f"{self.baseFilename}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            os.replace(self.baseFilename, segment)
+            if self.compress:
+                with open(segment, 'rb') as source, gzip.open(f"{segment}.gz", 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                os.remove(segment)
+
+        self.stream = self._open()
+        self.rollover_at = self._next_rollover(time.time())
+        self._enforce_budget()
+
+    def segments(self):
+        """
+        已轮转出的分段文件
+
+        Returns:
+            分段路径列表，从旧到新排列
+        """
+        pattern = f"{glob.escape(self.baseFilename)}.[0-9]*_[0-9]*_[0-9]*"
+        return sorted(glob.glob(pattern))
+
+    def _enforce_budget(self):
+        """总大小超过预算时从最旧的分段开始删除"""
+        if self.total_budget <= 0:
+            return
+
+        segments = self.segments()
+        total = sum(os.path.getsize(path) for path in segments)
+        current = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        # 为当前文件预留到下次按大小轮转前可能写入的空间
+        total += max(current, self.max_bytes)
+
+        while segments and total > self.total_budget:
+            oldest = segments.pop(0)
+            try:
+                total -= os.path.getsize(oldest)
+                os.remove(oldest)
+            except OSError:
+                pass
+
+def create_file_handler(file_path, rotation_config=None):
+    """
+    根据轮转配置创建日志文件处理器
+
+    Args:
+        file_path: 日志文件路径
+        rotation_config: 轮转配置，包含rotate_max_mb, rotate_when, rotate_compress, retention_budget_mb
+
+    Returns:
+        未配置轮转时返回普通的 FileHandler，否则返回 RetentionFileHandler
+    """
+    rotation_config = rotation_config or {}
+    max_bytes = int(rotation_config.get('rotate_max_mb', 0) * 1024 * 1024)
+    when = rotation_config.get('rotate_when') or None
+    total_budget = int(rotation_config.get('retention_budget_mb', 0) * 1024 * 1024)
+
+    if max_bytes <= 0 and when is None:
+        return logging.FileHandler(file_path, encoding='utf-8')
+
+    return RetentionFileHandler(
+        file_path,
+        max_bytes=max_bytes,
+        when=when,
+        compress=rotation_config.get('rotate_compress', True),
+        total_budget=total_budget
+    )
@@ -1,11 +1,51 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import atexit
+import importlib
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 
+# 当前运行中的后台日志线程，重新配置日志时先停止旧的线程
+_active_listener = None
+
+def _import_sibling(name):
+    """
+    导入与本模块同目录的模块，以 src.logger 或 logger 方式导入时都可使用
+
+    Args:
+        name: 模块名
+    """
+    package = __name__.rpartition('.')[0]
+    return importlib.import_module(f"{package}.{name}" if package else name)
+
+class _BlockingQueueHandler(logging.handlers.QueueHandler):
+    """队列已满时等待而不是丢弃日志的 QueueHandler"""
+    
+    def enqueue(self, record):
+        self.queue.put(record)
+
+def _stop_listener():
+    """
+    停止后台日志线程，写出队列中剩余的日志
+    
+    Returns:
+        后台线程使用的处理器列表
+    """
+    global _active_listener
+    if _active_listener is None:
+        return []
+    listener, _active_listener = _active_listener, None
+    listener.stop()
+    return list(listener.handlers)
+
+# 进程退出前写出队列中剩余的日志
+atexit.register(_stop_listener)
+
 class Logger:
     """日志记录器，统一管理项目的日志记录"""
     
@@ -14,11 +54,26 @@ class Logger:
         初始化日志记录器
         
         Args:
-            config: 日志配置，包含level, file_enabled, file_path
+            config: 日志配置，包含level, file_enabled, file_path, queue_enabled, queue_size,
+                rotate_max_mb, rotate_when, rotate_compress, retention_budget_mb,
+                results_backend, results_db_path
         """
         self.log_level_str = config.get('level', 'INFO')
         self.file_enabled = config.get('file_enabled', True)
         self.file_path = config.get('file_path', 'data/logs/rba_test.log')
+        # 是否由后台线程写出日志，登录流程只需把日志放入队列
+        self.queue_enabled = config.get('queue_enabled', False)
+        self.queue_size = config.get('queue_size', 10000)
+        # 日志文件的轮转、压缩和总大小预算
+        self.rotation_config = {
+            key: config[key]
+            for key in ('rotate_max_mb', 'rotate_when', 'rotate_compress', 'retention_budget_mb')
+            if key in config
+        }
+        # 测试结果的保存方式：sqlite（结果数据库）、json（每个结果一个文件）或 both
+        self.results_backend = config.get('results_backend', 'sqlite').lower()
+        self.results_db_path = config.get('results_db_path', 'data/results/results.db')
+        self._results_store = None
         
         # 映射日志级别字符串到logging模块常量
         self.log_levels = {
@@ -41,6 +96,7 @@ class Logger:
         logger.setLevel(self.log_level)
         
         # 清除可能存在的处理器
+        _stop_listener()
         logger.handlers = []
         
         # 创建格式化器
@@ -48,12 +104,13 @@ class Logger:
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         
-        # 添加控制台处理器
+        # 控制台处理器
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers = [console_handler]
         
-        # 添加文件处理器（如果启用）
+        # 文件处理器（如果启用）
+        file_error = None
         if self.file_enabled:
             # 确保日志目录存在
             log_dir = os.path.dirname(self.file_path)
@@ -61,13 +118,28 @@ class Logger:
                 os.makedirs(log_dir, exist_ok=True)
             
             try:
-                file_handler = logging.FileHandler(self.file_path, encoding='utf-8')
+                create_file_handler = _import_sibling('log_handlers').create_file_handler
+                file_handler = create_file_handler(self.file_path, self.rotation_config)
                 file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-                
-                logging.info(f"日志将被保存到文件：{self.file_path}")
+                handlers.append(file_handler)
             except Exception as e:
-                logging.error(f"无法创建日志文件处理器：{str(e)}")
+                file_error = e
+        
+        if self.queue_enabled:
+            # 日志先放入有界队列，由后台线程写到控制台和文件；队列满时等待，不丢弃日志
+            global _active_listener
+            log_queue = queue.Queue(maxsize=max(0, int(self.queue_size)))
+            logger.addHandler(_BlockingQueueHandler(log_queue))
+            _active_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _active_listener.start()
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+        
+        if file_error is not None:
+            logging.error(f"无法创建日志文件处理器：{str(file_error)}")
+        elif self.file_enabled:
+            logging.info(f"日志将被保存到文件：{self.file_path}")
         
         # 记录启动信息
         logging.info(f"日志系统初始化完成，级别：{self.log_level_str}")
@@ -109,20 +181,32 @@ class Logger:
         for key, value in details.items():
             logger.info(f"  - {key}: {value}")
         
-        # 如果启用了文件日志，将详细结果另存为JSON
-        if self.file_enabled:
+        # 如果启用了文件日志，保存详细结果
+        if not self.file_enabled:
+            return
+        
+        timestamp = datetime.now()
+        
+        if self.results_backend in ('sqlite', 'both'):
+            try:
+                self.get_results_store().add(user_type, success, rba_triggered, details, timestamp.isoformat())
+                logger.info(f"详细测试结果已保存至：{self.results_db_path}")
+            except Exception as e:
+                logger.error(f"保存测试结果失败：{str(e)}")
+        
+        if self.results_backend in ('json', 'both'):
             import json
-            from datetime import datetime
             
             result_data = {
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp.isoformat(),
                 "user_type": user_type,
                 "success": success,
                 "rba_triggered": rba_triggered,
                 "details": details
             }
             
-            result_file = f"data/results/test_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{user_type}.json"
+            # 文件名精确到微秒，同一秒内的多个结果不会相互覆盖
+            result_file = f"data/results/test_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}_{user_type}.json"
             
             # 确保目录存在
             os.makedirs(os.path.dirname(result_file), exist_ok=True)
@@ -133,3 +217,36 @@ class Logger:
                 logger.info(f"详细测试结果已保存至：{result_file}")
             except Exception as e:
                 logger.error(f"保存测试结果失败：{str(e)}")
+    
+    def get_results_store(self):
+        """
+        获取测试结果数据库，第一次调用时打开
+        
+        Returns:
+            ResultsStore实例
+        """
+        if self._results_store is None:
+            ResultsStore = _import_sibling('results_store').ResultsStore
+            self._results_store = ResultsStore(self.results_db_path)
+        return self._results_store
+    
+    def flush(self):
+        """等待后台日志线程写出队列中已有的日志"""
+        if _active_listener is not None:
+            _active_listener.queue.join()
+        for handler in logging.getLogger().handlers:
+            handler.flush()
+    
+    def close(self):
+        """停止后台日志线程并写出剩余日志，关闭测试结果数据库"""
+        if self.queue_enabled:
+            # 停止后台线程，之后的日志直接由原来的处理器写出
+            handlers = _stop_listener()
+            root = logging.getLogger()
+            root.handlers = [
+                handler for handler in root.handlers
+                if not isinstance(handler, logging.handlers.QueueHandler)
+            ] + handlers
+        if self._results_store is not None:
+            self._results_store.close()
+            self._results_store = None
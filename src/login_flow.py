@@ -0,0 +1,844 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""登录流程的公共定义，供同步与异步执行引擎共用
+
+登录步骤写成生成器，每次页面I/O调用都通过 yield 交给执行器：
+同步执行器（SyncFlowIO）拿到的已经是调用结果，原样送回；
+异步执行器（AsyncFlowIO）拿到的是协程，await 之后再把结果或异常送回。
+两个执行引擎只负责创建和关闭浏览器上下文，登录策略和结果处理只有这一份实现。
+"""
+
+import inspect
+import logging
+from datetime import datetime
+
+from device_fingerprint import DeviceFingerprint
+from proxy_manager import PROXY_UNAVAILABLE
+from login_path_cache import LoginPathCache, compute_structure_hash
+from page_probe import (
+    probe_selectors, async_probe_selectors, log_probe_results, inventory_frames, async_inventory_frames
+)
+
+# 默认的登录页面地址
+DEFAULT_LOGIN_URL = "https://mail.qq.com/"
+
+# 测试场景：(配置项名称, 用户类型, 结果记录中使用的名称)
+SCENARIOS = [
+    ("normal_user", "normal", "正常用户"),
+    ("high_risk_user", "high_risk", "高风险用户"),
+    ("new_device_user", "new_device", "新设备用户"),
+    ("catalog_user", "catalog", "目录设备用户"),
+]
+# 各用户类型的代理选择规则见 proxy_manager.PROXY_RULES，新增用户类型时需要同时添加规则
+
+# 页面上可能的登录元素
+POTENTIAL_SELECTORS = [
+    'a#switcher_plogin',  # 原来使用的选择器
+    '#switcher_plogin',   # 不带a标签的选择器
+    '.login_login_btn',   # 可能的登录按钮类名
+    'a:has-text("密码登录")',  # 包含"密码登录"文本的a标签
+    'button:has-text("密码登录")', # 包含"密码登录"文本的按钮
+    'a:has-text("QQ登录")',   # 包含"QQ登录"文本的a标签
+    '.login-switch-item:has-text("QQ登录")',  # 可能的QQ登录元素
+    'a.login',  # 可能的新登录按钮
+    'button.login',  # 可能的新登录按钮
+    '.btlogin',  # 可能的新登录按钮类
+    '.login_btn',  # 可能的新登录按钮类
+    '[title="登录"]',  # 带有登录标题的元素
+    'a[href*="xlogin"]',  # 可能链接到登录页面的元素
+    'a:has-text("登录")',  # 包含"登录"文本的a标签
+    'button:has-text("登录")', # 包含"登录"文本的按钮
+    'iframe[src*="xlogin"]' # 可能的登录iframe
+]
+
+# 标准登录框iframe之外的备选选择器
+ALTERNATIVE_FRAME_SELECTORS = ['iframe[name="login_frame"]', 'iframe[src*="xlogin"]']
+
+# 可能的用户名输入框选择器
+USERNAME_SELECTORS = ['#u', 'input[name="account"]', 'input[type="text"][name="uin"]',
+                      'input[placeholder*="帐号"]', 'input[placeholder*="账号"]', 'input[placeholder*="QQ"]']
+
+# 可能的密码输入框选择器
+PASSWORD_SELECTORS = ['#p', 'input[type="password"]', 'input[name="password"]',
+                      'input[placeholder*="密码"]']
+
+# 可能的登录按钮选择器
+LOGIN_BUTTON_SELECTORS = ['#login_button', '.login_button', 'button[type="submit"]',
+                          'input[type="submit"]', 'button:has-text("登录")', 'button.login',
+                          'a.login', '.login_btn', '[title="登录"]']
+
+# 在页面中查找密码登录按钮的脚本
+FIND_SWITCHER_SCRIPT = """
+    () => {
+        const btn = document.getElementById("switcher_plogin");
+        if (btn) {
+            console.log("在主页面找到密码登录按钮");
+            return true;
+        }
+        return false;
+    }
+"""
+
+# 在iframe中查找并点击密码登录按钮的脚本
+CLICK_SWITCHER_IN_FRAME_SCRIPT = """
+    () => {
+        const btn = document.getElementById("switcher_plogin");
+        if (btn) {
+            console.log("在iframe中找到密码登录按钮");
+            btn.click();
+            return true;
+        }
+        return false;
+    }
+"""
+
+def login_account(email):
+    """QQ邮箱通常只需要输入@前面的部分"""
+    return email.split('@')[0]
+
+def timestamp_suffix():
+    """截图等文件名使用的时间戳"""
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+def build_login_result(user_type, page_title, rba_triggered):
+    """
+    构造登录完成后的测试结果
+
+    Args:
+        user_type: 用户类型
+        page_title: 登录后的页面标题
+        rba_triggered: 是否检测到安全验证
+
+    Returns:
+        测试结果字典
+    """
+    details = {
+        "用户类型": user_type,
+        "页面标题": page_title,
+        "登录时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if rba_triggered:
+        details["触发项"] = "安全验证"
+
+    return {
+        "success": not rba_triggered,
+        "rba_triggered": rba_triggered,
+        "details": details
+    }
+
+def build_error_result(user_type, error):
+    """
+    构造测试失败时的结果
+
+    Args:
+        user_type: 用户类型
+        error: 错误描述
+
+    Returns:
+        测试结果字典
+    """
+    return {
+        "success": False,
+        "rba_triggered": False,
+        "details": {
+            "用户类型": user_type,
+            "错误": error
+        }
+    }
+
+def prepare_fingerprint(config, user_type, fingerprint=None):
+    """
+    准备本次测试的设备指纹和浏览器上下文选项
+
+    Args:
+        config: 配置对象
+        user_type: 用户类型
+        fingerprint: 指定的 Fingerprint（实验计划指定的指纹直接使用），未提供时按用户类型生成
+
+    Returns:
+        (Fingerprint, 浏览器上下文选项字典)
+    """
+    logger = logging.getLogger('login_test')
+    device = DeviceFingerprint(config.get_execution_config().get('fingerprint_seed'), config.get_device_catalog_config())
+    if fingerprint is None:
+        fingerprint = device.get_device_fingerprint(user_type)
+        logger.info(f"使用设备指纹: {user_type} (seed={fingerprint.seed}, hash={fingerprint.content_hash})")
+    else:
+        logger.info(f"使用指定的设备指纹: {fingerprint.platform}, {fingerprint.timezone_id}, {fingerprint.locale} "
+                    f"(hash={fingerprint.content_hash})")
+    return fingerprint, device.create_browser_context_options(user_type, fingerprint)
+
+def fingerprint_factors(fingerprint, proxy=None):
+    """
+    提取用于RBA因子分析的设备指纹特征
+
+    Args:
+        fingerprint: DeviceFingerprint 生成的 Fingerprint
+        proxy: 本次测试使用的 Playwright 代理配置（可为None）
+
+    Returns:
+        {"viewport", "timezone_id", "locale", "platform", "proxy", "hash", "seed"}，
+        hash 为指纹的内容哈希，seed 为生成指纹的随机种子（指定的指纹为None），可用于复现
+    """
+    width, height = fingerprint.viewport
+    return {
+        "viewport": f"{width}x{height}",
+        "timezone_id": fingerprint.timezone_id,
+        "locale": fingerprint.locale,
+        "platform": fingerprint.platform,
+        "proxy": proxy["server"] if proxy else "direct",
+        "hash": fingerprint.content_hash,
+        "seed": fingerprint.seed
+    }
+
+def proxy_unavailable_result(user_type, fingerprint, error):
+    """
+    构造没有可用代理、测试未执行时的结果
+
+    设备指纹特征中的代理记为 proxy_manager.PROXY_UNAVAILABLE，与直连的结果区分开，分析时排除
+
+    Args:
+        user_type: 用户类型
+        fingerprint: 本次测试的 Fingerprint
+        error: ProxyUnavailableError
+
+    Returns:
+        测试结果字典
+    """
+    logging.getLogger('login_test').error(f"{str(error)}，本次测试不执行")
+    result = build_error_result(user_type, str(error))
+    factors = fingerprint_factors(fingerprint)
+    factors["proxy"] = PROXY_UNAVAILABLE
+    return attach_fingerprint(result, factors)
+
+def attach_fingerprint(result, factors):
+    """把设备指纹特征写入测试结果的"设备指纹"字段，返回测试结果"""
+    if isinstance(result, dict):
+        result.setdefault("details", {})["设备指纹"] = factors
+    return result
+
+# 登录策略的默认回退顺序
+LOGIN_STRATEGIES = ['login_frame', 'alternative_frame', 'oauth_frame', 'bare_form']
+
+# 各登录策略中等待元素的完整超时时间（毫秒）
+LOGIN_TIMEOUTS = {
+    "login_frame": 30000,     # 等待 iframe#login_frame 出现
+    "frame_switcher": 10000,  # 标准登录框中的密码登录按钮
+    "alt_switcher": 5000,     # 备选登录框中的密码登录按钮
+    "username": 5000,         # 用户名输入框
+    "oauth_frame": 40000,     # 等待 OAuth iframe 出现
+    "oauth_switcher": 20000,  # OAuth iframe 中的帐号密码登录链接
+}
+
+class LoginAttempt:
+    """一次登录策略尝试所需的上下文"""
+
+    def __init__(self, page, behavior, credentials, user_type, timer,
+                 frame_inventory=None, probe=False, probe_timeout=3000, selectors=None, run_label=None,
+                 io=None):
+        """
+        初始化登录策略尝试
+
+        Args:
+            page: Playwright页面对象
+            behavior: 人类行为模拟器
+            credentials: 登录凭证
+            user_type: 用户类型
+            timer: PhaseTimer
+            frame_inventory: page_probe.FrameInventory（可为None）
+            probe: 是否为短超时探测
+            probe_timeout: 探测时每次等待的最长时间（毫秒）
+            selectors: 登录路径缓存中记录的该策略上次成功使用的选择器
+            run_label: 截图文件名中使用的运行标识，默认为用户类型
+            io: SyncFlowIO 或 AsyncFlowIO
+        """
+        self.page = page
+        self.behavior = behavior
+        self.credentials = credentials
+        self.user_type = user_type
+        self.timer = timer
+        self.frame_inventory = frame_inventory
+        self.probe = probe
+        self.selectors = selectors or {}
+        self.run_label = run_label or user_type
+        self.io = io
+        # 是否已经点击登录提交了账号密码，提交后出错不能再换其他登录路径重新输入
+        self.submitted = False
+
+        if probe:
+            self.timeouts = {key: min(value, probe_timeout) for key, value in LOGIN_TIMEOUTS.items()}
+        else:
+            self.timeouts = dict(LOGIN_TIMEOUTS)
+
+    def phase(self, name):
+        """开始一个计时阶段，探测时阶段名带 probe. 前缀"""
+        self.timer.phase(f"probe.{name}" if self.probe else name)
+
+    def ordered(self, key, candidates):
+        """
+        把缓存中上次成功的选择器排在候选列表最前面
+
+        Args:
+            key: 缓存中的选择器类别
+            candidates: 默认的候选选择器列表
+
+        Returns:
+            调整顺序后的选择器列表
+        """
+        cached = self.selectors.get(key)
+        if cached in candidates:
+            return [cached] + [selector for selector in candidates if selector != cached]
+        return list(candidates)
+
+class SyncFlowIO:
+    """同步执行引擎的I/O适配，登录步骤中 yield 的值已经是调用结果"""
+
+    def __init__(self, screenshots, session=None):
+        """
+        初始化I/O适配
+
+        Args:
+            screenshots: screenshot_manager.ScreenshotManager
+            session: session_profile.SessionProfile（可为None）
+        """
+        self.screenshots = screenshots
+        self.session = session
+
+    def capture(self, page, name, failure=False):
+        """截图，参数同 ScreenshotManager.capture"""
+        return self.screenshots.capture(page, name, failure=failure)
+
+    def probe_selectors(self, page, selectors):
+        """批量探测选择器"""
+        return probe_selectors(page, selectors)
+
+    def inventory_frames(self, page):
+        """获取页面的frame清单"""
+        return inventory_frames(page)
+
+    def logged_in(self, page):
+        """恢复的会话是否已直接进入邮箱"""
+        return self.session.logged_in(page)
+
+    def save_session(self, context):
+        """保存会话"""
+        return self.session.save(context)
+
+    def discard_session(self, context):
+        """清除上下文中失效的会话并删除保存的会话"""
+        return self.session.discard(context)
+
+    def run(self, steps):
+        """
+        执行登录步骤生成器
+
+        Args:
+            steps: login_steps 等生成器
+
+        Returns:
+            生成器的返回值
+        """
+        value = None
+        while True:
+            try:
+                value = steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+
+class AsyncFlowIO(SyncFlowIO):
+    """异步执行引擎的I/O适配，登录步骤中 yield 的值是需要 await 的协程"""
+
+    def capture(self, page, name, failure=False):
+        """截图，参数同 ScreenshotManager.async_capture"""
+        return self.screenshots.async_capture(page, name, failure=failure)
+
+    def probe_selectors(self, page, selectors):
+        """批量探测选择器"""
+        return async_probe_selectors(page, selectors)
+
+    def inventory_frames(self, page):
+        """获取页面的frame清单"""
+        return async_inventory_frames(page)
+
+    def logged_in(self, page):
+        """恢复的会话是否已直接进入邮箱"""
+        return self.session.async_logged_in(page)
+
+    def save_session(self, context):
+        """保存会话"""
+        return self.session.async_save(context)
+
+    def discard_session(self, context):
+        """清除上下文中失效的会话并删除保存的会话"""
+        return self.session.async_discard(context)
+
+    async def run(self, steps):
+        """
+        执行登录步骤生成器，调用出错时把异常抛回生成器中对应的 yield 处
+
+        Args:
+            steps: login_steps 等生成器
+
+        Returns:
+            生成器的返回值
+        """
+        value, error = None, None
+        while True:
+            try:
+                pending = steps.throw(error) if error is not None else steps.send(value)
+            except StopIteration as stop:
+                return stop.value
+            value, error = None, None
+            try:
+                value = await pending if inspect.isawaitable(pending) else pending
+            except Exception as e:
+                error = e
+
+def detect_rba(page):
+    """检测登录后是否出现安全验证"""
+    title = yield page.title()
+    if "QQ安全中心" in title:
+        return True
+    return (yield page.locator('text=安全验证').count()) > 0
+
+def _submit_credentials(attempt, username_input, password_input, login_button):
+    """输入账号密码并点击登录，等待页面加载后检测是否触发安全验证
+
+    Args:
+        attempt: LoginAttempt对象
+        username_input: 用户名输入框
+        password_input: 密码输入框
+        login_button: 登录按钮
+
+    Returns:
+        测试结果字典
+    """
+    logger = logging.getLogger('login_test')
+    page, behavior = attempt.page, attempt.behavior
+
+    # 输入用户名
+    logger.info("输入用户名")
+    yield behavior.human_like_typing(username_input, login_account(attempt.credentials['email']))
+    yield behavior.random_delay()
+
+    # 输入密码
+    logger.info("输入密码")
+    yield behavior.human_like_typing(password_input, attempt.credentials['password'])
+    yield behavior.random_delay()
+
+    # 点击登录按钮
+    logger.info("点击登录按钮")
+    attempt.submitted = True
+    yield login_button.click()
+
+    # 等待页面加载
+    attempt.phase('post_login_detection')
+    yield page.wait_for_load_state('networkidle')
+    yield behavior.random_delay(2.0, 5.0)
+
+    # 检测是否有安全验证
+    rba_triggered = yield from detect_rba(page)
+    if rba_triggered:
+        logger.warning("检测到安全验证，RBA机制已触发")
+    else:
+        logger.info("登录成功，未触发RBA机制")
+    return build_login_result(attempt.user_type, (yield page.title()), rba_triggered)
+
+def _login_with_frame(attempt, login_frame, switcher_timeout):
+    """在登录框iframe中切换到密码登录并完成登录，返回测试结果"""
+    behavior = attempt.behavior
+
+    # 等待密码登录按钮可点击
+    yield login_frame.locator('#switcher_plogin').wait_for(state='visible', timeout=switcher_timeout)
+    yield login_frame.locator('#switcher_plogin').click()
+    yield behavior.random_delay(1.0, 2.0)  # 点击后稍等片刻
+
+    # 等待用户名输入框可用
+    yield login_frame.locator('#u').wait_for(state='visible', timeout=attempt.timeouts['username'])
+
+    return (yield from _submit_credentials(
+        attempt, login_frame.locator('#u'), login_frame.locator('#p'), login_frame.locator('#login_button')
+    ))
+
+def _login_via_login_frame(attempt):
+    """通过标准登录框 iframe#login_frame 登录
+
+    Returns:
+        (测试结果, 使用的选择器)，失败时抛出异常
+    """
+    logger = logging.getLogger('login_test')
+    page = attempt.page
+
+    try:
+        # 等待登录框iframe出现
+        attempt.phase('login_frame_wait')
+        logger.info("等待iframe加载...")
+        yield page.wait_for_selector('iframe#login_frame', timeout=attempt.timeouts['login_frame'])
+        logger.info("iframe已加载")
+        attempt.phase('login_frame_login')
+
+        # 获取登录框
+        login_frame = page.frame_locator('iframe#login_frame')
+
+        # 截图便于调试
+        yield attempt.io.capture(page, f"login_page_{attempt.run_label}_{timestamp_suffix()}")
+
+        # 先点击"密码登录"按钮
+        logger.info("点击密码登录按钮")
+        result = yield from _login_with_frame(attempt, login_frame, attempt.timeouts['frame_switcher'])
+        return result, {"frame": 'iframe#login_frame'}
+    except Exception as e:
+        logger.warning(f"处理标准登录框时出错: {str(e)}")
+        raise
+
+def _login_via_alternative_frame(attempt):
+    """通过备选选择器找到的登录框登录，优先使用上次成功的选择器
+
+    Returns:
+        (测试结果, 使用的选择器)，失败时抛出异常
+    """
+    logger = logging.getLogger('login_test')
+    page = attempt.page
+
+    # 尝试其他可能的选择器
+    attempt.phase('alternative_frames')
+    for selector in attempt.ordered('frame', ALTERNATIVE_FRAME_SELECTORS):
+        logger.info(f"尝试使用备选选择器: {selector}")
+        if (yield page.locator(selector).count()) > 0:
+            logger.info(f"找到登录框使用选择器: {selector}")
+            login_frame = page.frame_locator(selector)
+
+            # 先点击"密码登录"按钮
+            logger.info("尝试点击密码登录按钮")
+            try:
+                result = yield from _login_with_frame(attempt, login_frame, attempt.timeouts['alt_switcher'])
+                return result, {"frame": selector}
+            except Exception as e:
+                logger.warning(f"使用备选选择器 {selector} 时出错: {str(e)}")
+                if attempt.submitted:
+                    raise
+                continue
+
+    raise RuntimeError("未找到可用的备选登录框")
+
+def _login_via_oauth_frame(attempt):
+    """遍历frame切换到密码登录，再通过QQ OAuth iframe登录
+
+    Returns:
+        (测试结果, 使用的选择器)，失败时抛出异常
+    """
+    logger = logging.getLogger('login_test')
+    page, behavior = attempt.page, attempt.behavior
+
+    # 遍历所有 iframe，尝试找到目标元素
+    attempt.phase('frame_walk')
+    logger.info("开始遍历所有 iframe，查找密码登录按钮")
+    # 复用之前的frame清单，只在本地刷新Frame列表
+    if attempt.frame_inventory:
+        attempt.frame_inventory.refresh_frames()
+        oauth_frames = attempt.frame_inventory.find_frames("oauth2.0/authorize")
+    else:
+        oauth_frames = [frame for frame in page.frames if frame.url and "oauth2.0/authorize" in frame.url]
+    for iframe in oauth_frames:
+        try:
+            logger.info(f"找到目标 iframe: {iframe.url}，尝试查找密码登录按钮")
+
+            # 切换到密码登录方式
+            password_login_button = iframe.locator('a#switcher_plogin')
+            if (yield password_login_button.count()) > 0:
+                yield password_login_button.click()
+                logger.info("成功点击密码登录按钮")
+                yield behavior.random_delay(1.0, 2.0)
+                break
+            else:
+                logger.warning("目标 iframe 中未找到密码登录按钮")
+        except Exception as e:
+            logger.warning(f"处理 iframe 时出错: {str(e)}")
+    else:
+        logger.error("未能在任何 iframe 中找到密码登录按钮")
+        yield attempt.io.capture(page, f"failed_to_find_password_login_{attempt.run_label}", failure=True)
+
+    # 如果尝试查找标准iframe失败，尝试oauth认证iframe
+    try:
+        attempt.phase('oauth_login')
+        logger.info("处理QQ OAuth iframe...")
+        yield page.wait_for_selector('iframe[src*="oauth2.0/authorize"]', timeout=attempt.timeouts['oauth_frame'])
+        oauth_frame = page.frame_locator('iframe[src*="oauth2.0/authorize"]')
+
+        # 切换到密码登录
+        yield oauth_frame.locator('a:has-text("帐号密码登录")').wait_for(state='visible', timeout=attempt.timeouts['oauth_switcher'])
+        yield oauth_frame.locator('a:has-text("帐号密码登录")').click()
+        yield behavior.random_delay(1.0, 2.0)
+
+        # 输入账号
+        yield oauth_frame.locator('input#u').fill(login_account(attempt.credentials['email']))
+        yield behavior.random_delay(0.5, 1.0)
+
+        # 输入密码
+        yield oauth_frame.locator('input#p').fill(attempt.credentials['password'])
+        yield behavior.random_delay(0.5, 1.0)
+
+        # 点击登录
+        attempt.submitted = True
+        yield oauth_frame.locator('button#login_button').click()
+        attempt.phase('post_login_detection')
+        yield page.wait_for_load_state('networkidle')
+
+        # 检查安全验证
+        if (yield page.locator('text=安全验证').count()) > 0:
+            logger.warning("RBA机制触发：需要安全验证")
+            result = {"success": False, "rba_triggered": True}
+        else:
+            logger.info("登录成功")
+            result = {"success": True, "rba_triggered": False}
+        return result, {"frame": 'iframe[src*="oauth2.0/authorize"]'}
+
+    except Exception as e:
+        logger.error(f"OAuth登录失败: {str(e)}")
+        yield attempt.io.capture(page, f"oauth_error_{attempt.run_label}", failure=True)
+        raise
+
+def _find_visible(page, selectors, label):
+    """按顺序查找第一个存在且可见的元素，返回 (元素, 选择器)"""
+    logger = logging.getLogger('login_test')
+    for selector in selectors:
+        logger.info(f"尝试查找{label}选择器: {selector}")
+        if (yield page.locator(selector).count()) > 0 and (yield page.locator(selector).is_visible()):
+            logger.info(f"找到{label}: {selector}")
+            return page.locator(selector), selector
+    return None, None
+
+def _login_via_bare_form(attempt):
+    """直接在页面上查找登录表单登录，优先使用上次成功的选择器
+
+    Returns:
+        (测试结果, 使用的选择器)，失败时抛出异常
+    """
+    logger = logging.getLogger('login_test')
+    page = attempt.page
+
+    # 如果尝试查找标准iframe失败，尝试直接在页面上查找登录表单
+    attempt.phase('bare_form')
+    logger.info("尝试直接在页面上查找登录表单")
+
+    username_input, username_selector = yield from _find_visible(page, attempt.ordered('username', USERNAME_SELECTORS), "用户名输入框")
+    password_input, password_selector = yield from _find_visible(page, attempt.ordered('password', PASSWORD_SELECTORS), "密码输入框")
+    login_button, button_selector = yield from _find_visible(page, attempt.ordered('button', LOGIN_BUTTON_SELECTORS), "登录按钮")
+
+    # 如果找到了所有必要元素，尝试登录
+    if username_input and password_input and login_button:
+        logger.info("找到所有必要的登录元素，尝试登录")
+
+        # 截图记录
+        yield attempt.io.capture(page, f"found_login_form_{attempt.run_label}_{timestamp_suffix()}")
+
+        result = yield from _submit_credentials(attempt, username_input, password_input, login_button)
+        return result, {"username": username_selector, "password": password_selector, "button": button_selector}
+
+    logger.warning("无法找到所有必要的登录元素")
+    if not username_input:
+        logger.warning("未找到用户名输入框")
+    if not password_input:
+        logger.warning("未找到密码输入框")
+    if not login_button:
+        logger.warning("未找到登录按钮")
+    raise RuntimeError("无法找到所有必要的登录元素")
+
+# 登录策略名称与实现的对应关系，默认顺序见 LOGIN_STRATEGIES
+LOGIN_STRATEGY_HANDLERS = {
+    "login_frame": _login_via_login_frame,
+    "alternative_frame": _login_via_alternative_frame,
+    "oauth_frame": _login_via_oauth_frame,
+    "bare_form": _login_via_bare_form,
+}
+
+def _select_qq_tab(page, behavior):
+    """登录界面有切换到QQ登录的标签时选中QQ登录方式"""
+    logger = logging.getLogger('login_test')
+
+    # 检查登录界面是否有切换到QQ登录的标签
+    logger.info("检查登录方式切换标签")
+    try:
+        # 检查是否存在QQ登录标签并点击
+        if (yield page.locator("#QQMailSdkTool_login_loginBox_tab_item_qq").is_visible()):
+            logger.info("找到QQ登录标签，确保选中QQ登录方式")
+            yield page.locator("#QQMailSdkTool_login_loginBox_tab_item_qq").click()
+            logger.info("已点击QQ登录标签")
+            yield behavior.random_delay(1.0, 2.0)
+        else:
+            logger.info("未找到QQ登录标签，尝试其他方式")
+    except Exception as e:
+        logger.warning(f"切换QQ登录标签时出错: {str(e)}")
+        # 继续执行，因为可能已经默认为QQ登录
+
+def _click_switcher(page, behavior):
+    """点击页面或登录iframe中的"密码登录"按钮"""
+    logger = logging.getLogger('login_test')
+    logger.info("尝试点击页面上的密码登录按钮")
+    try:
+        # 尝试使用JavaScript方式查找和点击密码登录按钮
+        logger.info("尝试使用JavaScript查找和点击密码登录按钮")
+        try:
+            # 尝试在主页面查找密码登录按钮
+            if (yield page.evaluate(FIND_SWITCHER_SCRIPT)):
+                logger.info("在主页面找到密码登录按钮，尝试点击")
+                yield page.evaluate("document.getElementById('switcher_plogin').click()")
+                logger.info("已通过JavaScript点击密码登录按钮")
+                yield behavior.random_delay(1.0, 2.0)
+            else:
+                logger.info("在主页面未找到密码登录按钮，尝试在iframe中查找")
+
+                # 尝试在登录iframe中查找
+                login_frame = page.frame('iframe#login_frame')
+                if login_frame:
+                    if (yield login_frame.evaluate(CLICK_SWITCHER_IN_FRAME_SCRIPT)):
+                        logger.info("已通过JavaScript在iframe中点击密码登录按钮")
+                        yield behavior.random_delay(1.0, 2.0)
+                    else:
+                        logger.warning("在iframe中未找到密码登录按钮")
+                else:
+                    logger.warning("未找到登录iframe")
+        except Exception as js_error:
+            logger.warning(f"使用JavaScript查找密码登录按钮时出错: {str(js_error)}")
+
+        # 如果JavaScript方法失败，回退到原始方法
+        login_frame = page.frame('iframe#login_frame')  # 获取 Frame 对象
+        if login_frame:
+            yield login_frame.locator('a#switcher_plogin').wait_for(state='visible', timeout=15000)
+            yield login_frame.locator('a#switcher_plogin').click()
+            yield behavior.random_delay(1.0, 2.0)  # 点击后稍等片刻
+    except Exception as e:
+        logger.warning(f"无法找到或点击页面上的密码登录按钮: {str(e)}")
+        # 继续尝试查找登录框，因为有些情况下可能不需要点击此按钮
+
+def login_steps(io, page, context, config, credentials, behavior, user_type, timer, run_label=None,
+                use_session=False):
+    """
+    打开登录页面并按登录路径缓存给出的顺序尝试各登录策略，由 io.run 执行
+
+    Args:
+        io: SyncFlowIO 或 AsyncFlowIO，其中的 session 为本次测试的持久化会话
+        page: Playwright页面对象
+        context: 页面所属的浏览器上下文
+        config: 配置对象
+        credentials: 登录凭证
+        behavior: HumanBehavior 或 AsyncHumanBehavior
+        user_type: 用户类型
+        timer: PhaseTimer
+        run_label: 截图文件名中使用的运行标识，默认为用户类型
+        use_session: 本次测试是否使用持久化会话
+
+    Returns:
+        测试结果字典（不含设备指纹和阶段耗时），出错时为 build_error_result 的结果
+    """
+    logger = logging.getLogger('login_test')
+    run_label = run_label or user_type
+    session = io.session
+
+    try:
+        # 访问QQ邮箱登录页面
+        timer.phase('goto')
+        logger.info("访问QQ邮箱登录页面")
+        yield page.goto(config.get_login_url(), timeout=60000)  # 增加超时时间到60秒
+        logger.info("页面加载完成，等待页面稳定")
+
+        # 增加页面稳定等待时间
+        timer.phase('wait_networkidle')
+        yield page.wait_for_load_state('networkidle')
+
+        # 恢复的会话仍然有效时登录页面直接进入邮箱，不再重新登录
+        if use_session and session.restored:
+            timer.phase('session_check')
+            if (yield io.logged_in(page)):
+                logger.info("保存的会话仍然有效，跳过登录")
+                yield io.save_session(context)
+                result = build_login_result(user_type, (yield page.title()), (yield from detect_rba(page)))
+                result["details"]["登录路径"] = "session"
+                return result
+            logger.info("保存的会话已失效，重新登录")
+            yield io.discard_session(context)
+
+        timer.phase('settle_delay')
+        yield behavior.random_delay(5.0, 8.0)  # 增加延迟时间，确保页面完全加载
+
+        # 验证页面结构
+        timer.phase('validate_page_structure')
+        dynamic_selectors = config.get_dynamic_selectors()
+        # 一次页面内调用探测动态选择器和所有可能的登录元素
+        probe_results = yield io.probe_selectors(page, list(dynamic_selectors) + POTENTIAL_SELECTORS)
+        validator = logging.getLogger('page_validator')
+        validator.info("开始验证页面结构")
+        log_probe_results(validator, dynamic_selectors, probe_results, text_error_as_warning=True)
+
+        # 查看页面上所有可能的登录按钮并记录
+        timer.phase('screenshot_initial')
+        logger.info("分析页面登录元素")
+        yield io.capture(page, f"login_page_initial_{run_label}_{timestamp_suffix()}")
+
+        # 打印页面文本内容以帮助分析
+        timer.phase('page_text')
+        logger.info(f"页面标题: {(yield page.title())}")
+        logger.info(f"页面文本: {(yield page.inner_text('body'))[:200]}...")  # 只打印前200个字符避免日志过长
+
+        # 查找所有iframe以便分析
+        timer.phase('iframe_enumeration')
+        frame_inventory = None
+        try:
+            frame_inventory = yield io.inventory_frames(page)
+            frame_inventory.log(logger)
+        except Exception as e:
+            logger.warning(f"获取iframe信息时出错: {str(e)}")
+
+        # 尝试查找各种可能的登录元素
+        timer.phase('selector_probe')
+        log_probe_results(logger, POTENTIAL_SELECTORS, probe_results)
+
+        timer.phase('qq_tab_switch')
+        yield from _select_qq_tab(page, behavior)
+
+        # 首先点击页面上的"密码登录"按钮
+        timer.phase('switcher_click')
+        yield from _click_switcher(page, behavior)
+
+        # 处理可能的登录框，按登录路径缓存给出的顺序尝试各登录策略
+        logger.info("处理登录框")
+        path_cache = LoginPathCache(config.get_login_cache_config())
+        structure_hash = compute_structure_hash(frame_inventory, probe_results)
+
+        for strategy, probe, cached_selectors in path_cache.plan(structure_hash, LOGIN_STRATEGIES):
+            attempt = LoginAttempt(
+                page, behavior, credentials, user_type, timer,
+                frame_inventory=frame_inventory, probe=probe,
+                probe_timeout=path_cache.probe_timeout, selectors=cached_selectors, run_label=run_label, io=io
+            )
+            if probe:
+                logger.info(f"优先尝试上次成功的登录路径: {strategy}")
+            try:
+                result, used_selectors = yield from LOGIN_STRATEGY_HANDLERS[strategy](attempt)
+            except Exception as e:
+                logger.info(f"登录路径 {strategy} 未成功: {str(e)}")
+                # 短超时探测失败不计入统计，随后还会以完整超时重试
+                if not probe or attempt.submitted:
+                    path_cache.record(structure_hash, strategy, False)
+                if attempt.submitted:
+                    # 账号密码已经提交，换其他登录路径会再次输入并提交，测试结果不再代表一次登录
+                    logger.error(f"登录路径 {strategy} 提交账号密码后出错，不再尝试其他登录路径")
+                    yield io.capture(page, f"failed_login_{run_label}_{timestamp_suffix()}", failure=True)
+                    return build_error_result(user_type, f"提交登录后出错: {str(e)}")
+                continue
+
+            path_cache.record(structure_hash, strategy, True, used_selectors)
+            result.setdefault("details", {})["登录路径"] = strategy
+            if use_session and result.get('success'):
+                yield io.save_session(context)
+            return result
+
+        # 如果所有尝试都失败，保存页面截图
+        yield io.capture(page, f"failed_login_{run_label}_{timestamp_suffix()}", failure=True)
+        logger.error("无法找到登录框或登录按钮，测试失败")
+        return build_error_result(user_type, "无法找到登录框或登录按钮")
+
+    except Exception as e:
+        logger.error(f"测试过程中出错: {str(e)}")
+        return build_error_result(user_type, str(e))
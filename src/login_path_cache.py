@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+# 多个测试同时更新缓存文件时使用的锁
+_cache_lock = threading.Lock()
+
+def compute_structure_hash(frame_inventory, probe_results):
+    """
+    计算登录页面结构的哈希，页面布局变化时哈希随之变化
+
+    Args:
+        frame_inventory: page_probe.FrameInventory 对象（可为None）
+        probe_results: page_probe.probe_selectors 的返回值
+
+    Returns:
+        16位十六进制字符串
+    """
+    iframes = []
+    if frame_inventory is not None:
+        for entry in frame_inventory.iframes:
+            # 只取地址路径，忽略每次不同的查询参数
+            parsed = urlparse(entry.get('src', ''))
+            iframes.append([entry.get('id', ''), entry.get('name', ''), parsed.netloc + parsed.path])
+
+    # 只记录元素是否存在，数量随页面内容变化，不代表布局变化
+    present = sorted(selector for selector, probe in probe_results.items() if probe.get('count', 0) > 0)
+
+    payload = json.dumps({"iframes": iframes, "present": present}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+class LoginPathCache:
+    """登录路径缓存，记录各登录策略在当前页面结构下的成功情况，优先尝试最近成功的策略"""
+
+    def __init__(self, cache_config):
+        """
+        初始化登录路径缓存
+
+        Args:
+            cache_config: 缓存配置，包含enabled, path, probe_timeout, window
+        """
+        self.enabled = cache_config.get('enabled', True)
+        self.path = cache_config.get('path', 'data/login_path_cache.json')
+        self.probe_timeout = cache_config.get('probe_timeout', 3000)
+        self.window = max(1, int(cache_config.get('window', 20)))
+
+        self.logger = logging.getLogger('login_path_cache')
+
+    def _load(self):
+        """读取缓存文件"""
+        if not os.path.exists(self.path):
+            return {"structure_hash": None, "strategies": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"加载登录路径缓存失败: {str(e)}")
+            return {"structure_hash": None, "strategies": {}}
+
+    def _save(self, data):
+        """原子写入缓存文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            self.logger.error(f"保存登录路径缓存失败: {str(e)}")
+
+    def _strategies_for(self, data, structure_hash):
+        """取出当前页面结构下的策略记录，结构变化时缓存失效"""
+        if data.get('structure_hash') != structure_hash:
+            return {}
+        return data.get('strategies', {})
+
+    @staticmethod
+    def _success_rate(entry):
+        """最近结果的成功率（拉普拉斯平滑，未尝试过的策略为0.5）"""
+        outcomes = entry.get('outcomes', [])
+        return (sum(outcomes) + 1) / (len(outcomes) + 2)
+
+    def plan(self, structure_hash, default_order):
+        """
+        生成本次登录的策略尝试计划
+
+        先以短超时探测最近成功过的策略，再按最近成功率从高到低以完整超时尝试所有策略。
+        按计划回退时，已经提交过账号密码的策略出错后不再尝试后面的策略（见 login_flow.login_steps）
+
+        Args:
+            structure_hash: 当前页面结构哈希
+            default_order: 默认的策略回退顺序
+
+        Returns:
+            [(策略名称, 是否为短超时探测, 缓存的选择器), ...]
+        """
+        if not self.enabled:
+            return [(name, False, {}) for name in default_order]
+
+        with _cache_lock:
+            data = self._load()
+        strategies = self._strategies_for(data, structure_hash)
+        if data.get('structure_hash') not in (None, structure_hash):
+            self.logger.info("页面结构已变化，登录路径缓存失效")
+
+        ordered = sorted(
+            default_order,
+            key=lambda name: (-self._success_rate(strategies.get(name, {})), default_order.index(name))
+        )
+
+        plan = []
+        for name in ordered:
+            entry = strategies.get(name, {})
+            if entry.get('outcomes', [])[-1:] == [1]:
+                plan.append((name, True, entry.get('selectors', {})))
+        for name in ordered:
+            plan.append((name, False, strategies.get(name, {}).get('selectors', {})))
+
+        if strategies:
+            self.logger.info(f"登录路径缓存命中，策略顺序: {[name for name, _, _ in plan]}")
+        return plan
+
+    def record(self, structure_hash, strategy, success, selectors=None):
+        """
+        记录一次策略尝试的结果
+
+        Args:
+            structure_hash: 当前页面结构哈希
+            strategy: 策略名称
+            success: 是否成功完成登录
+            selectors: 成功时使用的选择器
+        """
+        if not self.enabled:
+            return
+
+        with _cache_lock:
+            data = self._load()
+            if data.get('structure_hash') != structure_hash:
+                data = {"structure_hash": structure_hash, "strategies": {}}
+
+            entry = data['strategies'].setdefault(strategy, {"outcomes": [], "selectors": {}})
+            entry['outcomes'] = (entry.get('outcomes', []) + [1 if success else 0])[-self.window:]
+            if success:
+                entry['selectors'] = selectors or {}
+                entry['last_success'] = datetime.now().isoformat()
+            data['updated_at'] = datetime.now().isoformat()
+
+            self._save(data)
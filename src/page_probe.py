@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""批量探测页面元素
+
+一次 page.evaluate 调用即可得到整组选择器的匹配数量和第一个元素的文本，
+代替逐个选择器的 locator(selector).count() 和 .first.inner_text() 往返调用。
+
+页面内脚本只处理标准CSS选择器。Playwright专有语法（:has-text、text=、xpath=、>>、:visible 等）
+标记为不支持，由Python端回退到逐个 locator 调用，保证结果与原来一致。
+:has-text 的文本匹配规则（跳过 script/style 中的文本、包含 shadow root 中的文本等）
+只有Playwright自己的选择器引擎能保证一致，因此同样回退。
+"""
+
+# 页面内批量探测脚本
+PROBE_SCRIPT = """
+(selectors) => {
+    const PLAYWRIGHT_ONLY = /^[a-z_-]+=|>>|:visible|:text|:has-text|:nth-match|:left-of|:right-of|:above|:below|:near/i;
+
+    return selectors.map((selector) => {
+        if (PLAYWRIGHT_ONLY.test(selector)) {
+            return {selector, supported: false};
+        }
+
+        let elements;
+        try {
+            elements = Array.from(document.querySelectorAll(selector));
+        } catch (e) {
+            return {selector, supported: false};
+        }
+
+        const result = {selector, supported: true, count: elements.length, text: null, text_error: null};
+        if (elements.length > 0) {
+            const first = elements[0];
+            if (first instanceof HTMLElement) {
+                result.text = first.innerText;
+            } else {
+                result.text_error = 'Node is not an HTMLElement';
+            }
+        }
+        return result;
+    });
+}
+"""
+
+def _new_probe(selector):
+    """单个选择器的探测结果"""
+    return {"selector": selector, "count": 0, "text": None, "error": None, "text_error": None}
+
+def _merge(selectors, raw_results):
+    """把页面脚本的结果整理为 {选择器: 探测结果}，并返回需要回退的选择器"""
+    results = {}
+    fallback = []
+    for selector, raw in zip(selectors, raw_results):
+        probe = _new_probe(selector)
+        if raw.get('supported'):
+            probe['count'] = raw.get('count', 0)
+            probe['text'] = raw.get('text')
+            probe['text_error'] = raw.get('text_error')
+        else:
+            fallback.append(selector)
+        results[selector] = probe
+    return results, fallback
+
+def probe_selectors(page, selectors):
+    """
+    批量探测选择器
+
+    Args:
+        page: Playwright的Page或Frame对象
+        selectors: 选择器列表
+
+    Returns:
+        {选择器: {"count", "text", "error", "text_error"}}，顺序与输入一致；
+        error 为统计数量时的错误，text_error 为获取第一个元素文本时的错误
+    """
+    selectors = list(dict.fromkeys(selectors))
+    if not selectors:
+        return {}
+
+    try:
+        raw_results = page.evaluate(PROBE_SCRIPT, selectors)
+    except Exception:
+        # 页面脚本执行失败（例如页面正在跳转）时全部回退
+        raw_results = [{} for _ in selectors]
+    results, fallback = _merge(selectors, raw_results)
+
+    # 页面脚本无法解析的选择器回退到Playwright的选择器引擎
+    for selector in fallback:
+        probe = results[selector]
+        try:
+            probe['count'] = page.locator(selector).count()
+        except Exception as e:
+            probe['error'] = str(e)
+            continue
+        if probe['count'] > 0:
+            try:
+                probe['text'] = page.locator(selector).first.inner_text()
+            except Exception as e:
+                probe['text_error'] = str(e)
+
+    return results
+
+async def async_probe_selectors(page, selectors):
+    """
+    批量探测选择器（异步版本）
+
+    Args:
+        page: 异步Playwright的Page或Frame对象
+        selectors: 选择器列表
+
+    Returns:
+        与 probe_selectors 相同格式的结果
+    """
+    selectors = list(dict.fromkeys(selectors))
+    if not selectors:
+        return {}
+
+    try:
+        raw_results = await page.evaluate(PROBE_SCRIPT, selectors)
+    except Exception:
+        raw_results = [{} for _ in selectors]
+    results, fallback = _merge(selectors, raw_results)
+
+    for selector in fallback:
+        probe = results[selector]
+        try:
+            probe['count'] = await page.locator(selector).count()
+        except Exception as e:
+            probe['error'] = str(e)
+            continue
+        if probe['count'] > 0:
+            try:
+                probe['text'] = await page.locator(selector).first.inner_text()
+            except Exception as e:
+                probe['text_error'] = str(e)
+
+    return results
+
+def log_probe_results(logger, selectors, results, text_error_as_warning=False):
+    """
+    按原有格式输出选择器探测日志
+
+    Args:
+        logger: 日志记录器
+        selectors: 需要输出的选择器列表
+        results: probe_selectors 的返回值
+        text_error_as_warning: 获取文本失败时是否以WARNING级别输出错误信息
+    """
+    for selector in selectors:
+        probe = results[selector]
+        if probe['error'] is not None:
+            logger.warning(f"检查选择器 {selector} 时出错: {probe['error']}")
+            continue
+
+        logger.info(f"选择器 {selector}: 找到 {probe['count']} 个元素")
+        if probe['count'] > 0:
+            if probe['text_error'] is None:
+                logger.info(f"第一个 {selector} 元素的文本: {probe['text']}")
+            elif text_error_as_warning:
+                logger.warning(f"无法获取选择器 {selector} 的文本: {probe['text_error']}")
+            else:
+                logger.info(f"第一个 {selector} 元素无法获取文本")
+
+# 一次性读取主页面所有iframe元素属性的脚本
+FRAME_INVENTORY_SCRIPT = """
+() => Array.from(document.querySelectorAll('iframe')).map((el, index) => ({
+    index,
+    id: el.getAttribute('id') || '',
+    name: el.getAttribute('name') || '',
+    src: el.getAttribute('src') || '',
+    resolved_src: el.src || ''
+}))
+"""
+
+class FrameInventory:
+    """页面中iframe元素和Frame对象的清单，一次页面内调用即可获得所有iframe的属性"""
+
+    def __init__(self, page, iframes):
+        """
+        初始化frame清单
+
+        Args:
+            page: Playwright的Page对象
+            iframes: FRAME_INVENTORY_SCRIPT 返回的iframe属性列表
+        """
+        self.page = page
+        self.iframes = iframes
+        self.frames = []
+        self.refresh_frames()
+
+    def refresh_frames(self):
+        """
+        重新读取页面当前的Frame列表
+
+        page.frames 由Playwright在本地维护，读取时不需要与浏览器通信
+        """
+        self.frames = list(self.page.frames)
+        children = [frame for frame in self.frames if frame.parent_frame == self.page.main_frame]
+
+        # 为每个iframe元素匹配对应的Frame，先按name匹配，再按地址匹配
+        for entry in self.iframes:
+            entry['url'] = ''
+            for frame in children:
+                if (entry['name'] and frame.name == entry['name']) or \
+                        (entry['resolved_src'] and frame.url == entry['resolved_src']):
+                    entry['url'] = frame.url
+                    break
+            else:
+                entry['url'] = entry['resolved_src']
+        return self.frames
+
+    def find_frames(self, url_fragment):
+        """
+        查找地址中包含指定片段的Frame
+
+        Args:
+            url_fragment: 地址片段，例如 "oauth2.0/authorize"
+
+        Returns:
+            匹配的Frame列表
+        """
+        return [frame for frame in self.frames if frame.url and url_fragment in frame.url]
+
+    def log(self, logger):
+        """按原有格式输出iframe清单"""
+        logger.info(f"页面中找到 {len(self.iframes)} 个iframe")
+        for entry in self.iframes:
+            logger.info(
+                f"iframe {entry['index']}: id='{entry['id']}', name='{entry['name']}', src='{entry['src']}'"
+            )
+
+def inventory_frames(page):
+    """
+    获取页面的frame清单
+
+    Args:
+        page: Playwright的Page对象
+
+    Returns:
+        FrameInventory对象
+    """
+    return FrameInventory(page, page.evaluate(FRAME_INVENTORY_SCRIPT))
+
+async def async_inventory_frames(page):
+    """
+    获取页面的frame清单（异步版本）
+
+    Args:
+        page: 异步Playwright的Page对象
+
+    Returns:
+        FrameInventory对象
+    """
+    return FrameInventory(page, await page.evaluate(FRAME_INVENTORY_SCRIPT))
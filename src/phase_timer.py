@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# 同一进程内多个测试写入同一个计时文件时使用的锁
+_write_lock = threading.Lock()
+
+class PhaseTimer:
+    """轻量级的阶段计时器，记录一次登录测试中各阶段和各操作的耗时"""
+
+    CSV_FIELDS = ["run_id", "timestamp", "user_type", "phase", "start", "duration"]
+
+    def __init__(self, user_type="normal", run_id=None):
+        """
+        初始化阶段计时器
+
+        Args:
+            user_type: 用户类型
+            run_id: 本次运行的标识，默认自动生成
+        """
+        self.user_type = user_type
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.timestamp = datetime.now().isoformat()
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._current_phase = None
+
+    def _record(self, name, start):
+        """记录一个已结束的计时区间"""
+        end = time.perf_counter()
+        self.spans.append({
+            "phase": name,
+            "start": round(start - self._origin, 4),
+            "duration": round(end - start, 4)
+        })
+
+    @contextmanager
+    def span(self, name):
+        """
+        计时一个代码块
+
+        Args:
+            name: 区间名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start)
+
+    def phase(self, name):
+        """
+        开始一个顺序执行的阶段，同时结束上一个阶段
+
+        Args:
+            name: 阶段名称
+        """
+        self.finish()
+        self._current_phase = (name, time.perf_counter())
+
+    def finish(self):
+        """结束当前阶段"""
+        if self._current_phase:
+            name, start = self._current_phase
+            self._current_phase = None
+            self._record(name, start)
+
+    def elapsed(self):
+        """计时器创建以来经过的秒数"""
+        return time.perf_counter() - self._origin
+
+    def summary(self):
+        """
+        按名称汇总各区间的耗时
+
+        Returns:
+            {名称: 累计秒数} 字典，按首次出现的顺序排列，另含"total"总耗时
+        """
+        totals = {}
+        for span in self.spans:
+            totals[span["phase"]] = totals.get(span["phase"], 0.0) + span["duration"]
+        result = {name: round(value, 3) for name, value in totals.items()}
+        result["total"] = round(self.elapsed(), 3)
+        return result
+
+    def write(self, path):
+        """
+        将本次运行的计时数据追加到计时文件
+
+        Args:
+            path: 计时文件路径，.json/.jsonl 后缀写入JSON行，其余写入CSV
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with _write_lock:
+            if path.endswith(('.json', '.jsonl')):
+                record = {
+                    "run_id": self.run_id,
+                    "timestamp": self.timestamp,
+                    "user_type": self.user_type,
+                    "total": round(self.elapsed(), 4),
+                    "spans": self.spans
+                }
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            else:
+                write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+                with open(path, 'a', encoding='utf-8', newline='') as f:
+                    writer = csv.DictWriter(f, fieldnames=self.CSV_FIELDS)
+                    if write_header:
+                        writer.writeheader()
+                    for span in self.spans:
+                        writer.writerow({
+                            "run_id": self.run_id,
+                            "timestamp": self.timestamp,
+                            "user_type": self.user_type,
+                            **span
+                        })
+
+def attach_timings(result, timer, timing_path=None):
+    """
+    结束计时并把阶段耗时写入测试结果及计时文件
+
+    Args:
+        result: perform_login_test 返回的结果字典（可能为None）
+        timer: 本次运行的PhaseTimer
+        timing_path: 计时文件路径，为空时不写文件
+    """
+    timer.finish()
+
+    if isinstance(result, dict):
+        result.setdefault("details", {})["阶段耗时"] = timer.summary()
+
+    if timing_path:
+        try:
+            timer.write(timing_path)
+        except Exception as e:
+            logging.getLogger('phase_timer').error(f"保存阶段耗时失败: {str(e)}")
+
+    return result
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import base64
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, unquote
+
+# 所有 ProxyHealthChecker 共用的检查结果缓存：{代理地址: 检查结果}
+_health_cache = {}
+_cache_lock = threading.Lock()
+
+def _proxy_endpoint(proxy_url):
+    """解析代理地址，返回 (协议, 主机, 端口)"""
+    parsed = urlparse(proxy_url if '://' in proxy_url else f"http://{proxy_url}")
+    scheme = parsed.scheme.lower()
+    default_port = 1080 if scheme.startswith('socks') else (443 if scheme == 'https' else 8080)
+    return scheme, parsed.hostname, parsed.port or default_port
+
+def _connect_request(proxy_url, target):
+    """构造发往HTTP代理的 CONNECT 请求，代理地址中带账号密码时附加认证头"""
+    parsed = urlparse(proxy_url if '://' in proxy_url else f"http://{proxy_url}")
+    lines = [f"CONNECT {target} HTTP/1.1", f"Host: {target}"]
+    if parsed.username:
+        token = f"{unquote(parsed.username)}:{unquote(parsed.password or '')}"
+        lines.append(f"Proxy-Authorization: Basic {base64.b64encode(token.encode('utf-8')).decode('ascii')}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('ascii')
+
+class ProxyHealthChecker:
+    """代理健康检查，测量连接延迟和首字节延迟，检查结果在TTL内缓存"""
+
+    def __init__(self, health_config):
+        """
+        初始化代理健康检查
+
+        Args:
+            health_config: 检查配置，包含enabled, ttl, timeout, check_target
+        """
+        self.enabled = health_config.get('enabled', True)
+        self.ttl = health_config.get('ttl', 300)
+        self.timeout = health_config.get('timeout', 5.0)
+        # CONNECT 请求的目标，代理需要连通目标后才会返回响应
+        self.check_target = health_config.get('check_target', 'mail.qq.com:443')
+
+        self.logger = logging.getLogger('proxy_health')
+
+    def check(self, proxy_url):
+        """
+        检查单个代理
+
+        HTTP代理发送 CONNECT 请求并等待响应首字节，SOCKS5代理发送握手请求并等待应答；
+        其他协议只测量TCP连接
+
+        Args:
+            proxy_url: 代理地址
+
+        Returns:
+            {"proxy", "healthy", "connect_latency", "first_byte_latency", "error", "checked_at"}，延迟单位为秒
+        """
+        result = {
+            "proxy": proxy_url,
+            "healthy": False,
+            "connect_latency": None,
+            "first_byte_latency": None,
+            "error": None,
+            "checked_at": time.time()
+        }
+
+        try:
+            scheme, host, port = _proxy_endpoint(proxy_url)
+            start = time.perf_counter()
+            with socket.create_connection((host, port), timeout=self.timeout) as sock:
+                result["connect_latency"] = time.perf_counter() - start
+
+                if scheme in ('http', ''):
+                    request = _connect_request(proxy_url, self.check_target)
+                elif scheme.startswith('socks5'):
+                    request = b"\x05\x01\x00"  # 版本5，1种认证方式：无需认证
+                else:
+                    result["healthy"] = True
+                    return result
+
+                sock.settimeout(self.timeout)
+                start = time.perf_counter()
+                sock.sendall(request)
+                response = sock.recv(64)
+                if not response:
+                    raise ConnectionError("代理关闭了连接")
+                result["first_byte_latency"] = time.perf_counter() - start
+
+                if scheme.startswith('socks5'):
+                    if response[:1] != b"\x05":
+                        raise ConnectionError("无效的SOCKS5应答")
+                    if response[1:2] != b"\x00":
+                        # 0xFF 表示代理不接受无需认证的连接，实际使用时会被拒绝
+                        raise ConnectionError(f"SOCKS5代理拒绝了无需认证的连接: 0x{response[1:2].hex() or '--'}")
+                else:
+                    status_line = response.split(b"\r\n", 1)[0].decode('latin-1')
+                    parts = status_line.split()
+                    if len(parts) < 2 or not parts[1].startswith('2'):
+                        raise ConnectionError(f"代理返回: {status_line}")
+
+                result["healthy"] = True
+        except Exception as e:
+            result["error"] = str(e) or e.__class__.__name__
+
+        return result
+
+    def _cached(self, proxy_url):
+        """返回未过期的缓存结果"""
+        with _cache_lock:
+            entry = _health_cache.get(proxy_url)
+        if entry and time.time() - entry["checked_at"] < self.ttl:
+            return entry
+        return None
+
+    def check_all(self, proxies, force=False):
+        """
+        并行检查多个代理，未过期的结果直接使用缓存
+
+        Args:
+            proxies: 代理地址列表
+            force: 是否忽略缓存重新检查
+
+        Returns:
+            {代理地址: 检查结果}
+        """
+        results = {}
+        stale = []
+        for proxy in dict.fromkeys(proxies):
+            entry = None if force else self._cached(proxy)
+            if entry:
+                results[proxy] = entry
+            else:
+                stale.append(proxy)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as executor:
+                for entry in executor.map(self.check, stale):
+                    results[entry["proxy"]] = entry
+                    with _cache_lock:
+                        _health_cache[entry["proxy"]] = entry
+                    if entry["healthy"]:
+                        latency = (entry["connect_latency"] or 0) + (entry["first_byte_latency"] or 0)
+                        self.logger.info(f"代理 {entry['proxy']} 可用，延迟 {latency * 1000:.0f}ms")
+                    else:
+                        self.logger.warning(f"代理 {entry['proxy']} 不可用: {entry['error']}")
+
+        return results
+
+    def healthy_proxies(self, proxies):
+        """
+        获取可用的代理，按延迟从低到高排列
+
+        Args:
+            proxies: 代理地址列表
+
+        Returns:
+            可用代理地址列表；未启用检查时按原顺序返回全部代理
+        """
+        if not self.enabled:
+            return list(proxies)
+
+        results = self.check_all(proxies)
+        healthy = [proxy for proxy in dict.fromkeys(proxies) if results[proxy]["healthy"]]
+        return sorted(
+            healthy,
+            key=lambda proxy: (results[proxy]["connect_latency"] or 0) + (results[proxy]["first_byte_latency"] or 0)
+        )
+
+def clear_health_cache():
+    """清空代理检查结果缓存"""
+    with _cache_lock:
+        _health_cache.clear()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+
+# 同一进程内多个 ProxyHistory 写入同一文件时使用的锁
+_history_lock = threading.Lock()
+
+class ProxyHistory:
+    """代理使用记录存储
+
+    记录以JSON行的形式追加写入文件，每次记录只有一次追加写入；
+    内存中用定长deque保存最近的记录，第一次读取时才加载文件。
+    文件大小超过约两倍上限条数的记录后，原子地压缩为最近的记录。
+    设置 flush_interval 后记录先缓存在内存中，定时或调用 flush()/close() 时批量写入。
+    """
+
+    def __init__(self, path="data/proxy_history.jsonl", max_records=1000,
+                 legacy_path="data/proxy_history.json", flush_interval=0):
+        """
+        初始化代理使用记录存储
+
+        Args:
+            path: JSON行格式的记录文件路径
+            max_records: 保留的最近记录条数
+            legacy_path: 旧版整体JSON格式的记录文件，新文件不存在时从中迁移
+            flush_interval: 批量写入的间隔（秒），0表示每条记录立即写入
+        """
+        self.path = path
+        self.max_records = max(1, int(max_records))
+        self.legacy_path = legacy_path
+        self.flush_interval = max(0.0, float(flush_interval))
+
+        self.logger = logging.getLogger('proxy_manager')
+
+        # 最近的记录，None 表示尚未加载
+        self._records = None
+        # 尚未写入文件的记录
+        self._pending = []
+        self._flush_timer = None
+        self._closed = False
+
+        if self.flush_interval:
+            # 进程退出前写入缓存的记录
+            atexit.register(self.flush)
+
+    def _read_file(self):
+        """读取记录文件中最近的记录，跳过损坏的行（例如写入中途崩溃留下的半行）"""
+        records = deque(maxlen=self.max_records)
+        skipped = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    skipped += 1
+        if skipped:
+            self.logger.warning(f"代理历史记录中有 {skipped} 行无法解析，已跳过")
+        return records
+
+    def _read_legacy(self):
+        """读取旧版JSON格式的记录文件"""
+        records = deque(maxlen=self.max_records)
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                records.extend(json.load(f))
+        return records
+
+    def _write_atomic(self, records):
+        """把记录写入临时文件后替换记录文件，避免写入中途崩溃损坏文件"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.path)
+
+    def _ensure_loaded(self):
+        """第一次访问记录时加载文件"""
+        if self._records is not None:
+            return
+
+        with _history_lock:
+            try:
+                if os.path.exists(self.path):
+                    self._records = self._read_file()
+                else:
+                    self._records = self._read_legacy()
+                    if self._records:
+                        self._write_atomic(self._records)
+                        self.logger.info(f"已将 {len(self._records)} 条代理使用记录迁移至 {self.path}")
+                # 尚未写入文件的记录同样属于历史记录
+                self._records.extend(self._pending)
+                self.logger.debug(f"加载了 {len(self._records)} 条代理使用记录")
+            except Exception as e:
+                self.logger.error(f"加载代理历史记录失败: {str(e)}")
+                self._records = deque(maxlen=self.max_records)
+
+    @property
+    def records(self):
+        """最近的代理使用记录列表，按时间顺序排列"""
+        self._ensure_loaded()
+        return list(self._records)
+
+    def append(self, record):
+        """
+        追加一条记录
+
+        Args:
+            record: 代理使用记录字典
+        """
+        # 新文件还不存在时先加载（并迁移旧版记录），之后的追加不需要读取文件
+        if self._records is None and not os.path.exists(self.path):
+            self._ensure_loaded()
+
+        with _history_lock:
+            if self._records is not None:
+                self._records.append(record)
+
+            if self.flush_interval and not self._closed:
+                self._pending.append(record)
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+
+            needs_compaction = self._write_lines([record])
+
+        if needs_compaction:
+            self.compact()
+
+    def flush(self):
+        """把缓存的记录一次性追加写入文件"""
+        with _history_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            records, self._pending = self._pending, []
+            needs_compaction = self._write_lines(records) if records else False
+
+        if needs_compaction:
+            self.compact()
+
+    def close(self):
+        """写入缓存的记录，之后的记录立即写入"""
+        self.flush()
+        self._closed = True
+        if self.flush_interval:
+            atexit.unregister(self.flush)
+
+    def _write_lines(self, records):
+        """
+        追加写入记录，调用时需持有 _history_lock
+
+        Returns:
+            文件是否需要压缩
+        """
+        lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                # 按本次记录的平均长度估算文件中的行数，不需要读取文件
+                average = len(lines.encode('utf-8')) / len(records)
+                return f.tell() > average * self.max_records * 2
+        except Exception as e:
+            self.logger.error(f"保存代理历史记录失败: {str(e)}")
+            return False
+
+    def compact(self):
+        """把记录文件原子地压缩为最近的 max_records 条记录"""
+        with _history_lock:
+            try:
+                if not os.path.exists(self.path):
+                    return
+                # 重新读取文件，保留其他实例追加的记录
+                records = self._read_file()
+                self._write_atomic(records)
+                if self._records is not None:
+                    self._records = records
+                self.logger.debug(f"代理历史记录已压缩为 {len(records)} 条")
+            except Exception as e:
+                self.logger.error(f"压缩代理历史记录失败: {str(e)}")
@@ -3,19 +3,47 @@
 
 import random
 import logging
-import json
-import os
+import threading
 from datetime import datetime
 
+from proxy_history import ProxyHistory
+from proxy_health import ProxyHealthChecker
+
+# 无法取得可用代理时测试结果中记录的代理因子取值
+PROXY_UNAVAILABLE = "unavailable"
+
+# 各用户类型的代理选择规则：
+#   fixed  - 总是使用固定代理（servers[0]），代表常用的网络环境
+#   rotate - 每次随机选择可用代理（random=false 时使用最后一个代理）
+#   other  - 使用最快的非固定代理，代表陌生的网络环境
+# 目录设备用户（catalog）是从设备画像目录中抽取的陌生设备，按新设备用户的规则选择；
+# 实验计划（experiment）有多个代理时由代理因子直接指定代理，只有一个代理时使用固定代理，
+# 使设备指纹之外的网络环境保持不变。
+PROXY_RULES = {
+    "normal": "fixed",
+    "high_risk": "rotate",
+    "new_device": "other",
+    "catalog": "other",
+    "experiment": "fixed",
+}
+
+class ProxyUnavailableError(RuntimeError):
+    """启用了代理但没有可用的代理，测试不能改为直连执行"""
+
 class ProxyManager:
-    """代理IP管理器，用于管理和选择测试使用的代理服务器"""
+    """代理IP管理器，用于管理和选择测试使用的代理服务器
+    
+    一次运行中的所有场景共用同一个实例，可以在多个线程中同时使用；
+    使用完毕后调用 close()（或使用 with 语句）写入缓存的使用记录。
+    """
     
-    def __init__(self, proxy_config):
+    def __init__(self, proxy_config, health_config=None):
         """
         初始化代理管理器
         
         Args:
-            proxy_config: 代理配置字典，包含enabled, servers, random等
+            proxy_config: 代理配置字典，包含enabled, servers, random, history_path, history_flush_interval等
+            health_config: 代理健康检查配置，未提供时不做检查
         """
         self.enabled = proxy_config.get('enabled', False)
         self.servers = proxy_config.get('servers', [])
@@ -29,66 +57,73 @@ class ProxyManager:
             self.logger.warning("代理功能已启用但未配置服务器，将禁用代理")
             self.enabled = False
         
-        # 代理使用记录
-        self.usage_history = []
+        # 代理健康检查，选择时排除不可用的代理
+        self.health_checker = ProxyHealthChecker(health_config or {"enabled": False})
         
-        # 加载历史记录
-        self._load_history()
-    
-    def _load_history(self):
-        """加载代理使用历史记录"""
-        history_path = "data/proxy_history.json"
+        # 代理使用记录，批量追加写入文件，第一次读取时才加载
+        self.history = ProxyHistory(
+            proxy_config.get('history_path', 'data/proxy_history.jsonl'),
+            flush_interval=proxy_config.get('history_flush_interval', 0)
+        )
         
-        if os.path.exists(history_path):
-            try:
-                with open(history_path, 'r', encoding='utf-8') as f:
-                    self.usage_history = json.load(f)
-                self.logger.debug(f"加载了 {len(self.usage_history)} 条代理使用记录")
-            except Exception as e:
-                self.logger.error(f"加载代理历史记录失败: {str(e)}")
+        # 保护代理选择中的随机数和使用记录
+        self._lock = threading.Lock()
     
-    def _save_history(self):
-        """保存代理使用历史记录"""
-        history_path = "data/proxy_history.json"
-        
-        # 确保目录存在
-        os.makedirs(os.path.dirname(history_path), exist_ok=True)
-        
-        try:
-            with open(history_path, 'w', encoding='utf-8') as f:
-                json.dump(self.usage_history, f, ensure_ascii=False, indent=2)
-            self.logger.debug(f"保存了 {len(self.usage_history)} 条代理使用记录")
-        except Exception as e:
-            self.logger.error(f"保存代理历史记录失败: {str(e)}")
+    @property
+    def usage_history(self):
+        """最近的代理使用记录列表"""
+        return self.history.records
     
     def get_proxy(self, user_type="normal"):
         """
         根据用户类型获取适合的代理服务器
         
         Args:
-            user_type: 用户类型，可选值为 "normal", "high_risk", "new_device"
+            user_type: 用户类型，PROXY_RULES 中的键
             
         Returns:
             代理服务器URL字符串，如果禁用代理则返回None
+
+        Raises:
+            ProxyUnavailableError: 启用了代理但所有代理均不可用，或正常用户的固定代理不可用
         """
         if not self.enabled or not self.servers:
             return None
         
-        if user_type == "normal":
-            # 正常用户使用固定代理
-            proxy_server = self.servers[0] if self.servers else None
-        elif user_type == "high_risk":
+        # 只在可用的代理中选择，按延迟从低到高排列（未启用检查时保持配置顺序）
+        healthy = self.health_checker.healthy_proxies(self.servers)
+        if not healthy:
+            # 改为直连会把直连的结果混入代理测试的数据中
+            raise ProxyUnavailableError("所有代理均不可用")
+        
+        with self._lock:
+            proxy_server = self._select(healthy, user_type)
+            # 记录代理使用情况
+            self._record_proxy_usage(proxy_server, user_type)
+        
+        return proxy_server
+    
+    def _select(self, healthy, user_type):
+        """按用户类型的选择规则（见 PROXY_RULES）在可用代理中选择"""
+        rule = PROXY_RULES.get(user_type)
+        if rule is None:
+            raise ValueError(f"没有为用户类型 {user_type} 配置代理选择规则")
+        
+        if rule == "fixed":
+            # 总是使用固定代理，换用其他代理就不再代表同一个常用网络环境
+            if self.servers[0] not in healthy:
+                raise ProxyUnavailableError(f"{user_type} 用户的固定代理 {self.servers[0]} 不可用")
+            proxy_server = self.servers[0]
+        elif rule == "rotate":
             # 高风险用户每次使用不同代理
-            proxy_server = random.choice(self.servers) if self.use_random else self.servers[-1]
-        else:  # new_device
-            # 新设备用户使用不同于常用代理的服务器
-            if len(self.servers) > 1:
-                proxy_server = self.servers[1]
+            if self.use_random:
+                proxy_server = random.choice(healthy)
             else:
-                proxy_server = self.servers[0]
-        
-        # 记录代理使用情况
-        self._record_proxy_usage(proxy_server, user_type)
+                proxy_server = self.servers[-1] if self.servers[-1] in healthy else healthy[0]
+        else:  # other
+            # 使用不同于常用代理的服务器，优先选择最快的
+            others = [proxy for proxy in healthy if proxy != self.servers[0]]
+            proxy_server = others[0] if others else healthy[0]
         
         return proxy_server
     
@@ -103,14 +138,8 @@ class ProxyManager:
             "user_type": user_type
         }
         
-        self.usage_history.append(record)
-        
-        # 如果历史记录过长，只保留最近的1000条
-        if len(self.usage_history) > 1000:
-            self.usage_history = self.usage_history[-1000:]
-        
-        # 保存历史
-        self._save_history()
+        # 追加一行记录，只保留最近的1000条
+        self.history.append(record)
     
     def get_playwright_proxy_config(self, user_type="normal"):
         """
@@ -121,6 +150,9 @@ class ProxyManager:
             
         Returns:
             适用于Playwright的代理配置字典或None
+
+        Raises:
+            ProxyUnavailableError: 启用了代理但没有可用的代理
         """
         proxy_server = self.get_proxy(user_type)
         
@@ -128,3 +160,17 @@ class ProxyManager:
             return None
             
         return {"server": proxy_server}
+    
+    def flush(self):
+        """写入缓存的代理使用记录"""
+        self.history.flush()
+    
+    def close(self):
+        """结束使用，写入缓存的代理使用记录"""
+        self.history.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
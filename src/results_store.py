@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+class ResultsStore:
+    """测试结果存储，所有结果保存在一个SQLite数据库中，按时间、用户类型、是否触发RBA和设备指纹哈希建立索引"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            user_type TEXT NOT NULL,
+            success INTEGER NOT NULL,
+            rba_triggered INTEGER NOT NULL,
+            details TEXT NOT NULL,
+            fingerprint_hash TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_results_user_type ON results (user_type);
+        CREATE INDEX IF NOT EXISTS idx_results_rba_triggered ON results (rba_triggered);
+    """
+
+    # 旧版数据库没有 fingerprint_hash 列，需要先补上列再建立索引
+    FINGERPRINT_INDEX = "CREATE INDEX IF NOT EXISTS idx_results_fingerprint_hash ON results (fingerprint_hash)"
+
+    def __init__(self, path="data/results/results.db"):
+        """
+        初始化结果存储
+
+        Args:
+            path: SQLite数据库文件路径
+        """
+        self.path = path
+        self.logger = logging.getLogger('results_store')
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # 同一个连接在多个线程中共用，由锁保证串行访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            # WAL模式下多个进程同时写入时读取不会被阻塞
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(results)")}
+            if "fingerprint_hash" not in columns:
+                self._conn.execute("ALTER TABLE results ADD COLUMN fingerprint_hash TEXT")
+            self._conn.execute(self.FINGERPRINT_INDEX)
+            self._conn.commit()
+
+    def add(self, user_type, success, rba_triggered, details, timestamp=None):
+        """
+        保存一条测试结果
+
+        Args:
+            user_type: 用户类型
+            success: 测试是否成功完成
+            rba_triggered: 是否触发RBA机制
+            details: 详细信息字典
+            timestamp: ISO格式的时间，默认为当前时间
+
+        Returns:
+            结果记录的id
+        """
+        fingerprint = (details or {}).get("设备指纹")
+        fingerprint_hash = fingerprint.get("hash") if isinstance(fingerprint, dict) else None
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO results (timestamp, user_type, success, rba_triggered, details, fingerprint_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    timestamp or datetime.now().isoformat(),
+                    user_type,
+                    int(bool(success)),
+                    int(bool(rba_triggered)),
+                    json.dumps(details or {}, ensure_ascii=False, default=str),
+                    fingerprint_hash
+                )
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    @staticmethod
+    def _where(user_type=None, success=None, rba_triggered=None, since=None, until=None, fingerprint_hash=None):
+        """构造查询条件"""
+        clauses, params = [], []
+        if user_type is not None:
+            clauses.append("user_type = ?")
+            params.append(user_type)
+        if fingerprint_hash is not None:
+            clauses.append("fingerprint_hash = ?")
+            params.append(fingerprint_hash)
+        if success is not None:
+            clauses.append("success = ?")
+            params.append(int(bool(success)))
+        if rba_triggered is not None:
+            clauses.append("rba_triggered = ?")
+            params.append(int(bool(rba_triggered)))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat() if isinstance(since, datetime) else since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until.isoformat() if isinstance(until, datetime) else until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, user_type=None, success=None, rba_triggered=None, since=None, until=None,
+              limit=None, newest_first=False, fingerprint_hash=None):
+        """
+        查询测试结果
+
+        Args:
+            user_type: 只返回该用户类型的结果
+            success: 只返回成功/失败的结果
+            rba_triggered: 只返回触发/未触发RBA的结果
+            since: 起始时间（包含），datetime 或 ISO 字符串
+            until: 结束时间（不包含），datetime 或 ISO 字符串
+            limit: 最多返回的条数
+            newest_first: 是否按时间倒序返回
+            fingerprint_hash: 只返回使用该设备指纹（Fingerprint.content_hash）的结果
+
+        Returns:
+            结果字典列表，格式与JSON结果文件相同，另含 id
+        """
+        where, params = self._where(user_type, success, rba_triggered, since, until, fingerprint_hash)
+        sql = f"SELECT * FROM results{where} ORDER BY timestamp {'DESC' if newest_first else 'ASC'}, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [
+            {
+                "id": row["id"],
+                "timestamp": row["timestamp"],
+                "user_type": row["user_type"],
+                "success": bool(row["success"]),
+                "rba_triggered": bool(row["rba_triggered"]),
+                "details": json.loads(row["details"])
+            }
+            for row in rows
+        ]
+
+    def count(self, user_type=None, success=None, rba_triggered=None, since=None, until=None, fingerprint_hash=None):
+        """统计满足条件的结果条数，参数含义同 query"""
+        where, params = self._where(user_type, success, rba_triggered, since, until, fingerprint_hash)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def summary(self, since=None, until=None):
+        """
+        按用户类型汇总测试结果
+
+        Returns:
+            {用户类型: {"total", "success", "rba_triggered"}}
+        """
+        where, params = self._where(since=since, until=until)
+        sql = (
+            "SELECT user_type, COUNT(*) AS total, SUM(success) AS success, SUM(rba_triggered) AS rba_triggered "
+            f"FROM results{where} GROUP BY user_type ORDER BY user_type"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return {
+            row["user_type"]: {"total": row["total"], "success": row["success"], "rba_triggered": row["rba_triggered"]}
+            for row in rows
+        }
+
+    def import_json_files(self, directory="data/results"):
+        """
+        导入旧版的单个JSON结果文件，重复导入会产生重复的记录
+
+        Args:
+            directory: JSON结果文件所在目录
+
+        Returns:
+            导入的结果条数
+        """
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(directory, "test_*.json"))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.add(data["user_type"], data["success"], data["rba_triggered"],
+                         data.get("details", {}), data.get("timestamp"))
+                imported += 1
+            except Exception as e:
+                self.logger.warning(f"导入测试结果文件 {path} 失败: {str(e)}")
+        return imported
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# 截图策略：always 保存所有截图，on_failure 只保存失败时的截图，off 不截图
+SCREENSHOT_POLICIES = ('always', 'on_failure', 'off')
+
+class ScreenshotManager:
+    """截图管理
+
+    页面截图只在浏览器中编码并以字节返回，哈希、写入和清理交给后台线程池，
+    登录流程不需要等待磁盘写入。内容完全相同的截图以硬链接保存，只占用一份磁盘空间；
+    截图目录超过大小预算时，按最近使用时间删除最久未使用的截图。
+    """
+
+    def __init__(self, screenshot_config=None):
+        """
+        初始化截图管理
+
+        Args:
+            screenshot_config: 截图配置，包含policy, format, quality, directory, budget_mb, workers
+        """
+        screenshot_config = screenshot_config or {}
+        self.policy = screenshot_config.get('policy', 'always')
+        if self.policy not in SCREENSHOT_POLICIES:
+            raise ValueError(f"不支持的截图策略: {self.policy}")
+        self.format = screenshot_config.get('format', 'png')
+        if self.format not in ('png', 'jpeg'):
+            raise ValueError(f"不支持的截图格式: {self.format}")
+        self.quality = screenshot_config.get('quality', 80)
+        self.directory = screenshot_config.get('directory', 'data/screenshots')
+        self.budget = int(screenshot_config.get('budget_mb', 0) * 1024 * 1024)
+
+        self.logger = logging.getLogger('screenshots')
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, screenshot_config.get('workers', 2)), thread_name_prefix='screenshot'
+        )
+        self._futures = set()
+        self._lock = threading.Lock()
+        # 内容相同的截图为一组，以内容哈希为键：{分组: 占用的字节数}，按最近使用时间从旧到新排列，
+        # None 表示尚未扫描目录
+        self._usage = None
+        # {分组: [文件路径]}，同一组的文件互为硬链接
+        self._names = {}
+        # {文件路径: 分组}
+        self._paths = {}
+        self._total = 0
+
+    def wants(self, failure=False):
+        """
+        按截图策略判断是否需要截图
+
+        Args:
+            failure: 是否为登录失败时的截图
+        """
+        if self.policy == 'off':
+            return False
+        return failure or self.policy == 'always'
+
+    def screenshot_options(self):
+        """page.screenshot 的参数"""
+        options = {"type": self.format}
+        if self.format == 'jpeg':
+            options["quality"] = self.quality
+        return options
+
+    def capture(self, page, name, failure=False):
+        """
+        截取页面截图并在后台保存
+
+        Args:
+            page: Playwright页面对象
+            name: 不含扩展名的文件名
+            failure: 是否为登录失败时的截图
+        """
+        if not self.wants(failure):
+            return
+        try:
+            self.submit(name, page.screenshot(**self.screenshot_options()))
+        except Exception as e:
+            self.logger.warning(f"截图 {name} 失败: {str(e)}")
+
+    async def async_capture(self, page, name, failure=False):
+        """截取页面截图并在后台保存（异步版本），参数同 capture"""
+        if not self.wants(failure):
+            return
+        try:
+            self.submit(name, await page.screenshot(**self.screenshot_options()))
+        except Exception as e:
+            self.logger.warning(f"截图 {name} 失败: {str(e)}")
+
+    def submit(self, name, data):
+        """
+        把截图数据交给后台线程保存
+
+        Args:
+            name: 不含扩展名的文件名
+            data: 截图字节
+
+        Returns:
+            concurrent.futures.Future，结果为保存的文件路径
+        """
+        future = self._executor.submit(self._save, name, data)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._discard_future)
+        return future
+
+    def _discard_future(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _scan(self):
+        """扫描截图目录，按修改时间建立使用顺序，调用时需持有 _lock
+
+        目录中原有的截图不计算哈希，各自以文件路径作为分组，不参与去重。
+        """
+        self._usage = OrderedDict()
+        self._names = {}
+        self._paths = {}
+        self._total = 0
+        entries = []
+        if os.path.isdir(self.directory):
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._add(path, path, size)
+
+    def _add(self, key, path, size):
+        """登记保存到 path 的截图并标记为最近使用，调用时需持有 _lock"""
+        self._paths[path] = key
+        self._names.setdefault(key, []).append(path)
+        self._usage[key] = self._usage.get(key, 0) + size
+        self._usage.move_to_end(key)
+        self._total += size
+
+    def _forget(self, path):
+        """path 即将被覆盖，取消它与原有内容的对应关系，调用时需持有 _lock"""
+        key = self._paths.pop(path, None)
+        if key is None:
+            return
+        names = self._names[key]
+        names.remove(path)
+        if not names:
+            # 原有内容已没有其他文件名，不再占用空间，也不能再作为重复截图的链接来源
+            del self._names[key]
+            self._total -= self._usage.pop(key)
+
+    def _link(self, source, path):
+        """把 path 创建为 source 的硬链接，替换已有的同名文件，调用时需持有 _lock"""
+        tmp_path = f"{path}.tmp"
+        try:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            os.link(source, tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            self.logger.debug(f"无法创建硬链接 {path}: {str(e)}")
+            return False
+
+    def _save(self, name, data):
+        """计算哈希并写入截图，相同内容的截图以硬链接保存，只占用一份磁盘空间"""
+        digest = hashlib.sha1(data).hexdigest()
+        path = os.path.join(self.directory, f"{name}.{'jpg' if self.format == 'jpeg' else 'png'}")
+        with self._lock:
+            if self._usage is None:
+                self._scan()
+            names = self._names.get(digest)
+            if names and path in names:
+                # 同名同内容的截图只更新使用时间
+                self._usage.move_to_end(digest)
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                return path
+            if names and self._link(names[0], path):
+                self.logger.debug(f"截图 {name} 与 {names[0]} 相同，以硬链接保存")
+                self._forget(path)
+                self._add(digest, path, 0)
+                return path
+
+        # 不支持硬链接的文件系统上重复的截图另存一份
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._forget(path)
+            self._add(digest, path, len(data))
+            self._enforce_budget()
+        return path
+
+    def _enforce_budget(self):
+        """截图目录超过预算时删除最久未使用的截图及其所有硬链接，调用时需持有 _lock"""
+        if self.budget <= 0:
+            return
+        # 至少保留刚写入的截图
+        while self._total > self.budget and len(self._usage) > 1:
+            key, size = self._usage.popitem(last=False)
+            self._total -= size
+            for path in self._names.pop(key):
+                del self._paths[path]
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self.logger.debug(f"截图目录超过预算，已删除 {path}")
+
+    def flush(self):
+        """等待所有已提交的截图保存完成"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.warning(f"保存截图失败: {str(e)}")
+
+    def close(self):
+        """等待所有截图保存完成并关闭线程池"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+# 清除当前页面的本地存储，恢复的会话失效后使用
+CLEAR_STORAGE_SCRIPT = """
+() => {
+    try {
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+    } catch (e) {}
+}
+"""
+
+# 每个会话目录同一时间只能由一个浏览器上下文使用（Chromium 会锁定用户数据目录）
+_profile_locks = {}
+_profile_locks_guard = threading.Lock()
+
+def _profile_lock(directory):
+    """获取会话目录对应的锁"""
+    key = os.path.abspath(directory)
+    with _profile_locks_guard:
+        return _profile_locks.setdefault(key, threading.Lock())
+
+class SessionProfile:
+    """持久化会话
+
+    为指定用户类型（默认只有正常用户）保存登录后的 storage_state，下次测试时在有效期内恢复，
+    像真实的回访用户一样带着 Cookie 和本地存储访问登录页面，会话仍然有效时不再重新登录。
+    启用 http_cache 时使用 Chromium 的持久化用户数据目录创建上下文，静态资源的磁盘缓存在多次运行之间保留；
+    持久化上下文同样由浏览器进程池创建和关闭（见 BrowserPool.new_persistent_context）。
+    """
+
+    def __init__(self, session_config, user_type, fingerprint_hash=None):
+        """
+        初始化持久化会话
+
+        Args:
+            session_config: 会话配置，包含enabled, user_types, directory, ttl_hours, http_cache, logged_in_selector
+            user_type: 本次测试的用户类型
+            fingerprint_hash: 本次测试的设备指纹哈希，与保存会话时的指纹不同则不恢复
+        """
+        session_config = session_config or {}
+        self.enabled = bool(session_config.get('enabled', False)) and \
+            user_type in session_config.get('user_types', ('normal',))
+        self.directory = os.path.join(session_config.get('directory', 'data/profiles'), user_type)
+        self.ttl = float(session_config.get('ttl_hours', 12)) * 3600
+        self.http_cache = session_config.get('http_cache', True)
+        self.logged_in_selector = session_config.get('logged_in_selector', '#mainFrame')
+        self.fingerprint_hash = fingerprint_hash
+
+        self.state_path = os.path.join(self.directory, 'storage_state.json')
+        self.meta_path = os.path.join(self.directory, 'session.json')
+        self.user_data_dir = os.path.join(self.directory, 'user_data')
+
+        self.logger = logging.getLogger('session_profile')
+
+        # 本次创建的上下文是否恢复了有效的会话
+        self.restored = False
+        # 本次创建的上下文是否为持久化上下文（使用单独的浏览器进程）
+        self.persistent = False
+        self._lock = None
+
+    def acquire(self):
+        """
+        占用会话目录
+
+        Returns:
+            是否可以使用持久化会话；未启用或会话目录正被其他测试使用时为False
+        """
+        if not self.enabled:
+            return False
+        lock = _profile_lock(self.directory)
+        if not lock.acquire(blocking=False):
+            self.logger.info(f"会话目录 {self.directory} 正在被其他测试使用，本次使用新的上下文")
+            return False
+        self._lock = lock
+        return True
+
+    def release(self):
+        """释放会话目录"""
+        if self._lock is not None:
+            self._lock.release()
+            self._lock = None
+
+    def load_meta(self):
+        """
+        读取保存的会话信息
+
+        Returns:
+            会话信息字典；没有保存的会话、已过期或设备指纹不同时为None
+        """
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.state_path)):
+            return None
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except Exception as e:
+            self.logger.warning(f"读取会话信息失败: {str(e)}")
+            return None
+
+        if meta.get('expires_at', 0) <= time.time():
+            self.logger.info(f"保存的会话已于 {datetime.fromtimestamp(meta.get('expires_at', 0)).isoformat()} 过期")
+            return None
+        if self.fingerprint_hash and meta.get('fingerprint_hash') not in (None, self.fingerprint_hash):
+            self.logger.info("保存会话时使用的设备指纹与本次不同，不恢复会话")
+            return None
+        return meta
+
+    def discard(self, context=None):
+        """
+        删除保存的会话，HTTP缓存保留
+
+        Args:
+            context: 已恢复该会话的浏览器上下文，提供时先清除其中的 Cookie 和页面存储，
+                     之后的登录不会带着失效的会话进行
+        """
+        if context is not None:
+            try:
+                context.clear_cookies()
+                for page in context.pages:
+                    page.evaluate(CLEAR_STORAGE_SCRIPT)
+            except Exception as e:
+                self.logger.warning(f"清除失效会话时出错: {str(e)}")
+        self._remove_files()
+
+    async def async_discard(self, context=None):
+        """删除保存的会话（异步版本），参数同 discard"""
+        if context is not None:
+            try:
+                await context.clear_cookies()
+                for page in context.pages:
+                    await page.evaluate(CLEAR_STORAGE_SCRIPT)
+            except Exception as e:
+                self.logger.warning(f"清除失效会话时出错: {str(e)}")
+        self._remove_files()
+
+    def _remove_files(self):
+        """删除保存的 storage_state 和会话信息"""
+        for path in (self.state_path, self.meta_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.restored = False
+
+    def _launch_options(self, context_options):
+        """创建上下文的参数，持久化上下文之外的上下文通过 storage_state 恢复会话"""
+        meta = self.load_meta()
+        self.restored = meta is not None
+        self.persistent = bool(self.http_cache)
+        options = dict(context_options)
+        if self.restored and not self.persistent:
+            options['storage_state'] = self.state_path
+        if self.persistent:
+            os.makedirs(self.user_data_dir, exist_ok=True)
+        return options
+
+    def new_context(self, browser_pool, context_options):
+        """
+        创建使用持久化会话的浏览器上下文，调用前需先 acquire；
+        创建失败时释放会话目录，成功时由 close_context 关闭上下文并释放
+
+        Args:
+            browser_pool: 浏览器进程池
+            context_options: 浏览器上下文选项
+
+        Returns:
+            Playwright的BrowserContext对象
+        """
+        try:
+            options = self._launch_options(context_options)
+            if not self.persistent:
+                return browser_pool.new_context(**options)
+            context = browser_pool.new_persistent_context(self.user_data_dir, **options)
+        except Exception:
+            self.release()
+            raise
+        if not self.restored:
+            try:
+                # 用户数据目录中可能留有过期会话的 Cookie
+                context.clear_cookies()
+            except Exception:
+                self.close_context(context, browser_pool)
+                raise
+        return context
+
+    async def async_new_context(self, browser_pool, context_options):
+        """创建使用持久化会话的浏览器上下文（异步版本），参数同 new_context"""
+        try:
+            options = self._launch_options(context_options)
+            if not self.persistent:
+                return await browser_pool.new_context(**options)
+            context = await browser_pool.new_persistent_context(self.user_data_dir, **options)
+        except Exception:
+            self.release()
+            raise
+        if not self.restored:
+            try:
+                await context.clear_cookies()
+            except Exception:
+                await self.async_close_context(context, browser_pool)
+                raise
+        return context
+
+    def close_context(self, context, browser_pool):
+        """关闭 new_context 创建的上下文并释放会话目录"""
+        try:
+            browser_pool.release_context(context)
+        except Exception as e:
+            self.logger.warning(f"关闭会话上下文时出错: {str(e)}")
+        finally:
+            self.release()
+
+    async def async_close_context(self, context, browser_pool):
+        """关闭 async_new_context 创建的上下文并释放会话目录"""
+        try:
+            await browser_pool.release_context(context)
+        except Exception as e:
+            self.logger.warning(f"关闭会话上下文时出错: {str(e)}")
+        finally:
+            self.release()
+
+    def logged_in(self, page):
+        """恢复会话后打开登录页面，是否已直接进入邮箱"""
+        return page.locator(self.logged_in_selector).count() > 0
+
+    async def async_logged_in(self, page):
+        """恢复会话后打开登录页面，是否已直接进入邮箱（异步版本）"""
+        return await page.locator(self.logged_in_selector).count() > 0
+
+    def save(self, context):
+        """登录成功或复用会话后保存 storage_state"""
+        try:
+            self._write(context.storage_state())
+        except Exception as e:
+            self.logger.warning(f"保存会话失败: {str(e)}")
+
+    async def async_save(self, context):
+        """登录成功或复用会话后保存 storage_state（异步版本）"""
+        try:
+            self._write(await context.storage_state())
+        except Exception as e:
+            self.logger.warning(f"保存会话失败: {str(e)}")
+
+    def _write(self, state):
+        """
+        原子写入 storage_state 和会话信息
+
+        复用的会话只更新 Cookie，有效期仍从最近一次完整登录开始计算。
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        meta = self.load_meta() if self.restored else None
+        if meta is None:
+            now = time.time()
+            meta = {
+                "logged_in_at": datetime.fromtimestamp(now).isoformat(),
+                "expires_at": now + self.ttl,
+                "fingerprint_hash": self.fingerprint_hash
+            }
+        meta["saved_at"] = datetime.now().isoformat()
+
+        for path, data in ((self.state_path, state), (self.meta_path, meta)):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+        self.logger.info(f"会话已保存，有效期至 {datetime.fromtimestamp(meta['expires_at']).isoformat()}")
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""本地模拟的QQ邮箱登录站点，用于在无网络环境下驱动完整的登录流程
+
+站点按路径前缀提供不同的页面布局，对应 perform_login_test 中的各条回退路径：
+
+- /standard/   主页面内嵌 iframe#login_frame（标准路径）
+- /alternative/ 登录框 iframe 只有 name="login_frame"，没有id（备选选择器路径）
+- /oauth/      登录框位于 oauth2.0/authorize iframe 中（OAuth路径）
+- /bare/       登录表单直接位于主页面（页面表单路径）
+- /challenge/  标准布局，但登录后进入“安全验证”页面（RBA触发）
+
+登录成功后站点设置会话 Cookie，带着有效会话访问登录页面时直接跳转到收件箱，用于测试会话复用；
+登录页面引用的静态脚本带有长期缓存头，asset_requests 记录脚本被实际下载的次数，用于测试磁盘缓存。
+
+StandinProxy 是只应答 CONNECT 请求的模拟代理，用于测试代理健康检查。
+"""
+
+import logging
+import secrets
+import socket
+import socketserver
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# 站点支持的页面布局
+VARIANTS = ['standard', 'alternative', 'oauth', 'bare', 'challenge']
+
+# 登录成功后设置的会话 Cookie 及其有效期（秒）
+SESSION_COOKIE = 'qm_sid'
+SESSION_MAX_AGE = 3600
+
+# 登录页面引用的静态脚本，大小接近真实页面的前端脚本
+STATIC_SCRIPT = "window.QMAIL_LOADED = true;\n/*" + "0123456789abcdef" * 12800 + "*/\n"
+
+# 模拟站点使用的测试配置，默认不做行为等待以便快速完成登录流程
+STANDIN_CONFIG_TEMPLATE = """[credentials]
+email = 10001@qq.com
+password = standin_password
+
+[proxy]
+enabled = false
+
+[target]
+login_url = {login_url}
+
+[browser]
+headless = true
+
+[behavior]
+min_delay = 0.01
+max_delay = 0.05
+random_mouse = false
+random_scroll = false
+time_scale = {time_scale}
+
+[logging]
+level = WARNING
+file_enabled = false
+"""
+
+MAIN_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>登录QQ邮箱</title><script src="static/app.js"></script></head>
+<body>
+<div class="login_wrap">
+  <h1>QQ邮箱，常联系！</h1>
+  <iframe id="login_frame" name="login_frame" src="xlogin" width="400" height="360" frameborder="0"></iframe>
+</div>
+</body>
+</html>
+"""
+
+ALTERNATIVE_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>登录QQ邮箱</title><script src="static/app.js"></script></head>
+<body>
+<div class="login_wrap">
+  <h1>QQ邮箱，常联系！</h1>
+  <iframe name="login_frame" src="xlogin" width="400" height="360" frameborder="0"></iframe>
+</div>
+</body>
+</html>
+"""
+
+OAUTH_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>登录QQ邮箱</title><script src="static/app.js"></script></head>
+<body>
+<div class="login_wrap">
+  <h1>QQ邮箱，常联系！</h1>
+  <iframe id="oauth_frame" src="oauth2.0/authorize?client_id=mail" width="400" height="360" frameborder="0"></iframe>
+</div>
+</body>
+</html>
+"""
+
+BARE_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>登录QQ邮箱</title><script src="static/app.js"></script></head>
+<body>
+<form class="login_form" onsubmit="return false;">
+  <input name="account" type="text" placeholder="QQ号码或邮箱帐号">
+  <input name="password" type="password" placeholder="QQ密码">
+  <button type="submit" class="login_button">登录</button>
+</form>
+<script>
+  document.querySelector('.login_button').addEventListener('click', function () {
+    var u = encodeURIComponent(document.querySelector('input[name="account"]').value);
+    location.href = 'login?u=' + u;
+  });
+</script>
+</body>
+</html>
+"""
+
+XLOGIN_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>QQ帐号安全登录</title></head>
+<body>
+<div id="qlogin">
+  <span>快捷登录</span>
+  <a id="switcher_plogin" href="javascript:void(0);">{switcher_text}</a>
+</div>
+<div id="web_login" style="display:none">
+  <input id="u" name="u" type="text" placeholder="QQ号码/手机/邮箱">
+  <input id="p" name="p" type="password" placeholder="密码">
+  <button id="login_button" type="button">登 录</button>
+</div>
+<script>
+  document.getElementById('switcher_plogin').addEventListener('click', function () {{
+    document.getElementById('web_login').style.display = 'block';
+  }});
+  document.getElementById('login_button').addEventListener('click', function () {{
+    var u = encodeURIComponent(document.getElementById('u').value);
+    top.location.href = '{login_path}?u=' + u;
+  }});
+</script>
+</body>
+</html>
+"""
+
+INBOX_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>QQ邮箱 - 收件箱</title></head>
+<body><div id="mainFrame">收件箱</div></body>
+</html>
+"""
+
+CHALLENGE_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>QQ安全中心</title></head>
+<body>
+<div class="verify_wrap">
+  <h2>安全验证</h2>
+  <p>为了保障你的帐号安全，本次登录需要进行安全验证。</p>
+</div>
+</body>
+</html>
+"""
+
+MAIN_PAGES = {
+    'standard': MAIN_PAGE,
+    'alternative': ALTERNATIVE_PAGE,
+    'oauth': OAUTH_PAGE,
+    'bare': BARE_PAGE,
+    'challenge': MAIN_PAGE,
+}
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    """按路径返回模拟页面"""
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip('/').split('/', 1)
+        variant = parts[0] or 'standard'
+        page = parts[1] if len(parts) > 1 else ''
+
+        if variant not in MAIN_PAGES:
+            self.send_error(404)
+            return
+
+        prefix = f"/{variant}/"
+        if page == '':
+            if self._has_session():
+                # 已登录的用户访问登录页面时直接进入邮箱
+                self._redirect(prefix + 'inbox')
+            else:
+                self._send_html(MAIN_PAGES[variant])
+        elif page == 'static/app.js':
+            with self.server.stats_lock:
+                self.server.asset_requests += 1
+            body = STATIC_SCRIPT.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/javascript')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'public, max-age=86400')
+            self.end_headers()
+            self.wfile.write(body)
+        elif page == 'xlogin':
+            self._send_html(XLOGIN_PAGE.format(switcher_text="密码登录", login_path=prefix + 'login'))
+        elif page == 'oauth2.0/authorize':
+            self._send_html(XLOGIN_PAGE.format(switcher_text="帐号密码登录", login_path=prefix + 'login'))
+        elif page == 'login':
+            if variant == 'challenge':
+                self._redirect(prefix + 'verify')
+            else:
+                token = secrets.token_hex(16)
+                with self.server.stats_lock:
+                    self.server.sessions.add(token)
+                self._redirect(prefix + 'inbox', {SESSION_COOKIE: token}, cookie_path=prefix)
+        elif page == 'inbox':
+            self._send_html(INBOX_PAGE)
+        elif page == 'verify':
+            self._send_html(CHALLENGE_PAGE)
+        else:
+            self.send_error(404)
+
+    def _has_session(self):
+        """请求是否带有站点签发且未被清除的会话 Cookie"""
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        morsel = cookie.get(SESSION_COOKIE)
+        with self.server.stats_lock:
+            return morsel is not None and morsel.value in self.server.sessions
+
+    def _redirect(self, location, cookies=None, cookie_path='/'):
+        self.send_response(302)
+        self.send_header('Location', location)
+        # Cookie 只在签发它的页面布局下有效，不同布局的测试互不影响
+        for name, value in (cookies or {}).items():
+            self.send_header('Set-Cookie', f"{name}={value}; Path={cookie_path}; Max-Age={SESSION_MAX_AGE}; HttpOnly")
+        self.end_headers()
+
+    def _send_html(self, html):
+        body = html.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger('standin_site').debug(format % args)
+
+class StandinLoginSite:
+    """在后台线程中运行的本地模拟登录站点"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        """
+        初始化模拟站点
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示随机分配
+        """
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """启动站点"""
+        self.server = ThreadingHTTPServer((self.host, self.port), _StandinHandler)
+        self.server.daemon_threads = True
+        self.server.stats_lock = threading.Lock()
+        self.server.sessions = set()
+        self.server.asset_requests = 0
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logging.getLogger('standin_site').info(f"本地模拟登录站点已启动: http://{self.host}:{self.port}/")
+        return self
+
+    def stop(self):
+        """停止站点"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    @property
+    def asset_requests(self):
+        """静态脚本被实际下载的次数"""
+        return self.server.asset_requests if self.server else 0
+
+    def expire_sessions(self):
+        """使所有已签发的会话失效，模拟服务端会话过期"""
+        with self.server.stats_lock:
+            self.server.sessions.clear()
+
+    def url(self, variant='standard', page=''):
+        """
+        获取指定页面布局的地址
+
+        Args:
+            variant: 页面布局，见 VARIANTS
+            page: 布局下的页面路径，默认为登录主页面
+
+        Returns:
+            完整的URL
+        """
+        if variant not in MAIN_PAGES:
+            raise ValueError(f"未知的页面布局: {variant}")
+        return f"http://{self.host}:{self.port}/{variant}/{page}"
+
+    def write_config(self, path, variant='standard', extra='', time_scale=0.0):
+        """
+        生成指向模拟站点的测试配置文件
+
+        Args:
+            path: 配置文件路径
+            variant: 登录页面布局
+            extra: 追加到配置文件末尾的额外配置
+            time_scale: 行为等待的缩放系数，默认0（不等待）
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(STANDIN_CONFIG_TEMPLATE.format(login_url=self.url(variant), time_scale=time_scale))
+            if extra:
+                f.write('\n' + extra)
+        return path
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class _StandinProxyHandler(BaseHTTPRequestHandler):
+    """只应答 CONNECT 请求的模拟代理，按设定的延迟返回响应后关闭连接"""
+
+    def do_CONNECT(self):
+        proxy = self.server.standin_proxy
+        if proxy.silent:
+            # 模拟卡住的代理：接受连接但不返回任何数据
+            proxy.stopped.wait(proxy.hang_timeout)
+            self.close_connection = True
+            return
+        if proxy.delay:
+            time.sleep(proxy.delay)
+        self.send_response(proxy.status, "Connection established" if proxy.status == 200 else None)
+        self.end_headers()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        logging.getLogger('standin_site').debug(format % args)
+
+class StandinProxy:
+    """在后台线程中运行的本地模拟代理，用于测试代理健康检查"""
+
+    def __init__(self, delay=0.0, status=200, silent=False, host='127.0.0.1', hang_timeout=30.0):
+        """
+        初始化模拟代理
+
+        Args:
+            delay: 返回响应前的延迟（秒）
+            status: CONNECT 请求的响应状态码
+            silent: 为True时接受连接但不返回任何数据
+            host: 监听地址
+            hang_timeout: silent 模式下保持连接的最长时间（秒）
+        """
+        self.delay = delay
+        self.status = status
+        self.silent = silent
+        self.host = host
+        self.hang_timeout = hang_timeout
+        self.port = 0
+        self.server = None
+        self.stopped = threading.Event()
+
+    @property
+    def url(self):
+        """代理地址"""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """启动代理"""
+        self.stopped.clear()
+        self.server = ThreadingHTTPServer((self.host, 0), _StandinProxyHandler)
+        self.server.daemon_threads = True
+        self.server.standin_proxy = self
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """停止代理"""
+        self.stopped.set()
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+class _StandinSocksHandler(socketserver.BaseRequestHandler):
+    """只应答SOCKS5认证方式协商的模拟代理"""
+
+    def handle(self):
+        if self.request.recv(16)[:1] == b"\x05":
+            self.request.sendall(b"\x05" + bytes([self.server.standin_proxy.method]))
+
+class StandinSocksProxy(StandinProxy):
+    """本地模拟SOCKS5代理，按设定的认证方式应答协商请求"""
+
+    def __init__(self, method=0x00, host='127.0.0.1'):
+        """
+        初始化模拟SOCKS5代理
+
+        Args:
+            method: 协商应答中选择的认证方式，0x00 为无需认证，0xFF 为没有可接受的认证方式
+            host: 监听地址
+        """
+        super().__init__(host=host)
+        self.method = method
+
+    @property
+    def url(self):
+        """代理地址"""
+        return f"socks5://{self.host}:{self.port}"
+
+    def start(self):
+        """启动代理"""
+        self.stopped.clear()
+        self.server = socketserver.ThreadingTCPServer((self.host, 0), _StandinSocksHandler)
+        self.server.daemon_threads = True
+        self.server.standin_proxy = self
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+def unused_proxy_url(host='127.0.0.1'):
+    """返回一个当前没有进程监听的代理地址，用于模拟无法连接的代理"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        port = sock.getsockname()[1]
+    return f"http://{host}:{port}"
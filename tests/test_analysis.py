@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import json
+import random
+import tempfile
+import time
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from analysis import load_results, factor_trigger_rates, pair_trigger_rates, wilson_interval
+from results_store import ResultsStore
+
+def make_factors(rng):
+    """随机构造一组设备指纹特征"""
+    return {
+        "viewport": rng.choice(["1920x1080", "375x812", "2560x1440"]),
+        "timezone_id": rng.choice(["Asia/Shanghai", "Europe/London"]),
+        "locale": rng.choice(["zh-CN", "en-US"]),
+        "platform": rng.choice(["Windows", "iOS"]),
+        "proxy": rng.choice(["direct", "http://proxy1.example.com:8080"])
+    }
+
+def main():
+    """测试结果加载、因子触发率和置信区间的计算"""
+    print("开始测试RBA因子分析...")
+
+    # Wilson 置信区间的已知值
+    low, high = wilson_interval([5], [10])
+    assert abs(low[0] - 0.2366) < 1e-3 and abs(high[0] - 0.7634) < 1e-3
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'results.db')
+        with ResultsStore(db_path) as store:
+            for _ in range(2000):
+                factors = make_factors(rng)
+                # 只有非中国时区的 iOS 设备触发RBA
+                triggered = factors["timezone_id"] == "Europe/London" and factors["platform"] == "iOS"
+                store.add("高风险用户", not triggered, triggered, {"设备指纹": factors})
+            # 没有设备指纹的旧结果不参与因子统计
+            store.add("正常用户", True, False, {"页面标题": "QQ邮箱"})
+            # 没有可用代理、测试未执行的结果不参与统计
+            store.add("正常用户", False, False, {"错误": "所有代理均不可用",
+                                              "设备指纹": dict(make_factors(rng), proxy="unavailable")})
+
+        # JSON结果文件同样可以加载
+        with open(os.path.join(tmp_dir, 'test_normal_20240101_000000_000000.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                "timestamp": "2024-01-01T00:00:00", "user_type": "正常用户", "success": True,
+                "rba_triggered": False, "details": {"设备指纹": make_factors(rng)}
+            }, f, ensure_ascii=False)
+
+        frame = load_results(db_path, json_dir=tmp_dir)
+        assert len(frame) == 2002
+        assert str(frame["platform"].dtype) == "category"
+
+        factors = factor_trigger_rates(frame)
+        print(factors.head(4).to_string(index=False))
+        assert set(factors["factor"]) == {"viewport", "timezone_id", "locale", "platform", "proxy"}
+        assert factors.groupby("factor")["runs"].sum().eq(2001).all(), "每个因子都应覆盖所有带指纹的结果"
+        windows = factors[(factors["factor"] == "platform") & (factors["level"] == "Windows")].iloc[0]
+        assert windows["triggered"] == 0 and windows["ci_low"] == 0
+
+        pairs = pair_trigger_rates(frame, min_runs=10)
+        top = pairs.iloc[0]
+        print(f"触发率最高的因子组合: {top['factor_a']}={top['level_a']}, {top['factor_b']}={top['level_b']}")
+        assert (top["factor_a"], top["level_a"], top["factor_b"], top["level_b"]) == \
+            ("timezone_id", "Europe/London", "platform", "iOS")
+        assert top["rate"] == 1.0 and top["ci_low"] > 0.9
+
+    # 几十万条结果的分组统计
+    size = 300000
+    big = frame.sample(size, replace=True, random_state=1, ignore_index=True)
+    start = time.perf_counter()
+    factor_trigger_rates(big)
+    pair_trigger_rates(big)
+    elapsed = time.perf_counter() - start
+    print(f"{size} 条结果的单因子和因子组合统计耗时 {elapsed:.3f}s")
+    assert elapsed < 5
+
+    print("RBA因子分析测试完成！")
+
+if __name__ == "__main__":
+    main()
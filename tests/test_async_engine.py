@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from config_loader import ConfigLoader
+from logger import Logger
+from standin_site import StandinLoginSite
+from async_engine import run_scenarios
+
+def main():
+    """使用本地模拟登录站点测试异步执行引擎"""
+    print("开始测试异步执行引擎...")
+
+    Logger({'level': 'INFO', 'file_enabled': False})
+
+    with tempfile.TemporaryDirectory() as tmp_dir, StandinLoginSite() as site:
+        config_path = site.write_config(os.path.join(tmp_dir, 'config.ini'), 'standard')
+        config = ConfigLoader(config_path)
+
+        start = time.perf_counter()
+        results = asyncio.run(run_scenarios(config, repetitions=2, concurrency=6))
+        elapsed = time.perf_counter() - start
+
+    assert len(results) == 6, f"应执行6个测试任务，实际为 {len(results)}"
+    for display_name, result in results:
+        print(f"{display_name}: {result}")
+        assert result.get('success') is True, f"{display_name} 登录失败"
+        assert result.get('rba_triggered') is False
+        assert result['details']['用户类型'] in ('normal', 'high_risk', 'new_device')
+
+    print(f"6个场景并发执行总耗时: {elapsed:.2f} 秒")
+    print("异步执行引擎测试完成！")
+
+if __name__ == "__main__":
+    main()
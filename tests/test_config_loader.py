@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import dataclasses
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from config_loader import ConfigLoader
+
+CONFIG_TEMPLATE = """[credentials]
+email = tester@qq.com
+password = secret
+
+[proxy]
+enabled = true
+servers = {servers}
+
+[dynamic_selectors]
+login_frame = {selector}
+"""
+
+def write_config(path, servers, selector, mtime):
+    """写入配置文件并设置修改时间，避免依赖文件系统的时间精度"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(CONFIG_TEMPLATE.format(servers=servers, selector=selector))
+    os.utime(path, (mtime, mtime))
+
+def main():
+    """测试配置快照的只读性和按修改时间重新加载"""
+    print("开始测试配置快照...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'config.ini')
+        write_config(path, "http://a:1, http://b:2", "#login_frame", 1000000000)
+        config = ConfigLoader(path, reload_interval=0)
+
+        # 未修改时每次返回同一个快照中的值，不重新解析
+        snapshot = config.snapshot
+        assert config.get_proxy_config() is config.get_proxy_config()
+        assert config.get_proxy_config()['servers'] == ("http://a:1", "http://b:2")
+        assert config.get_dynamic_selectors() == ("#login_frame",)
+
+        # 快照和其中的配置都是只读的
+        try:
+            config.get_proxy_config()['enabled'] = False
+            raise AssertionError("配置应不可修改")
+        except TypeError:
+            pass
+        try:
+            snapshot.login_url = "http://localhost/"
+            raise AssertionError("快照应不可修改")
+        except dataclasses.FrozenInstanceError:
+            pass
+
+        # 修改配置文件后自动替换快照，之前取得的快照保持不变
+        write_config(path, "http://c:3", "#new_frame", 1000000100)
+        assert config.get_proxy_config()['servers'] == ("http://c:3",)
+        assert config.get_dynamic_selectors() == ("#new_frame",)
+        assert snapshot.proxy['servers'] == ("http://a:1", "http://b:2")
+        print("配置文件修改后已重新加载")
+
+        # 修改后的配置无法解析时继续使用之前的快照
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[proxy]\nenabled = maybe\n")
+        os.utime(path, (1000000200, 1000000200))
+        assert config.get_proxy_config()['servers'] == ("http://c:3",)
+
+        # 检查间隔内不重新读取文件
+        write_config(path, "http://d:4", "#frame", 1000000300)
+        slow = ConfigLoader(path, reload_interval=3600)
+        write_config(path, "http://e:5", "#frame", 1000000400)
+        assert slow.get_proxy_config()['servers'] == ("http://d:4",)
+
+    print("配置快照测试完成！")
+
+if __name__ == "__main__":
+    main()
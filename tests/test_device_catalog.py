@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import json
+import random
+import tempfile
+from collections import Counter
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from device_catalog import (
+    DEFAULT_CATALOG_PATH, AliasSampler, DeviceCatalog, generate_catalog, load_catalog, write_catalog
+)
+from device_fingerprint import DeviceFingerprint
+
+def main():
+    """测试设备画像目录的数据文件、索引查询和别名表抽样"""
+    print("开始测试设备画像目录...")
+
+    # 别名表抽样的频率与权重一致
+    weights = [1, 2, 3, 4, 0, 10]
+    sampler = AliasSampler(weights)
+    rng = random.Random(1)
+    draws = 200000
+    counts = Counter(sampler.sample(rng) for _ in range(draws))
+    for index, weight in enumerate(weights):
+        expected = weight / sum(weights)
+        print(f"下标 {index}: 期望 {expected:.3f}, 实际 {counts[index] / draws:.3f}")
+        assert abs(counts[index] / draws - expected) < 0.005
+    assert counts[4] == 0
+    for invalid in ([], [0, 0], [1, -1]):
+        try:
+            AliasSampler(invalid)
+            raise AssertionError(f"权重 {invalid} 应被拒绝")
+        except ValueError:
+            pass
+
+    # 提交的数据文件与生成结果一致
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'catalog.json')
+        write_catalog(generate_catalog(), path)
+        with open(path, 'r', encoding='utf-8') as f, open(DEFAULT_CATALOG_PATH, 'r', encoding='utf-8') as g:
+            assert json.load(f) == json.load(g), "数据文件已过期，请运行 python src/device_catalog.py build"
+
+    catalog = load_catalog()
+    assert load_catalog() is catalog
+    print(f"目录共 {len(catalog)} 个设备画像")
+    assert len(catalog) > 1000
+
+    # 每个画像的特征相互一致
+    for row in catalog.rows:
+        ua = row["user_agent"]
+        if row["platform"] == "Android":
+            assert "Android" in ua and row["has_touch"] and row["is_mobile"]
+        elif row["platform"] == "iOS":
+            assert ("iPhone" in ua or "iPad" in ua) and row["has_touch"] and row["is_mobile"]
+        else:
+            assert not row["is_mobile"] and "Mobile" not in ua
+            assert {"Windows": "Windows NT", "MacOS": "Macintosh", "Linux": "Linux"}[row["platform"]] in ua
+        # 手机的视口宽度小于500，平板和电脑的不小于500
+        is_phone = row["is_mobile"] and row["device"] not in ("iPad", "Android Tablet")
+        assert (row["viewport"][0] < 500) == is_phone
+
+    # 索引查询的结果与逐个比较相同
+    positions = catalog.select(platform="Android", locale="zh-CN")
+    expected = tuple(i for i, row in enumerate(catalog.rows) if row["platform"] == "Android" and row["locale"] == "zh-CN")
+    assert positions == expected and positions
+    assert catalog.select(locale="zh-CN", platform="Android") is positions
+    assert catalog.select(viewport=[390, 844]) == catalog.select(viewport=(390, 844))
+    assert catalog.select(platform="Symbian") == ()
+    assert len(catalog.select()) == len(catalog)
+    try:
+        catalog.select(color="red")
+        raise AssertionError("不支持的查询属性应被拒绝")
+    except ValueError:
+        pass
+
+    # 按条件抽样只返回满足条件的画像，整体抽样的平台占比与权重一致
+    rng = random.Random(2)
+    for _ in range(100):
+        profile = catalog.sample(rng, platform="iOS", is_mobile=True)
+        assert profile.platform == "iOS" and profile.has_touch
+    platforms = Counter(catalog.sample(rng).platform for _ in range(50000))
+    windows_weight = sum(catalog.weights[i] for i in catalog.select(platform="Windows")) / sum(catalog.weights)
+    print(f"Windows 占比: 期望 {windows_weight:.3f}, 实际 {platforms['Windows'] / 50000:.3f}")
+    assert abs(platforms["Windows"] / 50000 - windows_weight) < 0.01
+
+    # 同样的行数据可以构造独立的目录
+    small = DeviceCatalog(catalog.rows[:10])
+    assert len(small) == 10 and small.profiles[0] == catalog.profiles[0]
+
+    # catalog 用户类型按种子可复现，并遵守抽样条件
+    device = DeviceFingerprint(seed=3, catalog_filter={"platform": "Android", "locale": "zh-CN"})
+    fingerprint = device.get_device_fingerprint("catalog")
+    assert fingerprint is DeviceFingerprint(seed=3, catalog_filter={"locale": "zh-CN", "platform": "Android"}).get_device_fingerprint("catalog")
+    assert fingerprint.platform == "Android" and fingerprint.locale == "zh-CN"
+    assert fingerprint.user_type == "catalog" and fingerprint.seed == 3
+    print(f"seed=3 的目录设备: {fingerprint.user_agent}")
+
+    print("设备画像目录测试通过")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import dataclasses
+import pickle
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from device_fingerprint import DeviceFingerprint, Fingerprint, generate_fingerprint
+from login_flow import fingerprint_factors
+
+def main():
+    """测试设备指纹的可复现性、缓存、不可变性和内容哈希"""
+    print("开始测试设备指纹生成...")
+
+    # 同一个种子总是得到同一个指纹对象
+    generate_fingerprint.cache_clear()
+    fingerprint = generate_fingerprint("high_risk", 42)
+    assert generate_fingerprint("high_risk", 42) is fingerprint
+    assert generate_fingerprint.cache_info().hits == 1
+    assert fingerprint.user_type == "high_risk" and fingerprint.seed == 42
+    print(f"seed=42 的高风险用户指纹: {fingerprint.platform}, {fingerprint.timezone_id}, "
+          f"{fingerprint.locale}, hash={fingerprint.content_hash}")
+
+    # 清空缓存后重新生成，内容和哈希都不变
+    generate_fingerprint.cache_clear()
+    regenerated = generate_fingerprint("high_risk", 42)
+    assert regenerated is not fingerprint and regenerated == fingerprint
+    assert regenerated.content_hash == fingerprint.content_hash
+
+    # 不同种子能产生不同的高风险指纹
+    hashes = {generate_fingerprint("high_risk", seed).content_hash for seed in range(50)}
+    print(f"50 个种子产生了 {len(hashes)} 种不同的高风险用户指纹")
+    assert len(hashes) > 10
+
+    # 同一个实例的浏览器参数和上下文选项使用同一个指纹
+    device = DeviceFingerprint(seed=7)
+    for _ in range(5):
+        args = device.get_browser_args("high_risk")
+        options = device.create_browser_context_options("high_risk")
+        assert args["viewport"] == options["viewport"] and args["user_agent"] == options["user_agent"]
+        assert args["timezone_id"] == options["timezone_id"] and args["locale"] == options["locale"]
+    assert device.get_device_fingerprint("unknown") is device.get_device_fingerprint("normal")
+
+    # 指纹不可变，可以作为字典的键
+    try:
+        fingerprint.locale = "zh-CN"
+        raise AssertionError("Fingerprint 不应允许修改")
+    except dataclasses.FrozenInstanceError:
+        pass
+    assert not hasattr(fingerprint, "__dict__")
+    assert {fingerprint: 1}[regenerated] == 1
+    assert pickle.loads(pickle.dumps(fingerprint)) == fingerprint
+
+    # 内容哈希只由指纹内容决定，与用户类型和种子无关
+    normal = generate_fingerprint("normal", 1)
+    assert normal == generate_fingerprint("normal", 2)
+    assert normal.content_hash == generate_fingerprint("normal", 2).content_hash
+    changed = dataclasses.replace(normal, locale="en-US")
+    assert changed != normal and changed.content_hash != normal.content_hash
+    assert len(normal.content_hash) == 16
+
+    # 测试结果中记录哈希和种子，供结果存储和复现使用
+    factors = fingerprint_factors(fingerprint, {"server": "http://127.0.0.1:8080"})
+    assert factors["hash"] == fingerprint.content_hash and factors["seed"] == 42
+    assert factors["viewport"] == f"{fingerprint.viewport[0]}x{fingerprint.viewport[1]}"
+    assert fingerprint.to_dict()["viewport"] == fingerprint.viewport_size
+
+    print("设备指纹测试通过")
+
+if __name__ == "__main__":
+    main()
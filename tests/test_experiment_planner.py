@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+
+import numpy as np
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from experiment_planner import (
+    EXPERIMENT_FACTORS, AdaptiveOFAT, RateLimiter,
+    experiment_factors, build_fingerprint, proxy_server, fractional_factorial, main_effects
+)
+
+class FakeClock:
+    """可手动推进的时钟，sleep 直接推进时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def main():
+    """测试实验设计、主效应估计、自适应逐因子设计和登录限速"""
+    print("开始测试因子实验设计...")
+
+    # 代理因子只在启用且有多个代理时加入
+    assert "proxy" not in experiment_factors({"enabled": True, "servers": ["http://a:1"]})
+    factors = experiment_factors({"enabled": True, "servers": ["http://a:1", "http://b:2"]})
+    assert list(factors) == list(EXPERIMENT_FACTORS) + ["proxy"]
+
+    fingerprint = build_fingerprint(factors, {"platform": 1, "proxy": 1})
+    assert fingerprint.platform == "MacOS" and "Macintosh" in fingerprint.user_agent
+    assert fingerprint.timezone_id == "Asia/Shanghai" and fingerprint.viewport == (1920, 1080)
+    assert proxy_server(factors, {"platform": 1, "proxy": 1}) == "http://b:2"
+    assert proxy_server(EXPERIMENT_FACTORS, {"proxy": 1}) is None
+    # 代理不属于设备指纹，只有平台不同的实验点指纹哈希也不同
+    assert fingerprint == build_fingerprint(factors, {"platform": 1})
+    assert fingerprint.content_hash != build_fingerprint(factors, {}).content_hash
+
+    # 7个因子的部分因子设计：8个实验点，各列平衡且两两正交
+    design = fractional_factorial(7)
+    coded = 2 * design - 1
+    print(f"7个因子的部分因子设计共 {len(design)} 个实验点")
+    assert design.shape == (8, 7)
+    assert (coded.sum(axis=0) == 0).all()
+    assert (coded.T @ coded == 8 * np.eye(7)).all()
+    assert fractional_factorial(7, foldover=True).shape == (16, 7)
+
+    # 只有时区和平台影响触发率时，主效应估计能找出这两个因子
+    names = list(factors)
+    outcomes = 0.1 + 0.6 * design[:, names.index("timezone_id")] + 0.2 * design[:, names.index("platform")]
+    effects = dict(zip(names, main_effects(design, outcomes)))
+    assert abs(effects["timezone_id"] - 0.6) < 1e-9 and abs(effects["platform"] - 0.2) < 1e-9
+    assert all(abs(effects[name]) < 1e-9 for name in names if name not in ("timezone_id", "platform"))
+
+    # 自适应逐因子设计：非中国时区且非固定代理时触发，k+1 次即可找出两个必需因子
+    ofat = AdaptiveOFAT(names)
+    runs = 0
+    while True:
+        levels = ofat.next_levels()
+        if levels is None:
+            break
+        runs += 1
+        ofat.record(levels["timezone_id"] == 1 and levels["proxy"] == 1)
+    print(f"自适应逐因子设计 {runs} 次运行找到必需因子: {ofat.necessary}")
+    assert runs == len(names) + 1
+    assert ofat.necessary == ["timezone_id", "proxy"] and ofat.finished
+
+    # 全部取备选水平也不触发时只运行一次
+    ofat = AdaptiveOFAT(names)
+    ofat.record(False)
+    assert ofat.next_levels() is None and ofat.necessary == []
+
+    # 登录限速
+    clock = FakeClock()
+    limiter = RateLimiter(runs_per_hour=3, min_interval=60, clock=clock, sleep=clock.sleep)
+    waits = [limiter.wait() for _ in range(4)]
+    assert waits[0] == 0 and waits[1] == 60 and waits[2] == 60
+    assert waits[3] == 3600 - 120, "一小时内的次数用完后等待最早的一次满一小时"
+
+    print("因子实验设计测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import random
+import statistics
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from human_behavior import HumanBehavior
+
+class FakeLocator:
+    """记录每次输入调用的 Locator"""
+
+    def __init__(self):
+        self.calls = []
+
+    def click(self):
+        pass
+
+    def fill(self, value):
+        pass
+
+    def press_sequentially(self, text, delay=0):
+        self.calls.append((text, delay))
+
+def main():
+    """测试模拟输入的按键间隔分布与逐字输入一致"""
+    print("开始测试人类行为模拟...")
+
+    # 不等待停顿，只记录按键间隔
+    behavior = HumanBehavior({'min_delay': 0, 'max_delay': 0})
+    locator = FakeLocator()
+    text = "10001@qq.com-password"
+
+    random.seed(11)
+    for _ in range(1000):
+        behavior.human_like_typing(locator, text)
+    delays = [delay for _, delay in locator.calls]
+
+    # 每个字符一次调用，按原文顺序输入
+    assert len(locator.calls) == 1000 * len(text)
+    assert ''.join(char for char, _ in locator.calls[:len(text)]) == text
+
+    # 基线：原来逐字输入时每个按键的间隔取自 U(100, 300)
+    random.seed(12)
+    baseline = [random.uniform(100, 300) for _ in range(len(delays))]
+
+    mean, variance = statistics.fmean(delays), statistics.pvariance(delays)
+    base_mean, base_variance = statistics.fmean(baseline), statistics.pvariance(baseline)
+    print(f"按键间隔: 均值 {mean:.1f}ms 方差 {variance:.0f}；基线: 均值 {base_mean:.1f}ms 方差 {base_variance:.0f}")
+    assert min(delays) >= 100 and max(delays) <= 300
+    assert abs(mean - base_mean) < 3
+    assert abs(variance / base_variance - 1) < 0.05, "按键间隔的方差应与逐字输入时相同"
+
+    # 约10%的字符之后停顿
+    random.seed(13)
+    schedule = HumanBehavior({})._typing_schedule(text * 1000)
+    pauses = sum(1 for _, _, pause in schedule if pause > 0)
+    assert 0.08 < pauses / len(schedule) < 0.12
+
+    print("人类行为模拟测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import gzip
+import logging
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from log_handlers import RetentionFileHandler, create_file_handler
+
+def main():
+    """测试日志文件的轮转、压缩和总大小预算"""
+    print("开始测试日志轮转...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, 'rba_test.log')
+
+        # 未配置轮转时使用普通的 FileHandler
+        plain = create_file_handler(log_path)
+        assert type(plain) is logging.FileHandler
+        plain.close()
+
+        handler = RetentionFileHandler(log_path, max_bytes=2000, compress=True, total_budget=6000)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        test_logger = logging.getLogger('test_log_handlers')
+        test_logger.propagate = False
+        test_logger.setLevel(logging.INFO)
+        test_logger.addHandler(handler)
+
+        for index in range(2000):
+            test_logger.info(f"第 {index} 条日志，用于测试日志轮转和压缩 " + "x" * 40)
+
+        segments = handler.segments()
+        total = sum(os.path.getsize(path) for path in segments) + os.path.getsize(log_path)
+        print(f"轮转出 {len(segments)} 个分段，总大小 {total} 字节")
+        assert segments, "应至少轮转出一个分段"
+        assert all(path.endswith('.gz') for path in segments), "分段应被压缩"
+        assert total <= 6000, "总大小应不超过预算"
+        assert os.path.getsize(log_path) < 2000 + 200
+
+        # 最新的分段紧接在当前文件之前，旧分段已被删除
+        with gzip.open(segments[-1], 'rt', encoding='utf-8') as f:
+            last_line = f.read().splitlines()[-1]
+        with open(log_path, 'r', encoding='utf-8') as f:
+            first_line = f.readline()
+        last_index = int(last_line.split('第 ')[1].split(' ')[0])
+        assert int(first_line.split('第 ')[1].split(' ')[0]) == last_index + 1
+        with gzip.open(segments[0], 'rt', encoding='utf-8') as f:
+            assert '第 0 条日志' not in f.read(), "最旧的分段应被删除"
+
+        test_logger.removeHandler(handler)
+        handler.close()
+
+    print("日志轮转测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import asyncio
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from login_flow import SyncFlowIO, AsyncFlowIO, login_steps
+from page_probe import PROBE_SCRIPT, FrameInventory
+from phase_timer import PhaseTimer
+
+class FakePlaywright:
+    """模拟同步或异步Playwright对象：异步模式下每次调用返回协程"""
+
+    def __init__(self, calls, async_mode):
+        self.calls = calls
+        self.async_mode = async_mode
+
+    def _io(self, name, value=None, error=None):
+        self.calls.append(name)
+
+        def complete():
+            if error is not None:
+                raise error
+            return value
+
+        if self.async_mode:
+            async def coroutine():
+                return complete()
+            return coroutine()
+        return complete()
+
+class FakeLocator(FakePlaywright):
+    """只有 present 中的选择器能找到元素"""
+
+    def __init__(self, calls, async_mode, selector, present):
+        super().__init__(calls, async_mode)
+        self.selector = selector
+        self.found = selector in present
+
+    def count(self):
+        return self._io(f"count:{self.selector}", 1 if self.found else 0)
+
+    def is_visible(self):
+        return self._io(f"is_visible:{self.selector}", self.found)
+
+    def click(self):
+        return self._io(f"click:{self.selector}")
+
+    def wait_for(self, state=None, timeout=None):
+        return self._io(f"wait_for:{self.selector}")
+
+class FakePage(FakePlaywright):
+    """只有直接登录表单的登录页面，等待iframe时超时"""
+
+    PRESENT = ('#u', '#p', '#login_button')
+    FRAMES = ()
+
+    def locator(self, selector):
+        return FakeLocator(self.calls, self.async_mode, selector, self.PRESENT)
+
+    @property
+    def frames(self):
+        return list(self.FRAMES)
+
+    def frame(self, name):
+        return None
+
+    def goto(self, url, timeout=None):
+        return self._io("goto")
+
+    def wait_for_load_state(self, state):
+        return self._io(f"wait_for_load_state:{state}")
+
+    def wait_for_selector(self, selector, timeout=None):
+        return self._io(f"wait_for_selector:{selector}", error=TimeoutError(f"等待 {selector} 超时"))
+
+    def title(self):
+        return self._io("title", "QQ邮箱")
+
+    def inner_text(self, selector):
+        return self._io("inner_text", "登录 QQ邮箱")
+
+    def evaluate(self, script, arg=None):
+        if script == PROBE_SCRIPT:
+            return self._io("probe", [{"supported": True, "count": 0} for _ in arg])
+        return self._io("evaluate", [] if "iframe" in script else False)
+
+class FakeSubmitErrorPage(FakePage):
+    """标准登录框可以提交，但提交后页面出错"""
+
+    PRESENT = ('#switcher_plogin', '#u', '#p', '#login_button')
+
+    def wait_for_selector(self, selector, timeout=None):
+        return self._io(f"wait_for_selector:{selector}")
+
+    def frame_locator(self, selector):
+        return self
+
+    def wait_for_load_state(self, state):
+        if 'click:#login_button' in self.calls:
+            return self._io(f"wait_for_load_state:{state}", error=RuntimeError("页面崩溃"))
+        return self._io(f"wait_for_load_state:{state}")
+
+class FakeBehavior(FakePlaywright):
+    """记录输入内容、不等待的人类行为模拟器"""
+
+    def random_delay(self, min_seconds=None, max_seconds=None):
+        return self._io("delay")
+
+    def human_like_typing(self, element, text):
+        return self._io(f"type:{element.selector}:{text}")
+
+class FakeScreenshots:
+    """记录截图名称"""
+
+    def __init__(self):
+        self.names = []
+
+    def capture(self, page, name, failure=False):
+        self.names.append(name)
+
+    async def async_capture(self, page, name, failure=False):
+        self.names.append(name)
+
+class FakeConfig:
+    """login_steps 需要的配置"""
+
+    def get_login_url(self):
+        return "http://127.0.0.1/"
+
+    def get_dynamic_selectors(self):
+        return ['#login_button']
+
+    def get_login_cache_config(self):
+        return {'enabled': False}
+
+def run_flow(async_mode, page_class=FakePage):
+    """分别用同步和异步执行器执行同一份登录步骤"""
+    calls = []
+    page = page_class(calls, async_mode)
+    behavior = FakeBehavior(calls, async_mode)
+    screenshots = FakeScreenshots()
+    credentials = {'email': '10001@qq.com', 'password': 'secret'}
+    io = (AsyncFlowIO if async_mode else SyncFlowIO)(screenshots)
+    steps = login_steps(io, page, None, FakeConfig(), credentials, behavior, 'normal', PhaseTimer('normal'))
+    result = asyncio.run(io.run(steps)) if async_mode else io.run(steps)
+    return result, calls, screenshots.names
+
+class FakeFrame:
+    """只有地址的Frame"""
+
+    def __init__(self, url, parent_frame=None):
+        self.url = url
+        self.name = ''
+        self.parent_frame = parent_frame
+
+def check_find_frames():
+    """OAuth 登录框通过 frame 清单按地址查找"""
+    main_frame = FakeFrame('http://127.0.0.1/')
+    oauth = FakeFrame('https://graph.qq.com/oauth2.0/authorize?client_id=1', main_frame)
+    page = FakePage([], async_mode=False)
+    page.main_frame = main_frame
+    page.FRAMES = (main_frame, oauth)
+
+    inventory = FrameInventory(page, [])
+    assert inventory.find_frames("oauth2.0/authorize") == [oauth]
+    assert inventory.find_frames("xlogin") == []
+
+def main():
+    """测试同步与异步执行器执行登录步骤的结果一致"""
+    print("开始测试登录步骤执行器...")
+
+    sync_result, sync_calls, sync_names = run_flow(async_mode=False)
+    async_result, async_calls, async_names = run_flow(async_mode=True)
+    print(f"同步执行结果: {sync_result}")
+
+    # iframe 等待超时的异常在两种执行器中都回到对应的策略里处理，最终由直接表单登录
+    for result in (sync_result, async_result):
+        assert result['success'] is True and result['rba_triggered'] is False
+        assert result['details']['登录路径'] == 'bare_form'
+        assert result['details']['页面标题'] == 'QQ邮箱'
+    assert sync_calls == async_calls, "同步与异步执行器的页面调用顺序应一致"
+    assert 'type:#u:10001' in sync_calls and 'type:#p:secret' in sync_calls
+    assert sync_calls.index('type:#u:10001') < sync_calls.index('click:#login_button')
+    assert [name.split('_')[0] for name in sync_names] == [name.split('_')[0] for name in async_names]
+    assert any(name.startswith('oauth_error_') for name in sync_names)
+
+    check_find_frames()
+
+    # 提交账号密码后出错时不再换其他登录路径重新输入
+    for async_mode in (False, True):
+        result, calls, names = run_flow(async_mode, FakeSubmitErrorPage)
+        print(f"提交后出错的结果: {result}")
+        assert result['success'] is False and '页面崩溃' in result['details']['错误']
+        assert calls.count('type:#u:10001') == 1 and calls.count('click:#login_button') == 1
+        assert not any(call.startswith('count:') for call in calls[calls.index('click:#login_button'):])
+
+    print("登录步骤执行器测试完成！")
+
+if __name__ == "__main__":
+    main()
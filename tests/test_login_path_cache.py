@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from login_flow import LOGIN_STRATEGIES
+from login_path_cache import LoginPathCache
+
+def main():
+    """测试登录路径缓存的策略排序与失效"""
+    print("开始测试登录路径缓存...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = LoginPathCache({'path': os.path.join(tmp_dir, 'cache.json'), 'window': 5})
+
+        # 没有记录时按默认顺序以完整超时尝试
+        plan = cache.plan('layout-a', LOGIN_STRATEGIES)
+        print(f"初始计划: {plan}")
+        assert [name for name, _, _ in plan] == LOGIN_STRATEGIES
+        assert not any(probe for _, probe, _ in plan)
+
+        # 标准路径失败、直接表单成功后，先短超时探测直接表单
+        cache.record('layout-a', 'login_frame', False)
+        cache.record('layout-a', 'bare_form', True, {'username': 'input[name="account"]'})
+        plan = cache.plan('layout-a', LOGIN_STRATEGIES)
+        print(f"记录结果后的计划: {plan}")
+        assert plan[0] == ('bare_form', True, {'username': 'input[name="account"]'})
+        assert [name for name, probe, _ in plan if not probe][0] == 'bare_form'
+        assert [name for name, probe, _ in plan if not probe][-1] == 'login_frame'
+
+        # 只保留最近 window 次结果
+        for _ in range(10):
+            cache.record('layout-a', 'login_frame', False)
+        assert len(cache._load()['strategies']['login_frame']['outcomes']) == 5
+
+        # 页面结构变化后缓存失效
+        plan = cache.plan('layout-b', LOGIN_STRATEGIES)
+        print(f"页面结构变化后的计划: {plan}")
+        assert [name for name, _, _ in plan] == LOGIN_STRATEGIES
+        cache.record('layout-b', 'oauth_frame', True)
+        assert set(cache._load()['strategies']) == {'oauth_frame'}
+
+        # 关闭缓存时不读写文件
+        disabled = LoginPathCache({'enabled': False, 'path': os.path.join(tmp_dir, 'disabled.json')})
+        disabled.record('layout-a', 'bare_form', True)
+        assert not os.path.exists(os.path.join(tmp_dir, 'disabled.json'))
+
+    print("登录路径缓存测试完成！")
+
+if __name__ == "__main__":
+    main()
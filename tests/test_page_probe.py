@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import re
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from page_probe import PROBE_SCRIPT, probe_selectors
+
+# 页面脚本中判断Playwright专有语法的正则表达式（JS与Python语法相同）
+PLAYWRIGHT_ONLY = re.compile(re.search(r"PLAYWRIGHT_ONLY = /(.*)/i;", PROBE_SCRIPT).group(1), re.IGNORECASE)
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    @property
+    def first(self):
+        return self
+
+    def count(self):
+        self.page.locator_calls.append(self.selector)
+        return self.page.playwright_counts.get(self.selector, 0)
+
+    def inner_text(self):
+        return self.page.texts[self.selector]
+
+class FakePage:
+    """
+    登录页面：<script> 中有 "密码登录"，隐藏的 div 中有 "QQ登录"，
+    页面上只有一个可见的 "登录" 按钮
+
+    css_counts 为 querySelectorAll 的结果，playwright_counts 为Playwright选择器引擎的结果
+    """
+
+    css_counts = {'a': 2, 'button': 1, '#switcher_plogin': 0}
+    playwright_counts = {'button:has-text("登录")': 1, 'a:has-text("密码登录")': 0, 'a:has-text("QQ登录")': 0}
+    texts = {'button:has-text("登录")': '登录'}
+
+    def __init__(self):
+        self.locator_calls = []
+
+    def evaluate(self, script, selectors):
+        assert script == PROBE_SCRIPT
+        results = []
+        for selector in selectors:
+            if PLAYWRIGHT_ONLY.search(selector):
+                results.append({"selector": selector, "supported": False})
+            else:
+                count = self.css_counts.get(selector, 0)
+                results.append({"selector": selector, "supported": True, "count": count,
+                                "text": "..." if count else None, "text_error": None})
+        return results
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+def main():
+    """测试批量探测中 :has-text 选择器的结果与Playwright一致"""
+    print("开始测试页面元素批量探测...")
+
+    page = FakePage()
+    selectors = ['#switcher_plogin', 'a', 'a:has-text("密码登录")', 'a:has-text("QQ登录")', 'button:has-text("登录")']
+    results = probe_selectors(page, selectors)
+    for selector, probe in results.items():
+        print(f"{selector}: {probe}")
+
+    # 标准CSS选择器在一次页面调用中完成
+    assert results['a']['count'] == 2 and results['#switcher_plogin']['count'] == 0
+    assert 'a' not in page.locator_calls
+
+    # :has-text 由Playwright的选择器引擎判断：script 中和隐藏元素中的文本不会被页面脚本误判为匹配
+    assert page.locator_calls == ['a:has-text("密码登录")', 'a:has-text("QQ登录")', 'button:has-text("登录")']
+    assert results['a:has-text("密码登录")']['count'] == 0
+    assert results['a:has-text("QQ登录")']['count'] == 0
+    assert results['button:has-text("登录")'] == {
+        "selector": 'button:has-text("登录")', "count": 1, "text": "登录", "error": None, "text_error": None
+    }
+
+    print("页面元素批量探测测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import time
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from proxy_health import ProxyHealthChecker, clear_health_cache
+from proxy_manager import ProxyManager, ProxyUnavailableError
+from standin_site import StandinProxy, StandinSocksProxy, unused_proxy_url
+
+def main():
+    """使用本地模拟代理测试代理健康检查和按延迟选择代理"""
+    print("开始测试代理健康检查...")
+
+    clear_health_cache()
+    health_config = {"enabled": True, "ttl": 60, "timeout": 1.0, "check_target": "example.com:443"}
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            StandinProxy(delay=0.3) as slow, StandinProxy() as fast, \
+            StandinProxy(silent=True) as hung, StandinProxy(status=407) as denied:
+        dead = unused_proxy_url()
+
+        checker = ProxyHealthChecker(health_config)
+        results = checker.check_all([dead, slow.url, fast.url, hung.url, denied.url])
+        for proxy, result in results.items():
+            print(f"{proxy}: {result}")
+
+        assert results[fast.url]["healthy"] and results[slow.url]["healthy"]
+        assert not results[dead]["healthy"], "无法连接的代理应被排除"
+        assert not results[hung.url]["healthy"], "不返回数据的代理应被排除"
+        assert not results[denied.url]["healthy"], "拒绝 CONNECT 的代理应被排除"
+        assert results[slow.url]["first_byte_latency"] >= 0.3
+        assert checker.healthy_proxies([dead, slow.url, fast.url, hung.url]) == [fast.url, slow.url]
+
+        # SOCKS5代理只有接受无需认证的连接时才可用
+        with StandinSocksProxy() as socks_open, StandinSocksProxy(method=0xFF) as socks_auth:
+            socks_results = checker.check_all([socks_open.url, socks_auth.url])
+            print(f"SOCKS5: {socks_results}")
+            assert socks_results[socks_open.url]["healthy"]
+            assert not socks_results[socks_auth.url]["healthy"], "应答 05 FF 的SOCKS5代理应被排除"
+            assert "0xff" in socks_results[socks_auth.url]["error"]
+
+        # 缓存有效期内不重新检查
+        start = time.perf_counter()
+        checker.healthy_proxies([dead, slow.url, fast.url, hung.url])
+        assert time.perf_counter() - start < 0.1, "应使用缓存的检查结果"
+
+        # 固定代理不可用时正常用户报错，不换用其他代理；新设备用户选择最快的非常用代理
+        manager = ProxyManager({
+            "enabled": True,
+            "servers": [dead, slow.url, fast.url],
+            "random": True,
+            "history_path": os.path.join(tmp_dir, 'proxy_history.jsonl')
+        }, health_config)
+        try:
+            manager.get_proxy("normal")
+        except ProxyUnavailableError as e:
+            assert dead in str(e)
+        else:
+            raise AssertionError("固定代理不可用时正常用户应抛出 ProxyUnavailableError")
+        assert manager.get_proxy("new_device") == fast.url
+        for _ in range(10):
+            assert manager.get_proxy("high_risk") in (slow.url, fast.url)
+
+        # 所有代理都不可用时报错，不改为直连
+        all_dead = ProxyManager({
+            "enabled": True,
+            "servers": [dead, hung.url],
+            "history_path": os.path.join(tmp_dir, 'proxy_history.jsonl')
+        }, health_config)
+        for user_type in ("normal", "high_risk", "new_device"):
+            try:
+                all_dead.get_playwright_proxy_config(user_type)
+            except ProxyUnavailableError:
+                pass
+            else:
+                raise AssertionError("所有代理均不可用时应抛出 ProxyUnavailableError")
+
+    clear_health_cache()
+    print("代理健康检查测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import json
+import tempfile
+import threading
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from proxy_history import ProxyHistory
+from proxy_manager import ProxyManager, PROXY_RULES
+from login_flow import SCENARIOS
+
+def make_record(index):
+    """构造一条测试用的代理使用记录"""
+    return {"timestamp": f"2024-01-01T00:00:{index:06d}", "proxy": "http://proxy1.example.com:8080", "user_type": "normal"}
+
+def main():
+    """测试代理使用记录的追加写入、压缩、迁移和损坏行处理"""
+    print("开始测试代理使用记录存储...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'proxy_history.jsonl')
+
+        # 追加写入，超过上限后文件被压缩
+        history = ProxyHistory(path, max_records=10, legacy_path=None)
+        for index in range(35):
+            history.append(make_record(index))
+        with open(path, 'r', encoding='utf-8') as f:
+            line_count = sum(1 for _ in f)
+        print(f"追加35条记录后文件中有 {line_count} 行")
+        assert line_count <= 21, "文件应在超过约两倍上限后被压缩"
+
+        # 重新加载时只保留最近的记录
+        reloaded = ProxyHistory(path, max_records=10, legacy_path=None)
+        assert [r['timestamp'] for r in reloaded.records] == [make_record(i)['timestamp'] for i in range(25, 35)]
+
+        # 写入中途崩溃留下的半行会被跳过
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"timestamp": "2024-01-01T00:00')
+        damaged = ProxyHistory(path, max_records=10, legacy_path=None)
+        assert len(damaged.records) == 10
+
+        # 从旧版JSON文件迁移
+        legacy_path = os.path.join(tmp_dir, 'proxy_history.json')
+        with open(legacy_path, 'w', encoding='utf-8') as f:
+            json.dump([make_record(i) for i in range(5)], f)
+        migrated_path = os.path.join(tmp_dir, 'migrated.jsonl')
+        migrated = ProxyHistory(migrated_path, max_records=10, legacy_path=legacy_path)
+        migrated.append(make_record(5))
+        assert len(ProxyHistory(migrated_path, legacy_path=None).records) == 6
+
+        # ProxyManager 通过 history_path 使用新的存储
+        manager = ProxyManager({
+            "enabled": True,
+            "servers": ["http://proxy1.example.com:8080"],
+            "history_path": os.path.join(tmp_dir, 'manager.jsonl')
+        })
+        manager.get_proxy("normal")
+        manager.get_proxy("high_risk")
+        assert [r['user_type'] for r in manager.usage_history] == ["normal", "high_risk"]
+
+        # 每个测试场景的用户类型都有明确的代理选择规则，目录设备用户不使用固定代理
+        servers = ["http://proxy1.example.com:8080", "http://proxy2.example.com:8080"]
+        rules = ProxyManager({"enabled": True, "servers": servers,
+                              "history_path": os.path.join(tmp_dir, 'rules.jsonl')})
+        for _, user_type, _ in SCENARIOS:
+            assert user_type in PROXY_RULES, f"{user_type} 没有代理选择规则"
+        assert rules.get_proxy("normal") == servers[0]
+        assert rules.get_proxy("catalog") == servers[1]
+        try:
+            rules.get_proxy("unknown")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("未知用户类型应抛出 ValueError")
+
+        # 共享的 ProxyManager：多线程同时选择代理，记录缓存在内存中，关闭时一次写入
+        shared_path = os.path.join(tmp_dir, 'shared.jsonl')
+        with ProxyManager({
+            "enabled": True,
+            "servers": ["http://proxy1.example.com:8080", "http://proxy2.example.com:8080"],
+            "history_path": shared_path,
+            "history_flush_interval": 60
+        }) as shared:
+            workers = [
+                threading.Thread(target=lambda: [shared.get_proxy("high_risk") for _ in range(50)])
+                for _ in range(4)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            assert not os.path.exists(shared_path), "关闭前不应写入文件"
+            assert len(shared.usage_history) == 200
+        with open(shared_path, 'r', encoding='utf-8') as f:
+            assert sum(1 for _ in f) == 200
+
+    print("代理使用记录存储测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import json
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from results_store import ResultsStore
+from logger import Logger
+
+def main():
+    """测试结果数据库的保存、查询和旧版文件导入"""
+    print("开始测试结果数据库...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with ResultsStore(os.path.join(tmp_dir, 'results.db')) as store:
+            store.add("正常用户", True, False, {"页面标题": "收件箱"}, "2025-04-09T10:00:00")
+            store.add("高风险用户", False, True, {"触发项": "安全验证"}, "2025-04-09T10:00:01")
+            store.add("高风险用户", False, True, {"触发项": "安全验证"}, "2025-04-10T10:00:00")
+            store.add("新设备用户", True, False, {}, "2025-04-10T11:00:00")
+
+            assert store.count() == 4
+            assert store.count(rba_triggered=True) == 2
+            assert store.count(user_type="高风险用户", since="2025-04-10") == 1
+
+            results = store.query(user_type="高风险用户", newest_first=True, limit=1)
+            print(f"最新的高风险用户结果: {results}")
+            assert results[0]["timestamp"] == "2025-04-10T10:00:00"
+            assert results[0]["details"] == {"触发项": "安全验证"}
+
+            summary = store.summary()
+            print(f"按用户类型汇总: {summary}")
+            assert summary["高风险用户"] == {"total": 2, "success": 0, "rba_triggered": 2}
+
+            # 导入旧版的单个JSON结果文件
+            legacy_dir = os.path.join(tmp_dir, 'legacy')
+            os.makedirs(legacy_dir)
+            with open(os.path.join(legacy_dir, 'test_20250401_100000_正常用户.json'), 'w', encoding='utf-8') as f:
+                json.dump({"timestamp": "2025-04-01T10:00:00", "user_type": "正常用户",
+                           "success": True, "rba_triggered": False, "details": {}}, f)
+            assert store.import_json_files(legacy_dir) == 1
+            assert store.count(until="2025-04-02") == 1
+
+            # 按设备指纹的内容哈希查询
+            store.add("高风险用户", True, True, {"设备指纹": {"hash": "0123456789abcdef"}})
+            assert store.count(fingerprint_hash="0123456789abcdef") == 1
+            assert store.query(fingerprint_hash="0123456789abcdef")[0]["user_type"] == "高风险用户"
+
+        # 旧版数据库没有 fingerprint_hash 列，打开时自动补上
+        import sqlite3
+        legacy_db = os.path.join(tmp_dir, 'legacy.db')
+        with sqlite3.connect(legacy_db) as conn:
+            conn.execute("CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, "
+                         "user_type TEXT NOT NULL, success INTEGER NOT NULL, rba_triggered INTEGER NOT NULL, "
+                         "details TEXT NOT NULL)")
+            conn.execute("INSERT INTO results (timestamp, user_type, success, rba_triggered, details) "
+                         "VALUES ('2025-04-01T10:00:00', '正常用户', 1, 0, '{}')")
+        conn.close()
+        with ResultsStore(legacy_db) as store:
+            store.add("正常用户", True, False, {"设备指纹": {"hash": "fedcba9876543210"}})
+            assert store.count() == 2 and store.count(fingerprint_hash="fedcba9876543210") == 1
+
+        # 同一秒内的多个结果分别保存，不会相互覆盖
+        original_dir = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            logger = Logger({'level': 'WARNING', 'file_enabled': True, 'file_path': 'data/logs/test.log',
+                             'results_backend': 'both', 'results_db_path': 'data/results/results.db'})
+            for _ in range(3):
+                logger.log_test_result("正常用户", True, False, {})
+            assert logger.get_results_store().count() == 3
+            assert len([name for name in os.listdir('data/results') if name.endswith('.json')]) == 3
+            logger.close()
+        finally:
+            os.chdir(original_dir)
+            Logger({'level': 'INFO', 'file_enabled': False})
+
+    print("结果数据库测试完成！")
+
+if __name__ == "__main__":
+    main()
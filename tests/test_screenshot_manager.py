@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import time
+import tempfile
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from screenshot_manager import ScreenshotManager
+
+class FramePage:
+    """按顺序返回预先准备的截图内容，代替 Playwright 页面"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.calls = []
+
+    def screenshot(self, **options):
+        self.calls.append(options)
+        return self.frames.pop(0)
+
+def main():
+    """测试截图策略、格式参数、重复截图去重和目录大小预算"""
+    print("开始测试截图管理...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # on_failure 策略只保存失败时的截图
+        page = FramePage([b"failed" * 10])
+        with ScreenshotManager({"policy": "on_failure", "directory": tmp_dir}) as screenshots:
+            screenshots.capture(page, "login_page_normal")
+            screenshots.capture(page, "failed_login_normal", failure=True)
+        assert len(page.calls) == 1, "成功路径上的截图不应截取"
+        assert os.listdir(tmp_dir) == ["failed_login_normal.png"]
+
+        # off 策略不截图
+        page = FramePage([])
+        with ScreenshotManager({"policy": "off", "directory": tmp_dir}) as screenshots:
+            screenshots.capture(page, "failed_login_high_risk", failure=True)
+        assert not page.calls
+
+        # jpeg 格式传入质量参数，并使用 .jpg 扩展名
+        page = FramePage([b"jpeg-frame"])
+        with ScreenshotManager({"format": "jpeg", "quality": 60, "directory": tmp_dir}) as screenshots:
+            screenshots.capture(page, "login_page_initial_normal")
+        assert page.calls == [{"type": "jpeg", "quality": 60}]
+        assert os.path.exists(os.path.join(tmp_dir, "login_page_initial_normal.jpg"))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 内容相同的截图以硬链接保存，两个文件名都存在，只占用一份空间
+        with ScreenshotManager({"directory": tmp_dir}) as screenshots:
+            first = screenshots.submit("frame_1", b"same-frame").result()
+            second = screenshots.submit("frame_2", b"same-frame").result()
+        assert sorted(os.listdir(tmp_dir)) == ["frame_1.png", "frame_2.png"]
+        assert os.path.samefile(first, second)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 同名截图被不同内容覆盖后，原内容不再作为重复截图的来源
+        with ScreenshotManager({"directory": tmp_dir}) as screenshots:
+            screenshots.submit("oauth_error_normal", b"AAAA").result()
+            screenshots.submit("oauth_error_normal", b"BBBB").result()
+            path = screenshots.submit("login_page_x", b"AAAA").result()
+        assert path == os.path.join(tmp_dir, "login_page_x.png")
+        with open(path, 'rb') as f:
+            assert f.read() == b"AAAA"
+        with open(os.path.join(tmp_dir, "oauth_error_normal.png"), 'rb') as f:
+            assert f.read() == b"BBBB"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 目录中已有的旧截图在超过预算时最先被删除
+        old_path = os.path.join(tmp_dir, "old.png")
+        with open(old_path, 'wb') as f:
+            f.write(b"o" * 400 * 1024)
+        os.utime(old_path, (time.time() - 3600, time.time() - 3600))
+
+        # 单个后台线程按提交顺序写入，使用顺序确定
+        with ScreenshotManager({"directory": tmp_dir, "budget_mb": 1, "workers": 1}) as screenshots:
+            for index in range(4):
+                screenshots.submit(f"frame_{index}", bytes([index]) * 300 * 1024)
+            screenshots.flush()
+            # 重复的截图使 frame_1 成为最近使用的截图
+            screenshots.submit("frame_1_again", bytes([1]) * 300 * 1024).result()
+            screenshots.submit("frame_4", bytes([4]) * 300 * 1024).result()
+
+        remaining = sorted(os.listdir(tmp_dir))
+        # 硬链接只占用一份空间
+        files = {os.stat(os.path.join(tmp_dir, name)).st_ino: os.path.getsize(os.path.join(tmp_dir, name))
+                 for name in remaining}
+        total = sum(files.values())
+        print(f"预算内保留的截图: {remaining}，总大小 {total} 字节")
+        assert "old.png" not in remaining, "最久未使用的截图应被删除"
+        assert "frame_1.png" in remaining and "frame_1_again.png" in remaining, "最近使用过的截图应被保留"
+        assert "frame_2.png" not in remaining
+        assert total <= 1024 * 1024
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 删除超过预算的截图时一并删除它的硬链接，之后相同内容重新写入
+        with ScreenshotManager({"directory": tmp_dir, "budget_mb": 1, "workers": 1}) as screenshots:
+            screenshots.submit("a", b"a" * 600 * 1024).result()
+            screenshots.submit("a_again", b"a" * 600 * 1024).result()
+            screenshots.submit("b", b"b" * 600 * 1024).result()
+            assert sorted(os.listdir(tmp_dir)) == ["b.png"]
+            screenshots.submit("a_third", b"a" * 600 * 1024).result()
+        assert sorted(os.listdir(tmp_dir)) == ["a_third.png"]
+
+    print("截图管理测试完成！")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import os
+import json
+import asyncio
+import tempfile
+import http.cookiejar
+import urllib.request
+
+# 将src目录添加到Python路径
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from config_loader import ConfigLoader
+from main import perform_login_test
+from screenshot_manager import ScreenshotManager
+from session_profile import SessionProfile
+from standin_site import StandinLoginSite, SESSION_COOKIE
+
+class FakeContext:
+    """记录调用的浏览器上下文"""
+
+    def __init__(self, options):
+        self.options = options
+        self.closed = False
+        self.cookies_cleared = False
+        self.pages = []
+
+    def storage_state(self):
+        return {"cookies": [{"name": SESSION_COOKIE, "value": "token"}], "origins": []}
+
+    def clear_cookies(self):
+        self.cookies_cleared = True
+
+    def close(self):
+        self.closed = True
+
+class FakeBrowserType:
+    def launch_persistent_context(self, user_data_dir, **options):
+        context = FakeContext(options)
+        context.user_data_dir = user_data_dir
+        return context
+
+class FakePage:
+    def __init__(self):
+        self.scripts = []
+
+    def evaluate(self, script):
+        self.scripts.append(script)
+
+class FakePool:
+    """只记录上下文创建和归还的浏览器进程池"""
+
+    def __init__(self):
+        self.browser_type = FakeBrowserType()
+        self.headless = True
+        self.released = []
+
+    def new_context(self, **options):
+        return FakeContext(options)
+
+    def new_persistent_context(self, user_data_dir, **options):
+        return self.browser_type.launch_persistent_context(user_data_dir, headless=self.headless, **options)
+
+    def release_context(self, context):
+        self.released.append(context)
+
+class FailingPageContext(FakeContext):
+    """打开页面时出错的浏览器上下文"""
+
+    def new_page(self):
+        raise RuntimeError("打开页面失败")
+
+class FailingCookiesContext(FakeContext):
+    """清除 Cookie 时出错的浏览器上下文"""
+
+    def clear_cookies(self):
+        raise RuntimeError("清除 Cookie 失败")
+
+class FailingPagePool(FakePool):
+    def new_context(self, **options):
+        return FailingPageContext(options)
+
+class FakeAsyncContext(FakeContext):
+    async def storage_state(self):
+        return FakeContext.storage_state(self)
+
+class FakeAsyncPool(FakePool):
+    async def new_context(self, **options):
+        return FakeAsyncContext(options)
+
+    async def release_context(self, context):
+        self.released.append(context)
+
+def check_engine_releases_session(tmp_dir):
+    """打开页面失败时，执行引擎归还上下文并释放会话目录"""
+    with StandinLoginSite() as site:
+        session_config = f"[session]\nenabled = true\nuser_types = normal\ndirectory = {tmp_dir}\nhttp_cache = false\n"
+        config = ConfigLoader(site.write_config(os.path.join(tmp_dir, 'config.ini'), extra=session_config))
+        pool = FailingPagePool()
+        with ScreenshotManager({"policy": "off"}) as screenshots:
+            try:
+                perform_login_test(None, config, "normal", browser_pool=pool, screenshots=screenshots,
+                                   proxy_server="http://127.0.0.1:9")
+                assert False, "打开页面失败时应抛出异常"
+            except RuntimeError:
+                pass
+    assert len(pool.released) == 1
+    session = SessionProfile(config.get_session_config(), "normal")
+    assert session.acquire(), "会话目录应已释放"
+    session.release()
+
+def main():
+    """测试持久化会话的保存、恢复、过期和并发占用，以及模拟站点的会话 Cookie"""
+    print("开始测试持久化会话...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = {"enabled": True, "user_types": ["normal"], "directory": tmp_dir,
+                  "ttl_hours": 1, "http_cache": False}
+        pool = FakePool()
+
+        # 未启用或不在 user_types 中的用户类型不使用持久化会话
+        assert not SessionProfile(dict(config, enabled=False), "normal").acquire()
+        assert not SessionProfile(config, "high_risk").acquire()
+
+        # 第一次运行没有保存的会话
+        session = SessionProfile(config, "normal", "hash-a")
+        assert session.acquire()
+        context = session.new_context(pool, {"locale": "zh-CN"})
+        assert not session.restored and "storage_state" not in context.options
+        # 会话目录正被使用时，其他测试不使用持久化会话
+        assert not SessionProfile(config, "normal", "hash-a").acquire()
+        session.save(context)
+        session.close_context(context, pool)
+        assert pool.released == [context]
+        with open(session.meta_path, 'r', encoding='utf-8') as f:
+            first_meta = json.load(f)
+        print(f"保存的会话信息: {first_meta}")
+
+        # 有效期内恢复会话，复用后保存不延长有效期
+        session = SessionProfile(config, "normal", "hash-a")
+        assert session.acquire()
+        context = session.new_context(pool, {"locale": "zh-CN"})
+        assert session.restored and context.options["storage_state"] == session.state_path
+        assert context.options["locale"] == "zh-CN"
+        session.save(context)
+        session.close_context(context, pool)
+        with open(session.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        assert meta["expires_at"] == first_meta["expires_at"] and meta["logged_in_at"] == first_meta["logged_in_at"]
+
+        # 设备指纹不同时不恢复会话
+        assert SessionProfile(config, "normal", "hash-b").load_meta() is None
+
+        # 过期的会话不恢复
+        meta["expires_at"] = 0
+        with open(session.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        assert SessionProfile(config, "normal", "hash-a").load_meta() is None
+
+        # 持久化上下文：由进程池创建，没有有效会话时清除用户数据目录中的旧 Cookie，关闭时归还进程池
+        session = SessionProfile(dict(config, http_cache=True), "normal", "hash-a")
+        assert session.acquire()
+        context = session.new_context(pool, {"locale": "zh-CN"})
+        assert session.persistent and context.cookies_cleared
+        assert context.user_data_dir == session.user_data_dir and os.path.isdir(session.user_data_dir)
+        assert "storage_state" not in context.options and context.options["headless"] is True
+        session.save(context)
+        session.close_context(context, pool)
+        assert pool.released[-1] is context and len(pool.released) == 3
+
+        session = SessionProfile(dict(config, http_cache=True), "normal", "hash-a")
+        assert session.acquire()
+        context = session.new_context(pool, {})
+        assert session.restored and not context.cookies_cleared
+
+        # 会话失效时先清除已打开的上下文中恢复的 Cookie 和页面存储，再删除保存的会话
+        page = FakePage()
+        context.pages.append(page)
+        session.discard(context)
+        assert context.cookies_cleared and len(page.scripts) == 1
+        assert not os.path.exists(session.state_path) and session.load_meta() is None
+        session.close_context(context, pool)
+
+        # 没有有效会话时清除旧 Cookie 失败，关闭已创建的上下文并释放会话目录
+        session = SessionProfile(dict(config, http_cache=True), "normal", "hash-b")
+        assert session.acquire()
+        failing = FakePool()
+        failing.new_persistent_context = lambda user_data_dir, **options: FailingCookiesContext(options)
+        try:
+            session.new_context(failing, {})
+            assert False, "清除 Cookie 失败时应抛出异常"
+        except RuntimeError:
+            pass
+        assert len(failing.released) == 1
+        session = SessionProfile(config, "normal")
+        assert session.acquire(), "会话目录应已释放"
+        session.release()
+
+        # 异步版本
+        async def run_async():
+            async_pool = FakeAsyncPool()
+            session = SessionProfile(config, "normal", "hash-a")
+            assert session.acquire()
+            context = await session.async_new_context(async_pool, {})
+            assert not session.restored
+            await session.async_save(context)
+            await session.async_close_context(context, async_pool)
+            session = SessionProfile(config, "normal", "hash-a")
+            assert session.acquire()
+            context = await session.async_new_context(async_pool, {})
+            assert session.restored
+            await session.async_close_context(context, async_pool)
+            assert len(async_pool.released) == 2
+        asyncio.run(run_async())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        check_engine_releases_session(tmp_dir)
+
+    # 模拟站点：登录后设置会话 Cookie，带着有效会话访问登录页面直接进入收件箱
+    with StandinLoginSite() as site:
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        assert opener.open(site.url()).url == site.url()
+        opener.open(site.url('standard', 'static/app.js')).read()
+        assert site.asset_requests == 1
+        assert opener.open(site.url('standard', 'login?u=10001')).url == site.url('standard', 'inbox')
+        assert opener.open(site.url()).url == site.url('standard', 'inbox')
+        # Cookie 只在签发它的页面布局下有效
+        assert opener.open(site.url('bare')).url == site.url('bare')
+        site.expire_sessions()
+        assert opener.open(site.url()).url == site.url()
+
+    print("持久化会话测试通过")
+
+if __name__ == "__main__":
+    main()